@@ -12,6 +12,8 @@ from pathlib import Path
 from collections import defaultdict, Counter
 from datetime import datetime
 
+from instrumentation import span, instrumented_run, instrumentation_options
+
 # Configuration
 BASE_DIR = Path(__file__).parent
 METADATA_DIR = BASE_DIR / "_metadata"
@@ -240,63 +242,69 @@ def main():
     print(f"📁 Répertoire metadata : {DOCS_METADATA_DIR}")
 
     # Lister tous les fichiers metadata.json
-    metadata_files = list(DOCS_METADATA_DIR.glob("*.metadata.json"))
+    with span("scan") as s:
+        metadata_files = list(DOCS_METADATA_DIR.glob("*.metadata.json"))
+        s.documents = len(metadata_files)
     print(f"📄 {len(metadata_files)} fichiers metadata trouvés\n")
 
     # Enrichir tous les fichiers
     enrichment_results = []
-    for i, filepath in enumerate(metadata_files, 1):
-        if i % 50 == 0:
-            print(f"  Traitement en cours : {i}/{len(metadata_files)}...")
+    with span("enrich", documents=len(metadata_files)):
+        for i, filepath in enumerate(metadata_files, 1):
+            if i % 50 == 0:
+                print(f"  Traitement en cours : {i}/{len(metadata_files)}...")
 
-        result = enrich_metadata_file(filepath)
-        enrichment_results.append(result)
+            result = enrich_metadata_file(filepath)
+            enrichment_results.append(result)
 
     print(f"\n✅ {len(enrichment_results)} fichiers enrichis")
 
     # Générer le rapport
-    generate_report(enrichment_results)
-
-    # Mettre à jour l'index complet
-    print(f"🔄 Mise à jour de l'index complet...")
-    if INDEX_FILE.exists():
-        with open(INDEX_FILE, 'r', encoding='utf-8') as f:
-            index_data = json.load(f)
-
-        # Mettre à jour chaque document dans l'index
-        for doc in index_data.get('documents', []):
-            doc_id = doc.get('document_id', '')
-            # Trouver le résultat correspondant
-            matching_result = next((r for r in enrichment_results if r['document_id'] == doc_id), None)
-            if matching_result:
-                if 'classification' not in doc:
-                    doc['classification'] = {}
-                doc['classification']['categories_metier'] = matching_result['categories_metier']
-                doc['classification']['categorie_metier_principale'] = matching_result['categorie_principale']
-
-        # Sauvegarder l'index mis à jour
-        with open(INDEX_FILE, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
-
-        print(f"✅ Index complet mis à jour : {INDEX_FILE}")
-
-    # Sauvegarder le rapport en JSON
-    report_file = METADATA_DIR / "categories_metier_report.json"
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'generated_at': datetime.now().isoformat(),
-            'total_documents': len(enrichment_results),
-            'results': enrichment_results,
-            'statistics': {
-                'by_main_category': dict(Counter(r['categorie_principale'] for r in enrichment_results)),
-                'by_type': dict(Counter(r['type_document'] for r in enrichment_results)),
-                'multi_category_count': len([r for r in enrichment_results if len(r['categories_metier']) > 1])
-            }
-        }, f, ensure_ascii=False, indent=2)
+    with span("render", documents=len(enrichment_results)):
+        generate_report(enrichment_results)
+
+    with span("write", documents=len(enrichment_results)):
+        # Mettre à jour l'index complet
+        print(f"🔄 Mise à jour de l'index complet...")
+        if INDEX_FILE.exists():
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                index_data = json.load(f)
+
+            # Mettre à jour chaque document dans l'index
+            for doc in index_data.get('documents', []):
+                doc_id = doc.get('document_id', '')
+                # Trouver le résultat correspondant
+                matching_result = next((r for r in enrichment_results if r['document_id'] == doc_id), None)
+                if matching_result:
+                    if 'classification' not in doc:
+                        doc['classification'] = {}
+                    doc['classification']['categories_metier'] = matching_result['categories_metier']
+                    doc['classification']['categorie_metier_principale'] = matching_result['categorie_principale']
+
+            # Sauvegarder l'index mis à jour
+            with open(INDEX_FILE, 'w', encoding='utf-8') as f:
+                json.dump(index_data, f, ensure_ascii=False, indent=2)
+
+            print(f"✅ Index complet mis à jour : {INDEX_FILE}")
+
+        # Sauvegarder le rapport en JSON
+        report_file = METADATA_DIR / "categories_metier_report.json"
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'total_documents': len(enrichment_results),
+                'results': enrichment_results,
+                'statistics': {
+                    'by_main_category': dict(Counter(r['categorie_principale'] for r in enrichment_results)),
+                    'by_type': dict(Counter(r['type_document'] for r in enrichment_results)),
+                    'multi_category_count': len([r for r in enrichment_results if len(r['categories_metier']) > 1])
+                }
+            }, f, ensure_ascii=False, indent=2)
 
     print(f"📊 Rapport JSON sauvegardé : {report_file}")
     print(f"\n🎉 Enrichissement terminé avec succès !\n")
 
 
 if __name__ == '__main__':
-    main()
+    with instrumented_run("enrich_categories_metier", **instrumentation_options()):
+        main()
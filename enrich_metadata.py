@@ -12,6 +12,8 @@ from pathlib import Path
 from collections import Counter
 from PyPDF2 import PdfReader
 
+from instrumentation import span, instrumented_run, instrumentation_options
+
 BASE_DIR = Path(__file__).parent
 SOURCES_DIR = BASE_DIR / "sources_documentaires"
 METADATA_DIR = BASE_DIR / "_metadata"
@@ -333,7 +335,8 @@ def process_all_documents():
     print()
 
     # Charger tous les fichiers metadata
-    metadata_files = list(DOCS_METADATA_DIR.glob("*.metadata.json"))
+    with span("scan"):
+        metadata_files = list(DOCS_METADATA_DIR.glob("*.metadata.json"))
     total = len(metadata_files)
 
     print(f"Documents à traiter : {total}")
@@ -345,8 +348,9 @@ def process_all_documents():
 
     for i, meta_file in enumerate(metadata_files, 1):
         # Charger les métadonnées existantes
-        with open(meta_file, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+        with span("scan", documents=1):
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
 
         # Trouver le fichier PDF correspondant
         pdf_path = BASE_DIR / metadata['fichier']
@@ -365,7 +369,8 @@ def process_all_documents():
             continue
 
         # Extraire le texte du PDF
-        pdf_text = extract_pdf_text(pdf_path, max_pages=5)
+        with span("extract", documents=1):
+            pdf_text = extract_pdf_text(pdf_path, max_pages=5)
 
         if not pdf_text:
             print(f"   Pas de texte extrait")
@@ -373,11 +378,13 @@ def process_all_documents():
             continue
 
         # Enrichir les métadonnées
-        metadata = enrich_metadata(metadata, pdf_text)
+        with span("enrich", documents=1):
+            metadata = enrich_metadata(metadata, pdf_text)
 
         # Sauvegarder les métadonnées enrichies
-        with open(meta_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        with span("write", documents=1):
+            with open(meta_file, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
 
         print(f"   ✓ Enrichi (résumé: {len(metadata.get('resume', ''))} chars, "
               f"{len(metadata.get('vocabulaire_specifique', []))} termes)")
@@ -393,4 +400,5 @@ def process_all_documents():
 
 
 if __name__ == "__main__":
-    process_all_documents()
+    with instrumented_run("enrich_metadata", **instrumentation_options()):
+        process_all_documents()
@@ -11,6 +11,8 @@ from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
 
+from instrumentation import span, instrumented_run, instrumentation_options
+
 # Configuration
 BASE_DIR = Path(__file__).parent
 SOURCES_DIR = BASE_DIR / "sources_documentaires"
@@ -914,7 +916,9 @@ def main():
 
     if existing_meta:
         print("1. Chargement des métadonnées existantes...")
-        documents = load_existing_metadata()
+        with span("scan") as s:
+            documents = load_existing_metadata()
+            s.documents = len(documents)
         print(f"   {len(documents)} documents chargés")
         print()
 
@@ -924,40 +928,47 @@ def main():
     else:
         # 1. Scanner les documents
         print("1. Scan des documents...")
-        documents = scan_documents()
+        with span("scan") as s:
+            documents = scan_documents()
+            s.documents = len(documents)
         print(f"   {len(documents)} documents trouvés")
         print()
 
         # 2. Sauvegarder les métadonnées individuelles
         print("2. Génération des métadonnées KM individuelles...")
-        save_individual_metadata(documents)
+        with span("write", documents=len(documents)):
+            save_individual_metadata(documents)
         print(f"   {len(documents)} fichiers .metadata.json créés")
         print()
 
     # 3. Sauvegarder l'index global
     print("3. Génération de l'index global...")
-    save_global_index(documents)
+    with span("write"):
+        save_global_index(documents)
     print("   index_complet.json créé")
     print()
 
     # 4. Sauvegarder le vocabulaire
     print("4. Export du vocabulaire notarial...")
-    save_vocabulary()
+    with span("write"):
+        save_vocabulary()
     print("   vocabulaire_notarial.json créé")
     print()
 
     # 5. Générer les pages par catégorie
     print("5. Génération des pages par catégorie...")
-    pages = save_category_pages(documents)
+    with span("render", documents=len(documents)):
+        pages = save_category_pages(documents)
     for doc_type, filename, count in pages:
         print(f"   {filename} ({count} documents)")
     print()
 
     # 6. Générer le README
     print("6. Génération du README.md global...")
-    readme_content = generate_readme(documents)
-    with open(BASE_DIR / "README.md", 'w', encoding='utf-8') as f:
-        f.write(readme_content)
+    with span("render"):
+        readme_content = generate_readme(documents)
+        with open(BASE_DIR / "README.md", 'w', encoding='utf-8') as f:
+            f.write(readme_content)
     print("   README.md créé")
     print()
 
@@ -966,4 +977,5 @@ def main():
     print(f"Pages de catégories : {len(pages)}")
 
 if __name__ == "__main__":
-    main()
+    with instrumented_run("index_bible_notariale", **instrumentation_options()):
+        main()
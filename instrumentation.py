@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentation du pipeline : spans nommés par phase (scan, extract, enrich,
+write, render), profil cProfile optionnel et rapport JSON d'exécution.
+
+Usage dans un point d'entrée :
+
+    with instrumented_run("enrich_metadata", **instrumentation_options()):
+        process_all_documents()
+
+et dans le code :
+
+    with span("extract") as s:
+        text = extract_pdf_text(path)
+        s.documents = 1
+
+Options (ligne de commande ou variables d'environnement) :
+    --profile [fichier.prof]      BIBLE_PROFILE=fichier.prof
+    --run-report [fichier.json]   BIBLE_RUN_REPORT=fichier.json
+    --timings                     BIBLE_TIMINGS=1
+
+Le tableau des phases n'est affiché que si l'une de ces options est active.
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+RUNS_DIR = BASE_DIR / "output" / "runs"
+
+# Exécution instrumentée en cours (None = spans inactifs)
+_current_run = None
+
+
+class Span:
+    """Mesures d'une phase ; documents peut être renseigné pendant le span."""
+
+    __slots__ = ('name', 'documents', 'carried_peak')
+
+    def __init__(self, name, documents=0):
+        self.name = name
+        self.documents = documents
+        self.carried_peak = 0
+
+
+class RunStats:
+    """Agrège les spans d'une exécution par chemin (ex. 'enrich/extract')."""
+
+    def __init__(self, name, trace_memory):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now().isoformat()
+        self.stack = []
+        self.spans = {}
+
+    def record(self, path, wall, cpu, documents, peak):
+        stats = self.spans.get(path)
+        if stats is None:
+            stats = self.spans[path] = {
+                'calls': 0, 'wall_time_s': 0.0, 'cpu_time_s': 0.0,
+                'documents': 0, 'tracemalloc_peak_mb': 0.0,
+            }
+        stats['calls'] += 1
+        stats['wall_time_s'] += wall
+        stats['cpu_time_s'] += cpu
+        stats['documents'] += documents or 0
+        if peak is not None:
+            stats['tracemalloc_peak_mb'] = max(stats['tracemalloc_peak_mb'], peak / (1024 * 1024))
+
+    def to_dict(self, wall, cpu):
+        spans = []
+        for path, stats in self.spans.items():
+            entry = {'span': path, **stats}
+            if stats['documents'] and stats['wall_time_s']:
+                entry['documents_per_s'] = stats['documents'] / stats['wall_time_s']
+            spans.append(entry)
+        return {
+            'run': self.name,
+            'started_at': self.started_at,
+            'argv': sys.argv,
+            'wall_time_s': wall,
+            'cpu_time_s': cpu,
+            'trace_memory': self.trace_memory,
+            'spans': spans,
+        }
+
+
+@contextmanager
+def span(name, documents=0):
+    """Mesure une phase : temps réel, temps CPU, documents traités, pic tracemalloc."""
+    run = _current_run
+    current = Span(name, documents)
+    if run is None:
+        yield current
+        return
+
+    tracing = run.trace_memory and tracemalloc.is_tracing()
+    peak_before = 0
+    if tracing:
+        peak_before = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+
+    run.stack.append(current)
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield current
+    finally:
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        path = '/'.join(s.name for s in run.stack)
+        run.stack.pop()
+
+        peak = None
+        if tracing:
+            peak = max(tracemalloc.get_traced_memory()[1], current.carried_peak)
+            # reset_peak() a effacé le pic du span parent : on le lui retransmet
+            if run.stack:
+                parent = run.stack[-1]
+                parent.carried_peak = max(parent.carried_peak, peak_before, peak)
+
+        run.record(path, wall, cpu, current.documents, peak)
+
+
+def instrumentation_options(argv=None):
+    """Lit --profile, --run-report et --timings (ou les variables d'environnement équivalentes)."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', nargs='?', const='', default=os.environ.get('BIBLE_PROFILE'))
+    parser.add_argument('--run-report', nargs='?', const='', default=os.environ.get('BIBLE_RUN_REPORT'))
+    parser.add_argument('--timings', action='store_true', default=bool(os.environ.get('BIBLE_TIMINGS')))
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    return {'profile_path': args.profile, 'report_path': args.run_report, 'timings': args.timings}
+
+
+def _default_path(name, suffix):
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    return RUNS_DIR / f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}"
+
+
+def print_span_summary(report):
+    """Affiche le tableau des phases mesurées."""
+    print()
+    print(f"⏱️  Phases de {report['run']} ({report['wall_time_s']:.2f} s)")
+    print("-" * 80)
+    for entry in report['spans']:
+        line = (f"  {entry['span']:28s} {entry['wall_time_s']:8.2f} s  "
+                f"CPU {entry['cpu_time_s']:7.2f} s  docs {entry['documents']:6d}")
+        if report['trace_memory']:
+            line += f"  pic {entry['tracemalloc_peak_mb']:7.1f} Mo"
+        print(line)
+
+
+@contextmanager
+def instrumented_run(name, profile_path=None, report_path=None, trace_memory=None, timings=False):
+    """
+    Active les spans pour la durée d'une exécution.
+
+    profile_path / report_path : None = désactivé, '' = chemin par défaut dans output/runs/.
+    trace_memory : active tracemalloc (par défaut dès qu'un profil ou un rapport est demandé).
+    timings : affiche le tableau des phases même sans profil ni rapport.
+    """
+    global _current_run
+
+    if trace_memory is None:
+        trace_memory = profile_path is not None or report_path is not None
+
+    run = RunStats(name, trace_memory)
+    previous_run = _current_run
+    _current_run = run
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    profiler = None
+    if profile_path is not None:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield run
+    finally:
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        if profiler is not None:
+            profiler.disable()
+        if started_tracing:
+            tracemalloc.stop()
+        _current_run = previous_run
+
+        report = run.to_dict(wall, cpu)
+        if timings or profile_path is not None or report_path is not None:
+            print_span_summary(report)
+
+        if profiler is not None:
+            path = Path(profile_path) if profile_path else _default_path(name, '.prof')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(path))
+            print(f"   Profil cProfile : {path}")
+
+        if report_path is not None:
+            path = Path(report_path) if report_path else _default_path(name, '.json')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"   Rapport d'exécution : {path}")
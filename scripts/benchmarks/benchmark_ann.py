@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark rappel / latence de l'index IVF face à la recherche exacte.
+Génère des vecteurs synthétiques regroupés (proches de vrais embeddings),
+construit VectorIndex (exact) et IVFIndex sur les mêmes données, puis mesure
+recall@k et temps par requête pour plusieurs valeurs de nprobe, ainsi que
+le coût des ajouts incrémentaux.
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "rag"))
+
+from vector_index import VectorIndex  # noqa: E402
+from ivf_index import IVFIndex  # noqa: E402
+from benchmark_common import git_revision  # noqa: E402
+
+RESULTS_DIR = PROJECT_ROOT / "output" / "benchmarks"
+
+DEFAULT_NPROBES = [1, 2, 4, 8, 16, 32, 64]
+
+
+def synthetic_vectors(n_vectors: int, dim: int, n_topics: int, rng: np.random.Generator) -> np.ndarray:
+    """Vecteurs autour de n_topics directions (bruit gaussien)."""
+    topics = rng.standard_normal((n_topics, dim), dtype=np.float32)
+    labels = rng.integers(0, n_topics, n_vectors)
+    return topics[labels] + 0.8 * rng.standard_normal((n_vectors, dim), dtype=np.float32)
+
+
+def recall_at_k(exact: List[List[tuple]], approx: List[List[tuple]]) -> float:
+    """Part des k plus proches voisins exacts retrouvés."""
+    found = total = 0
+    for truth, hits in zip(exact, approx):
+        truth_rows = {row for row, _ in truth}
+        found += len(truth_rows & {row for row, _ in hits})
+        total += len(truth_rows)
+    return found / total if total else 0.0
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(args, workdir: Path) -> Dict[str, Any]:
+    """Construit les deux index et mesure rappel/latence par nprobe."""
+    rng = np.random.default_rng(args.seed)
+    n_added = int(args.vectors * args.added_ratio)
+    vectors = synthetic_vectors(args.vectors, args.dim, args.topics, rng)
+    queries = synthetic_vectors(args.queries, args.dim, args.topics, np.random.default_rng(args.seed))
+    doc_ids = [f"doc_{i}" for i in range(max(args.vectors // 20, 1))]
+    rows = [{'chunkId': f"chunk_{i}", 'documentId': doc_ids[i % len(doc_ids)]} for i in range(args.vectors)]
+
+    exact, exact_build = timed(VectorIndex.build, vectors, rows, workdir / "exact", doc_ids)
+    print(f"✅ Index exact : {len(exact)} vecteurs en {exact_build:.2f} s")
+
+    base = args.vectors - n_added
+    ivf, ivf_build = timed(IVFIndex.build, vectors[:base], rows[:base], workdir / "ivf", doc_ids,
+                           args.lists, seed=args.seed)
+    print(f"✅ Index IVF : {ivf.n_lists} listes sur {base} vecteurs en {ivf_build:.2f} s")
+
+    add_seconds = 0.0
+    if n_added:
+        _, add_seconds = timed(ivf.add, vectors[base:], rows[base:], doc_ids)
+        print(f"➕ {n_added} ajouts incrémentaux en {add_seconds * 1000:.1f} ms")
+
+    truth, exact_seconds = timed(exact.search_rows, queries, args.k)
+    exact_ms = exact_seconds * 1000 / args.queries
+    print(f"\n⏱️  Exact : {exact_ms:.3f} ms par requête")
+    print("-" * 70)
+
+    sweep = []
+    for nprobe in args.nprobes:
+        if nprobe > ivf.n_lists:
+            continue
+        hits, seconds = timed(ivf.search_rows, queries, args.k, None, nprobe)
+        point = {
+            'nprobe': nprobe,
+            'recall': recall_at_k(truth, hits),
+            'ms_per_query': seconds * 1000 / args.queries,
+        }
+        point['speedup'] = exact_ms / point['ms_per_query'] if point['ms_per_query'] else None
+        sweep.append(point)
+        print(f"   nprobe {nprobe:4d}  recall@{args.k} {point['recall']:.3f}  "
+              f"{point['ms_per_query']:8.3f} ms  (x{point['speedup']:.1f})")
+
+    ivf.compact()
+    hits, _ = timed(ivf.search_rows, queries, args.k, None, args.nprobes[len(args.nprobes) // 2])
+    print(f"\n🗜️  Après compact() : recall@{args.k} {recall_at_k(truth, hits):.3f} "
+          f"(nprobe {args.nprobes[len(args.nprobes) // 2]})")
+
+    return {
+        'vectors': args.vectors,
+        'dim': args.dim,
+        'queries': args.queries,
+        'k': args.k,
+        'n_lists': ivf.n_lists,
+        'added': n_added,
+        'build_seconds': {'exact': exact_build, 'ivf': ivf_build},
+        'add_seconds': add_seconds,
+        'exact_ms_per_query': exact_ms,
+        'sweep': sweep,
+    }
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Benchmark rappel/latence IVF vs recherche exacte")
+    parser.add_argument('--vectors', type=int, default=200_000)
+    parser.add_argument('--dim', type=int, default=256)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--topics', type=int, default=500, help="Nombre de groupes thématiques synthétiques")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--lists', type=int, default=None, help="Nombre de listes IVF (défaut ~4·√N)")
+    parser.add_argument('--nprobes', type=int, nargs='+', default=DEFAULT_NPROBES)
+    parser.add_argument('--added-ratio', type=float, default=0.05, help="Part des vecteurs ajoutés après construction")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BENCHMARK INDEX ANN (IVF)")
+    print("=" * 70)
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_ann_"))
+    try:
+        results = run_benchmark(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'seed': args.seed,
+        'results': results,
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = RESULTS_DIR / f"ann_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['git_revision'] or 'nogit'}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Résultats sauvegardés : {output_path}")
+
+
+if __name__ == "__main__":
+    main()
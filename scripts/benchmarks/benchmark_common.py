@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Utilitaires partagés par les benchmarks (révision git des rapports JSON).
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def git_revision() -> Optional[str]:
+    """Révision git courante (pour comparer les versions)."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
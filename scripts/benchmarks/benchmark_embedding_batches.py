@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Débit d'ingestion des embeddings selon la taille des lots.
+Lance le serveur OpenAI simulé (openai_stub : latence simulée par requête
+et par texte, erreurs 5xx aléatoires) ou vise --base-url, puis
+envoie les mêmes chunks avec EmbeddingBatcher pour chaque taille de lot.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "rag"))
+
+from embedding_batcher import EmbeddingBatcher  # noqa: E402
+from embeddings import OpenAIEmbedder  # noqa: E402
+from openai_stub import OpenAIStubServer, StubConfig  # noqa: E402
+
+RESULTS_DIR = PROJECT_ROOT / "output" / "benchmarks"
+
+DEFAULT_BATCH_SIZES = [1, 8, 32, 128, 512]
+
+
+def sample_texts(n_texts: int, seed: int) -> List[str]:
+    """Textes de chunks : cache du texte intégral s'il existe, sinon synthétiques."""
+    from document_text import TEXT_DIR
+    from chunking import chunk_pages
+    texts = []
+    for cache_file in sorted(TEXT_DIR.glob("*.json")):
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        texts.extend(c['text'] for c in chunk_pages(cached['document_id'], cached['fichier'], cached['pages']))
+        if len(texts) >= n_texts:
+            return texts[:n_texts]
+    rng = random.Random(seed)
+    words = "notaire office acte avenant convention collective salarié clerc congés article".split()
+    while len(texts) < n_texts:
+        texts.append(' '.join(rng.choice(words) for _ in range(rng.randint(50, 400))))
+    return texts
+
+
+async def run_size(base_url: str, texts: List[str], batch_size: int, max_tokens: int,
+                   concurrency: int) -> Dict[str, Any]:
+    embedder = OpenAIEmbedder("benchmark-model", base_url, api_key="local")
+    batcher = EmbeddingBatcher(embedder.embed_batch, batch_size, max_tokens, concurrency, base_delay=0.05)
+    vectors = await batcher.embed_texts(texts)
+    assert len(vectors) == len(texts)
+    texts_per_s, tokens_per_s = batcher.throughput()
+    return {
+        'batch_size': batch_size,
+        'requests': batcher.stats['requests'],
+        'retries': batcher.stats['retries'],
+        'seconds': batcher.stats['seconds'],
+        'chunks_per_s': texts_per_s,
+        'tokens_per_s': tokens_per_s,
+    }
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Débit des embeddings selon la taille des lots")
+    parser.add_argument('--chunks', type=int, default=2000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES)
+    parser.add_argument('--max-tokens', type=int, default=100_000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--base-url', default=None, help="Serveur existant (sinon serveur local simulé)")
+    parser.add_argument('--latency', default='fixed:50', help="Latence simulée par requête (ex. lognormal:50:0.5)")
+    parser.add_argument('--item-ms', type=float, default=0.5, help="Latence simulée par texte")
+    parser.add_argument('--error-rate', type=float, default=0.02, help="Part de réponses 5xx simulées")
+    parser.add_argument('--dim', type=int, default=256)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BENCHMARK DES LOTS D'EMBEDDINGS")
+    print("=" * 70)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = OpenAIStubServer(StubConfig(embedding_latency=args.latency, item_ms=args.item_ms,
+                                             error_rate=args.error_rate, dim=args.dim, seed=args.seed))
+        base_url = server.start_in_thread()
+        print(f"🧪 Serveur local {base_url} ({args.latency} ms/requête + {args.item_ms} ms/texte, "
+              f"{args.error_rate:.0%} d'erreurs)")
+
+    texts = sample_texts(args.chunks, args.seed)
+    print(f"📄 {len(texts)} chunks, concurrence {args.concurrency}\n")
+
+    results = []
+    try:
+        for batch_size in args.batch_sizes:
+            result = asyncio.run(run_size(base_url, texts, batch_size, args.max_tokens, args.concurrency))
+            results.append(result)
+            print(f"   lot {batch_size:5d}  {result['requests']:6d} requêtes  {result['retries']:4d} relances  "
+                  f"{result['seconds']:7.2f} s  {result['chunks_per_s']:9.1f} chunks/s")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = RESULTS_DIR / f"embedding_batches_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(),
+            'settings': vars(args),
+            'results': results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Résultats sauvegardés : {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Débit d'écriture du graphe (lignes/s) selon la taille des lots UNWIND.
+Écrit le corpus (documents, chunks, entités, relations) avec GraphWriter
+dans un FakeDriver à latence simulée (aller-retour par requête + coût par
+ligne), pour dimensionner batch_size et la concurrence de l'ingestion.
+Avec --uri, les lots sont envoyés à une vraie base Neo4j (paquet neo4j) :
+le débit mesuré est alors celui du serveur et non le reflet des paramètres
+simulés. Utiliser une base de test : --reset supprime les nœuds Document,
+Chunk et Entity avant chaque taille de lot.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "rag"))
+
+from corpus import load_documents, load_vocabulary  # noqa: E402
+from graph_writer import FakeDriver, GraphWriter, write_corpus  # noqa: E402
+from neo4j_export import load_chunks  # noqa: E402
+from relation_graph import RelationGraph  # noqa: E402
+
+RESULTS_DIR = PROJECT_ROOT / "output" / "benchmarks"
+
+DEFAULT_BATCH_SIZES = [1, 10, 50, 100, 500, 1000, 5000]
+
+
+RESET_QUERY = "MATCH (n) WHERE n:Document OR n:Chunk OR n:Entity DETACH DELETE n"
+
+
+async def run_size(data: tuple, batch_size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    if args.uri:
+        from neo4j import AsyncGraphDatabase
+        driver = AsyncGraphDatabase.driver(args.uri, auth=(args.user, args.password))
+    else:
+        driver = FakeDriver(args.statement_ms, args.row_us, args.deadlock_rate)
+    try:
+        if args.uri and args.reset:
+            async with driver.session(**({'database': args.database} if args.database else {})) as session:
+                await (await session.run(RESET_QUERY)).consume()
+        writer = GraphWriter(driver, batch_size, args.concurrency, database=args.database)
+        start = time.perf_counter()
+        stats = await write_corpus(writer, *data)
+        seconds = time.perf_counter() - start
+    finally:
+        if args.uri:
+            await driver.close()
+    return {
+        'batch_size': batch_size,
+        'statements': stats['statements'],
+        'rows': stats['rows'],
+        'retries': stats['retries'],
+        'seconds': seconds,
+        'rows_per_s': stats['rows'] / seconds if seconds else None,
+        'max_in_flight': getattr(driver, 'max_in_flight', None),
+    }
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Débit du GraphWriter selon la taille des lots")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--statement-ms', type=float, default=5.0, help="Aller-retour simulé par requête")
+    parser.add_argument('--row-us', type=float, default=20.0, help="Coût simulé par ligne (µs)")
+    parser.add_argument('--deadlock-rate', type=float, default=0.0,
+                        help="Fraction simulée de lots de relations en interblocage (rejoués)")
+    parser.add_argument('--uri', default=os.environ.get('NEO4J_URL'),
+                        help="Base Neo4j réelle (bolt://…) au lieu du driver simulé (défaut : NEO4J_URL)")
+    parser.add_argument('--user', default=os.environ.get('NEO4J_USERNAME', 'neo4j'))
+    parser.add_argument('--password', default=os.environ.get('NEO4J_PASSWORD', ''))
+    parser.add_argument('--database', default=None)
+    parser.add_argument('--reset', action='store_true',
+                        help="Supprime les nœuds Document/Chunk/Entity avant chaque taille (base de test)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BENCHMARK DE L'ÉCRITURE DU GRAPHE")
+    print("=" * 70)
+
+    documents = load_documents()
+    chunks, _ = load_chunks(documents)
+    data = (documents, chunks, load_vocabulary(), RelationGraph.build(documents))
+    target = (f"Neo4j {args.uri}" if args.uri
+              else f"driver simulé {args.statement_ms} ms/requête + {args.row_us} µs/ligne")
+    print(f"📄 {len(documents)} documents, {len(chunks)} chunks, concurrence {args.concurrency}, {target}\n")
+    if args.uri and not args.reset:
+        print("⚠️  Sans --reset, les tailles suivantes mettent à jour des nœuds existants\n")
+
+    results = []
+    for batch_size in args.batch_sizes:
+        try:
+            result = asyncio.run(run_size(data, batch_size, args))
+        except ImportError:
+            print("❌ Paquet neo4j requis pour --uri (pip install neo4j)")
+            sys.exit(1)
+        results.append(result)
+        print(f"   lot {batch_size:5d}  {result['statements']:6d} requêtes  {result['seconds']:7.2f} s  "
+              f"{result['rows_per_s']:10.0f} lignes/s  ({result['retries']} rejeux)")
+
+    best = max(results, key=lambda r: r['rows_per_s'] or 0)
+    print(f"\n🏆 Meilleur débit : lot de {best['batch_size']} ({best['rows_per_s']:.0f} lignes/s)")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = RESULTS_DIR / f"graph_writer_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(),
+            'settings': {**vars(args), 'password': None},
+            'results': results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Résultats sauvegardés : {output_path}")
+
+
+if __name__ == "__main__":
+    main()
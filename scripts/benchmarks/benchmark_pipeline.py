@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Benchmark du pipeline d'indexation sur des corpus synthétiques (1k, 10k, 100k).
+Chronomètre chaque étape (scan, enrichissement PDF, catégories métier,
+validation, pages de catégories/README, Excel) et enregistre temps, pic de
+RSS et fichiers écrits dans un JSON comparable d'une version à l'autre.
+Chaque étape tourne dans un processus fils (fork) : son pic de RSS est le
+sien, sans hériter de celui des étapes ou tailles précédentes.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Optional
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "validation"))
+
+import index_bible_notariale  # noqa: E402
+import enrich_metadata  # noqa: E402
+import enrich_categories_metier  # noqa: E402
+import validate_metadata  # noqa: E402
+import generate_validation_metadonnees  # noqa: E402
+from benchmark_common import git_revision  # noqa: E402
+from generate_synthetic_corpus import generate_corpus  # noqa: E402
+
+RESULTS_DIR = PROJECT_ROOT / "output" / "benchmarks"
+TEMPLATE_METADONNEES = PROJECT_ROOT / "templates" / "validation_metadonnees_20docs_TEMPLATE.xlsx"
+
+DEFAULT_SIZES = [1000]
+STAGES = ['scan', 'enrichment', 'categories_metier', 'validation', 'pages_readme', 'excel']
+
+
+def point_pipeline_at(workdir: Path):
+    """Redirige les chemins des modules du pipeline vers un répertoire de travail."""
+    sources = workdir / "sources_documentaires"
+    metadata = workdir / "_metadata"
+    documents = metadata / "documents"
+
+    index_bible_notariale.BASE_DIR = workdir
+    index_bible_notariale.SOURCES_DIR = sources
+    index_bible_notariale.METADATA_DIR = metadata
+    index_bible_notariale.DOCS_METADATA_DIR = documents
+    index_bible_notariale.CATEGORIES_DIR = workdir / "docs" / "categories"
+
+    enrich_metadata.BASE_DIR = workdir
+    enrich_metadata.SOURCES_DIR = sources
+    enrich_metadata.METADATA_DIR = metadata
+    enrich_metadata.DOCS_METADATA_DIR = documents
+
+    enrich_categories_metier.BASE_DIR = workdir
+    enrich_categories_metier.METADATA_DIR = metadata
+    enrich_categories_metier.DOCS_METADATA_DIR = documents
+    enrich_categories_metier.INDEX_FILE = metadata / "index_complet.json"
+
+    validate_metadata.BASE_DIR = workdir
+    validate_metadata.SOURCES_DIR = sources
+    validate_metadata.METADATA_DIR = metadata
+    validate_metadata.DOCS_METADATA_DIR = documents
+
+
+def snapshot_files(root: Path) -> Dict[str, int]:
+    """Chemin → mtime de tous les fichiers (hors sources) pour compter les écritures."""
+    snapshot = {}
+    for dirpath, _, filenames in os.walk(root):
+        if 'sources_documentaires' in Path(dirpath).parts:
+            continue
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            snapshot[path] = os.stat(path).st_mtime_ns
+    return snapshot
+
+
+def peak_rss_mb() -> float:
+    """Pic de RSS du processus (ru_maxrss est en Ko sous Linux, en octets sous macOS)."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return maxrss / (1024 * 1024)
+    return maxrss / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """RSS courant (Linux : /proc/self/statm), None ailleurs."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def run_in_child(func: Callable[[], Any], verbose: bool) -> Dict[str, Any]:
+    """
+    Exécute une étape dans un processus fils (fork) et renvoie ses mesures.
+
+    Le fils hérite de l'état du parent (chemins redirigés, modules chargés) ;
+    ru_maxrss y repart du RSS au moment du fork, d'où rss_start_mb.
+    """
+    context = multiprocessing.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+
+    def child():
+        measures = {'rss_start_mb': current_rss_mb(), 'error': None}
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            if verbose:
+                func()
+            else:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    func()
+        except BaseException as e:
+            measures['error'] = f"{type(e).__name__}: {e}"
+        measures['wall_time_s'] = time.perf_counter() - start
+        measures['cpu_time_s'] = time.process_time() - cpu_start
+        measures['peak_rss_mb'] = peak_rss_mb()
+        sender.send(measures)
+
+    process = context.Process(target=child)
+    process.start()
+    sender.close()
+    try:
+        measures = receiver.recv()
+    except EOFError:
+        measures = {'error': f"processus fils terminé (code {process.exitcode})"}
+    process.join()
+    if measures['error']:
+        raise RuntimeError(f"Étape en échec : {measures['error']}")
+    return measures
+
+
+def time_stage(name: str, workdir: Path, func: Callable[[], Any], verbose: bool) -> Dict[str, Any]:
+    """
+    Exécute une étape dans un processus fils en mesurant temps, pic de RSS et fichiers écrits.
+
+    Args:
+        name: Nom de l'étape
+        workdir: Répertoire de travail (pour compter les fichiers écrits)
+        func: Étape à exécuter
+        verbose: Laisser passer les print() du pipeline
+
+    Returns:
+        Mesures de l'étape
+    """
+    before = snapshot_files(workdir)
+    measures = run_in_child(func, verbose)
+    after = snapshot_files(workdir)
+    written = sum(1 for path, mtime in after.items() if before.get(path) != mtime)
+
+    # Croissance propre à l'étape, au-delà de l'état hérité du parent
+    growth = measures['peak_rss_mb'] - (measures['rss_start_mb'] or 0.0)
+    print(f"   {name:20s} {measures['wall_time_s']:9.2f} s  (CPU {measures['cpu_time_s']:8.2f} s)  "
+          f"RSS max {measures['peak_rss_mb']:8.1f} Mo (+{growth:.1f})  {written:7d} fichiers")
+    return {
+        'wall_time_s': measures['wall_time_s'],
+        'cpu_time_s': measures['cpu_time_s'],
+        'peak_rss_mb': measures['peak_rss_mb'],
+        'rss_growth_mb': growth,
+        'files_written': written,
+    }
+
+
+def run_pipeline(workdir: Path, stages: List[str], verbose: bool) -> Dict[str, Any]:
+    """Exécute les étapes demandées du pipeline sur le corpus de workdir."""
+    point_pipeline_at(workdir)
+    results = {}
+
+    def scan():
+        documents = index_bible_notariale.scan_documents()
+        index_bible_notariale.save_individual_metadata(documents)
+        index_bible_notariale.save_global_index(documents)
+
+    def pages_readme():
+        documents = index_bible_notariale.load_existing_metadata()
+        index_bible_notariale.save_category_pages(documents)
+        readme = index_bible_notariale.generate_readme(documents)
+        with open(workdir / "README.md", 'w', encoding='utf-8') as f:
+            f.write(readme)
+
+    def excel():
+        metadatas = generate_validation_metadonnees.load_metadata_files(index_bible_notariale.DOCS_METADATA_DIR)
+        selected = generate_validation_metadonnees.select_20_documents(metadatas)
+        generate_validation_metadonnees.generate_excel(
+            selected, TEMPLATE_METADONNEES, workdir / "output" / "validation_metadonnees_20docs.xlsx"
+        )
+
+    stage_funcs = {
+        'scan': scan,
+        'enrichment': enrich_metadata.process_all_documents,
+        'categories_metier': enrich_categories_metier.main,
+        'validation': validate_metadata.analyze_all_documents,
+        'pages_readme': pages_readme,
+        'excel': excel,
+    }
+
+    for stage in STAGES:
+        if stage in stages:
+            results[stage] = time_stage(stage, workdir, stage_funcs[stage], verbose)
+
+    return results
+
+
+def compare_with_previous(report: Dict[str, Any], previous_path: Path):
+    """Affiche l'évolution des temps par rapport à un rapport précédent."""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+
+    print(f"\n📈 Comparaison avec {previous_path.name} (révision {previous.get('git_revision')})")
+    print("-" * 70)
+    for size, stages in report['runs'].items():
+        old_stages = previous.get('runs', {}).get(size)
+        if not old_stages:
+            continue
+        for stage, measures in stages.items():
+            old = old_stages.get(stage)
+            if not old or not old['wall_time_s']:
+                continue
+            ratio = measures['wall_time_s'] / old['wall_time_s']
+            flag = " ⚠️" if ratio > 1.2 else ""
+            print(f"   {size:>7s} docs  {stage:20s} x{ratio:5.2f}{flag}")
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline sur corpus synthétiques")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Tailles de corpus, ex. --sizes 1000 10000 100000")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', type=Path, default=None, help="Conserver les corpus dans ce dossier")
+    parser.add_argument('--compare', type=Path, default=None, help="Rapport précédent à comparer")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BENCHMARK DU PIPELINE D'INDEXATION")
+    print("=" * 70)
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'runs': {},
+    }
+
+    base_dir = args.workdir or Path(tempfile.mkdtemp(prefix="bench_bible_"))
+    try:
+        for size in args.sizes:
+            workdir = base_dir / f"corpus_{size}"
+            sources = workdir / "sources_documentaires"
+            if not sources.exists():
+                print(f"\n📄 Génération du corpus synthétique : {size} documents...")
+                start = time.perf_counter()
+                generate_corpus(sources, size, args.seed)
+                print(f"   corpus généré en {time.perf_counter() - start:.1f} s")
+            # Repartir de métadonnées vierges à chaque run
+            shutil.rmtree(workdir / "_metadata", ignore_errors=True)
+
+            print(f"\n⏱️  Pipeline sur {size} documents")
+            report['runs'][str(size)] = run_pipeline(workdir, args.stages, args.verbose)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = RESULTS_DIR / f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['git_revision'] or 'nogit'}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        compare_with_previous(report, args.compare)
+
+    print(f"\n✅ Résultats sauvegardés : {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Latence de bout en bout de la recherche : flux séquentiel (raisonnement
+puis recherche) contre recherche spéculative en parallèle du raisonnement.
+Tourne hors ligne : serveur OpenAI simulé (openai_stub) pour le
+raisonnement et les embeddings, EmbeddedNeo4jService pour les recherches,
+index vectoriel des chunks calculé avec les mêmes embeddings déterministes.
+Une part des search_query est réécrite (expansion par synonymes) pour
+mesurer aussi le cas où les résultats spéculatifs sont fusionnés.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "rag"))
+
+from corpus import load_documents, load_questions, load_vocabulary  # noqa: E402
+from embedded_neo4j import EmbeddedNeo4jService  # noqa: E402
+from embeddings import OpenAIEmbedder  # noqa: E402
+from neo4j_export import load_chunks  # noqa: E402
+from openai_stub import OpenAIStubServer, StubConfig, stub_embedding  # noqa: E402
+from relation_graph import RelationGraph  # noqa: E402
+from speculative_retrieval import OpenAIReasoner, RetrievalPipeline  # noqa: E402
+from synonyms import SynonymExpander  # noqa: E402
+from vector_index import VectorIndex  # noqa: E402
+
+RESULTS_DIR = PROJECT_ROOT / "output" / "benchmarks"
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    return {'mean': float(np.mean(values)), 'p50': float(np.percentile(values, 50)),
+            'p90': float(np.percentile(values, 90)), 'p99': float(np.percentile(values, 99))}
+
+
+async def run(pipeline: RetrievalPipeline, questions: List[str]) -> List[Dict[str, Any]]:
+    rows = []
+    for i, question in enumerate(questions):
+        # Ordre alterné pour ne pas avantager un mode (caches, préchauffage)
+        modes = (False, True) if i % 2 == 0 else (True, False)
+        results = {}
+        for speculative in modes:
+            results[speculative] = await pipeline.query(question, speculative)
+        sequential, speculative = results[False], results[True]
+        expected = {c['chunkId'] for c in sequential['chunks']}
+        found = {c['chunkId'] for c in speculative['chunks']}
+        rows.append({
+            'question': question,
+            'reused': speculative['reused'],
+            'sequential': sequential['timings'],
+            'speculative': speculative['timings'],
+            # Attente retirée du chemin critique (indépendante du tirage de latence du raisonnement)
+            'saved_ms': sequential['timings']['retrieval_ms'] - speculative['timings']['after_reasoning_ms'],
+            'chunks_kept': len(expected & found) / len(expected) if expected else 1.0,
+        })
+    return rows
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Recherche séquentielle vs spéculative")
+    parser.add_argument('--questions', type=int, default=20)
+    parser.add_argument('--chat-latency', default='lognormal:800:0.5')
+    parser.add_argument('--embedding-latency', default='lognormal:150:0.4')
+    parser.add_argument('--db-ms', type=float, default=30.0, help="Aller-retour simulé par recherche Neo4j")
+    parser.add_argument('--rewrite-rate', type=float, default=0.5, help="Part des search_query réécrites")
+    parser.add_argument('--dim', type=int, default=256)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BENCHMARK DE LA RECHERCHE SPÉCULATIVE")
+    print("=" * 70)
+
+    documents = load_documents()
+    chunks, _ = load_chunks(documents)
+    start = time.perf_counter()
+    vectors = np.array([stub_embedding(chunk['text'], args.dim) for chunk in chunks], dtype=np.float32)
+    workdir = Path(tempfile.mkdtemp(prefix="bench_speculative_"))
+    server = OpenAIStubServer(StubConfig(args.chat_latency, args.embedding_latency, dim=args.dim, seed=args.seed))
+    try:
+        vector_index = VectorIndex.build(vectors, chunks, workdir, [d['document_id'] for d in documents])
+        service = EmbeddedNeo4jService(documents, chunks, load_vocabulary(), RelationGraph.build(documents),
+                                       vector_index, latency_ms=args.db_ms)
+        print(f"📄 {len(chunks)} chunks indexés ({time.perf_counter() - start:.1f} s)")
+
+        base_url = server.start_in_thread()
+        print(f"🧪 Serveur local {base_url} : chat {args.chat_latency}, embeddings {args.embedding_latency}, "
+              f"Neo4j {args.db_ms} ms\n")
+
+        embedder = OpenAIEmbedder("benchmark-model", base_url, api_key="local")
+        reasoner = OpenAIReasoner(base_url=base_url, api_key="local")
+        expander = SynonymExpander.load()
+        rng = random.Random(args.seed)
+        rewritten = set()
+
+        async def reason(question: str) -> Dict[str, str]:
+            step = await reasoner(question)
+            if question in rewritten:
+                step['search_query'] = expander.expand(step['search_query'])
+            return step
+
+        questions = [q['question'] for q in load_questions()][:args.questions]
+        rewritten.update(q for q in questions if rng.random() < args.rewrite_rate)
+        pipeline = RetrievalPipeline(service, embedder.embed_batch, reason)
+        rows = asyncio.run(run(pipeline, questions))
+    finally:
+        if server._thread is not None:
+            server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    sequential = percentiles([r['sequential']['total_ms'] for r in rows])
+    speculative = percentiles([r['speculative']['total_ms'] for r in rows])
+    waiting = percentiles([r['sequential']['retrieval_ms'] for r in rows])
+    after = percentiles([r['speculative']['after_reasoning_ms'] for r in rows])
+    reused = sum(r['reused'] for r in rows)
+    print(f"{'':22s}{'moyenne':>10s}{'p50':>10s}{'p90':>10s}")
+    print("-" * 70)
+    for label, stats in (("séquentiel", sequential), ("spéculatif", speculative),
+                         ("  attente recherche", waiting), ("  attente spéculative", after)):
+        print(f"   {label:19s}{stats['mean']:9.0f}ms{stats['p50']:8.0f}ms{stats['p90']:8.0f}ms")
+    print("-" * 70)
+    print(f"⏱️  Gain moyen après raisonnement : {np.mean([r['saved_ms'] for r in rows]):.0f} ms par question "
+          f"({reused}/{len(rows)} réutilisations, {len(rows) - reused} fusions)")
+    print(f"📊 Chunks du mode séquentiel conservés : {np.mean([r['chunks_kept'] for r in rows]):.0%}")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = RESULTS_DIR / f"speculative_retrieval_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(),
+            'settings': vars(args),
+            'sequential_ms': sequential,
+            'speculative_ms': speculative,
+            'rows': rows,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Résultats sauvegardés : {output_path}")
+
+
+if __name__ == "__main__":
+    main()
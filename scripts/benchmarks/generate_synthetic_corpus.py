@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Génère un corpus synthétique calqué sur sources_documentaires/.
+Noms de fichiers, arborescence (CSN20xx, Convention Collective, fil-infos...)
+et petits PDF texte contenant le vocabulaire notarial, des dates, des articles
+et des références, pour mesurer le pipeline à 1k, 10k ou 100k documents.
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+
+MOIS = [
+    'janvier', 'février', 'mars', 'avril', 'mai', 'juin', 'juillet',
+    'août', 'septembre', 'octobre', 'novembre', 'décembre'
+]
+
+THEMES = [
+    'formation professionnelle', 'période d\'essai', 'congés payés', 'licenciement',
+    'rémunération', 'prévoyance', 'harcèlement', 'égalité professionnelle',
+    'intéressement', 'RGPD', 'cybersécurité', 'LCB-FT', 'tarification', 'OPCO',
+]
+
+PHRASES = [
+    "Le Conseil supérieur du notariat rappelle les obligations applicables aux offices en matière de {theme}.",
+    "La convention collective nationale du notariat (IDCC 2205) est modifiée par le présent avenant.",
+    "Les dispositions de l'article {article} sont applicables à compter du {date}.",
+    "Conformément au décret n° {decret}, les notaires doivent mettre en place une procédure de {theme}.",
+    "La loi n° {loi} précise les modalités de {theme} pour les clercs et collaborateurs.",
+    "Le montant de la prise en charge est fixé à {montant} euros, soit {pct} % de la rémunération.",
+    "L'acte authentique reçu par le notaire est conservé en minute au sein de l'office.",
+    "Les salariés bénéficient d'un droit à la formation financé par l'OPCO.",
+]
+
+# (dossier, poids, gabarits de noms de fichiers)
+FOLDERS = [
+    ('fil-infos', 60, ['fil-info-{num}.pdf']),
+    ('CSN{year}', 15, [
+        'Circulaire N° {year}-{n} du {day} {mois} {year}.pdf',
+        '{year}{mm}{dd} - Avenant n°{avenant} {theme_title}.pdf',
+        'Accord de branche {theme_title} {year}{mm}{dd}.pdf',
+    ]),
+    ('Convention Collective', 8, [
+        '{year}{mm}{dd}_Avenant n°{avenant}_CCN_Modification_art {article}.pdf',
+        'Avenant n°{avenant} - Modification de l\'article {article} sur la {theme_title}.pdf',
+    ]),
+    ('observatoire_immobilier', 4, ['CID{num} Observatoire immobilier {year}.pdf']),
+    ('Assurances', 3, ['Assurances contrat {theme_title} au {dd}_{mm}_{year}.pdf']),
+    ('', 10, [
+        'Guide {theme_title} {year}.pdf',
+        'Fiche pratique {theme_title}.pdf',
+        'd_{yy}-{n3}_version_consolidee_{year}{mm}{dd}.pdf',
+    ]),
+]
+
+
+def _escape_pdf_text(text: str) -> bytes:
+    """Encode une ligne pour un flux de contenu PDF (WinAnsi)."""
+    raw = text.encode('cp1252', errors='replace')
+    return raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """
+    Construit un PDF texte minimal (Helvetica, une ligne par phrase).
+
+    Args:
+        pages: Lignes de texte pour chaque page
+
+    Returns:
+        Contenu binaire du PDF
+    """
+    objects = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects.append(b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(pages))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    for i, lines in enumerate(pages):
+        content_id = page_ids[i] + 1
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        stream = b"BT /F1 10 Tf 14 TL 50 800 Td\n"
+        for line in lines:
+            stream += b"(" + _escape_pdf_text(line) + b") Tj T*\n"
+        stream += b"ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def _random_context(rng: random.Random, index: int) -> dict:
+    """Valeurs aléatoires utilisées dans les noms de fichiers et le texte."""
+    year = rng.randint(2019, 2025)
+    theme = rng.choice(THEMES)
+    return {
+        'num': 100 + index,
+        'year': year,
+        'yy': rng.randint(45, 99),
+        'mm': f"{rng.randint(1, 12):02d}",
+        'dd': f"{rng.randint(1, 28):02d}",
+        'day': rng.randint(1, 28),
+        'mois': rng.choice(MOIS),
+        'n': rng.randint(1, 9),
+        'n3': rng.randint(100, 999),
+        'avenant': rng.randint(30, 99),
+        'article': f"{rng.randint(1, 30)}.{rng.randint(1, 9)}",
+        'theme': theme,
+        'theme_title': theme.capitalize(),
+        'date': f"{rng.randint(1, 28)} {rng.choice(MOIS)} {year}",
+        'decret': f"{year}-{rng.randint(100, 999)}",
+        'loi': f"{year - rng.randint(0, 10)}-{rng.randint(100, 999)}",
+        'montant': f"{rng.randint(1, 99)} {rng.randint(100, 999)}",
+        'pct': rng.randint(1, 60),
+    }
+
+
+def generate_document(rng: random.Random, index: int) -> Tuple[str, str, bytes]:
+    """Tire un dossier, un nom de fichier et un PDF cohérents."""
+    folder_tpl, _, name_tpls = rng.choices(FOLDERS, weights=[f[1] for f in FOLDERS])[0]
+    context = _random_context(rng, index)
+    folder = folder_tpl.format(**context)
+    # Suffixe d'index pour garantir l'unicité des noms (hors fil-infos déjà numérotés)
+    filename = rng.choice(name_tpls).format(**context)
+    if not filename.startswith('fil-info'):
+        filename = filename[:-4] + f" {index}.pdf"
+
+    pages = []
+    for _ in range(rng.randint(1, 3)):
+        lines = []
+        for _ in range(rng.randint(8, 20)):
+            page_context = _random_context(rng, index)
+            page_context['theme'] = context['theme']
+            lines.append(rng.choice(PHRASES).format(**page_context))
+        pages.append(lines)
+
+    return folder, filename, make_pdf(pages)
+
+
+def generate_corpus(target_dir: Path, n_docs: int, seed: int = 42) -> int:
+    """
+    Écrit n_docs PDF synthétiques sous target_dir.
+
+    Args:
+        target_dir: Dossier jouant le rôle de sources_documentaires/
+        n_docs: Nombre de documents
+        seed: Graine aléatoire (corpus reproductible)
+
+    Returns:
+        Nombre de fichiers écrits
+    """
+    rng = random.Random(seed)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for index in range(n_docs):
+        folder, filename, content = generate_document(rng, index)
+        folder_path = target_dir / folder if folder else target_dir
+        folder_path.mkdir(parents=True, exist_ok=True)
+        (folder_path / filename).write_bytes(content)
+        written += 1
+    return written
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Génère un corpus synthétique de PDF notariaux")
+    parser.add_argument('target', type=Path, help="Dossier de destination")
+    parser.add_argument('--docs', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.target.exists() and any(args.target.iterdir()):
+        print(f"❌ Le dossier n'est pas vide : {args.target}")
+        sys.exit(1)
+
+    print(f"📄 Génération de {args.docs} documents dans {args.target}...")
+    written = generate_corpus(args.target, args.docs, args.seed)
+    print(f"✅ {written} fichiers créés")
+
+
+if __name__ == "__main__":
+    main()
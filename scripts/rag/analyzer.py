@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Analyseur de texte français pour les index locaux.
+Normalisation (minuscules, sans accents, apostrophes élidées), mots vides
+et racinisation légère : « licenciements » et « licencier » donnent « licenci ».
+"""
+
+import re
+import unicodedata
+from typing import List
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+a ai au aux avec ce ces cet cette ci comme dans de des du elle elles en et eu
+est etre il ils je la le les leur leurs lui ma mais me meme mes moi mon ne nos
+notre nous on ont ou par pas pour qu que quel quelle quelles quels qui sa sans
+se ses si son sont sur ta te tes toi ton tu un une vos votre vous y c d j l m
+n s t quoi dont ou lorsque quand comment combien pourquoi faut doit peut peuvent
+entre apres avant chez tout tous toute toutes tres plus moins aussi ainsi cela
+ceci celle celui ceux etc
+""".split())
+
+# Suffixes retirés par ordre de longueur décroissante (racine d'au moins 4 lettres)
+SUFFIXES = (
+    'issements', 'issement', 'ements', 'ement', 'ations', 'ation', 'atrices',
+    'atrice', 'ateurs', 'ateur', 'ences', 'ence', 'ances', 'ance', 'iques',
+    'ique', 'istes', 'iste', 'ables', 'able', 'ibles', 'ible', 'euses', 'euse',
+    'eurs', 'eur', 'ites', 'ite', 'ives', 'ive', 'ifs', 'if', 'ees', 'ee',
+    'er', 'ez', 'es', 'e',
+)
+
+
+def strip_accents(text: str) -> str:
+    """Supprime les diacritiques (é → e, ç → c)."""
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def normalize(text: str) -> str:
+    """Minuscules, sans accents, ponctuation remplacée par des espaces."""
+    text = strip_accents(text.lower()).replace('œ', 'oe')
+    text = re.sub(r"\b[cdjlmnst]['’]", ' ', text)
+    return ' '.join(TOKEN_RE.findall(text))
+
+
+def stem(word: str) -> str:
+    """Racinisation légère du français (pluriels et suffixes courants)."""
+    if len(word) <= 4 or word.isdigit():
+        return word
+    if word.endswith('aux'):
+        word = word[:-3] + 'al'
+    elif word.endswith(('s', 'x')):
+        word = word[:-1]
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens normalisés, sans mots vides (les nombres sont conservés)."""
+    return [
+        token for token in normalize(text).split()
+        if token.isdigit() or (len(token) >= 2 and token not in STOPWORDS)
+    ]
+
+
+def analyze(text: str) -> List[str]:
+    """Chaîne complète : normalisation, mots vides, racinisation."""
+    return [stem(token) for token in tokenize(text)]
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Index des articles des textes consolidés (CCN, décrets d_56_220,
+d_67_868, d_71_942).
+Les intitulés « Article X », « Article X.Y », « Article 10 -4-1 »,
+« Article 1er » seuls sur leur ligne découpent le texte intégral
+(document_text) en articles ; chaque article garde sa plage de caractères
+et de pages. Une question « article 15.6 de la CCN » est servie par une
+lecture de dictionnaire (document, numéro) au lieu d'une fenêtre de 512
+tokens ; chunking.chunk_document coupe les chunks aux frontières d'articles.
+"""
+
+import argparse
+import bisect
+import json
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from corpus import INDEX_DIR, load_documents, load_questions
+from document_text import load_all_pages
+from reference_index import ReferenceIndex, find_references
+
+ARTICLES_FILE = INDEX_DIR / "articles.json"
+
+# Textes consolidés (nom de fichier ou titre)
+CONSOLIDATED = re.compile(r'version\s+consolid|\bv\s+conso\b|actualis\w*\s+et\s+consolid', re.IGNORECASE)
+
+# Numéro d'article : 15, 1er, 15.6, 29.3.3, 10 -4-1, 22 -I
+NUMBER = r'(\d+)(?:[ \t]*er\b)?((?:[ \t]?[-.][ \t]?(?:\d+|(?-i:[IVX]+))\b)*)'
+
+# Intitulé seul sur sa ligne, éventuellement suivi d'un titre (« Article 15.6 – Période d'essai »)
+HEADING = re.compile(r'^[ \t]*Article[ \t]+' + NUMBER + r'[ \t]*(?:[–—:][^\n]*|-[ \t]+[^\dIVX\s][^\n]*)?$',
+                     re.IGNORECASE | re.MULTILINE)
+
+# Article cité dans une question
+ARTICLE_REF = re.compile(r'\b(?:articles?|art\.)\s*' + NUMBER.replace('[ \\t]', r'\s'), re.IGNORECASE)
+
+# La convention collective, que les questions nomment sans numéro (« article 15.6 de la CCN »)
+CCN = re.compile(r'\bCCN\b|\bconvention\s+collective\b|\bIDCC\s*2205\b', re.IGNORECASE)
+
+PAGE_SEPARATOR = '\n'
+
+
+def article_number(first: str, rest: str = '') -> str:
+    """"10", " -4-1" → "10-4-1" ; "15", ".6" → "15.6"."""
+    return first + re.sub(r'\s', '', rest)
+
+
+def is_consolidated(metadata: Dict[str, Any]) -> bool:
+    names = f"{metadata.get('nom_fichier') or ''} {metadata.get('metadata', {}).get('titre') or ''}"
+    return bool(CONSOLIDATED.search(names.replace('_', ' ')))
+
+
+def segment_articles(pages: List[str]) -> List[Dict[str, Any]]:
+    """
+    Découpe un texte en articles.
+
+    Args:
+        pages: Texte de chaque page
+
+    Returns:
+        [{article, heading, start, end, page_start, page_end, page_offset}] dans l'ordre du texte ;
+        start / end sur les pages jointes par PAGE_SEPARATOR, page_offset dans la page de début
+    """
+    page_starts = []
+    position = 0
+    for page in pages:
+        page_starts.append(position)
+        position += len(page) + len(PAGE_SEPARATOR)
+    total = max(position - len(PAGE_SEPARATOR), 0)
+
+    segments = []
+    for page_number, page in enumerate(pages, start=1):
+        for match in HEADING.finditer(page):
+            segments.append({
+                'article': article_number(match.group(1), match.group(2)),
+                'heading': ' '.join(match.group(0).split()),
+                'start': page_starts[page_number - 1] + match.start(),
+                'page_start': page_number,
+                'page_offset': match.start(),
+            })
+    for segment, following in zip(segments, segments[1:] + [None]):
+        segment['end'] = following['start'] if following else total
+        segment['page_end'] = bisect.bisect_right(page_starts, max(segment['end'] - 1, segment['start']))
+    return segments
+
+
+class ArticleIndex:
+    """(document_id, numéro d'article) → plage de l'article."""
+
+    def __init__(self, articles: Dict[str, List[Dict[str, Any]]], ccn: Optional[List[str]] = None):
+        self.articles = articles
+        self.ccn = ccn or []
+        self.by_key: Dict[tuple, Dict[str, Any]] = {}
+        self.documents_of: Dict[str, List[str]] = {}
+        for document_id, segments in articles.items():
+            for segment in segments:
+                # Numéro répété (annexes, arrêtés joints) : la première occurrence fait foi
+                key = (document_id, segment['article'])
+                if key not in self.by_key:
+                    self.by_key[key] = segment
+                    self.documents_of.setdefault(segment['article'], []).append(document_id)
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]], pages: Dict[str, List[str]]) -> 'ArticleIndex':
+        """Segmente les textes consolidés du corpus."""
+        consolidated = [metadata for metadata in documents if is_consolidated(metadata)]
+        return cls({
+            metadata['document_id']: segment_articles(pages.get(metadata['document_id'], []))
+            for metadata in consolidated
+        }, ccn=[
+            metadata['document_id'] for metadata in consolidated
+            if CCN.search(f"{metadata.get('nom_fichier') or ''} {metadata.get('metadata', {}).get('titre') or ''}"
+                          .replace('_', ' '))
+        ])
+
+    def save(self, path: Path = ARTICLES_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'articles': self.articles,
+                'ccn': self.ccn,
+            }, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: Path = ARTICLES_FILE) -> 'ArticleIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            return cls(data['articles'], data.get('ccn'))
+
+    def get(self, document_id: str, article: str) -> Optional[Dict[str, Any]]:
+        """Plage d'un article ("15.6", "10-1", "1er") ou None."""
+        match = ARTICLE_REF.match(f"article {article}")
+        number = article_number(match.group(1), match.group(2)) if match else article
+        return self.by_key.get((document_id, number))
+
+    def text(self, segment: Dict[str, Any], pages: List[str]) -> str:
+        """Texte de l'article à partir des pages du document."""
+        return PAGE_SEPARATOR.join(pages)[segment['start']:segment['end']]
+
+    def cited_texts(self, question: str, references: ReferenceIndex) -> Optional[List[str]]:
+        """
+        Textes nommés par une question : références résolues et CCN.
+
+        Returns:
+            document_ids (vide si les textes nommés sont hors corpus), None si la question ne nomme aucun texte
+        """
+        named = bool(find_references(question))
+        document_ids = dict.fromkeys(references.resolve(question)) if named else {}
+        if CCN.search(question):
+            named = True
+            document_ids.update(dict.fromkeys(self.ccn))
+        return list(document_ids) if named else None
+
+    def lookup(self, question: str, document_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Articles cités dans une question.
+
+        Args:
+            question: Question (« Que dit l'article 10-1 du décret 67-868 ? »)
+            document_ids: Textes nommés (cited_texts) ; None : la question ne nomme aucun texte,
+                tous les textes indexés sont candidats. Un texte nommé sans cet article ne renvoie rien.
+
+        Returns:
+            [{document_id, article, page_start, page_end, start, end}]
+        """
+        hits = []
+        for match in ARTICLE_REF.finditer(question):
+            number = article_number(match.group(1), match.group(2))
+            candidates = self.documents_of.get(number, [])
+            if document_ids is not None:
+                candidates = [d for d in candidates if d in document_ids]
+            for document_id in candidates:
+                segment = self.by_key[(document_id, number)]
+                hits.append({'document_id': document_id, 'article': number,
+                             **{k: segment[k] for k in ('page_start', 'page_end', 'start', 'end')}})
+        return hits
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Construit l'index des articles des textes consolidés")
+    parser.add_argument('--question', help="Question citant un article")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("INDEX DES ARTICLES")
+    print("=" * 70)
+
+    documents = load_documents()
+    consolidated = [d for d in documents if is_consolidated(d)]
+    start = time.perf_counter()
+    pages = load_all_pages(consolidated, workers=1)
+    index = ArticleIndex.build(consolidated, pages)
+    index.save()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"✅ {len(index.by_key)} articles dans {len(consolidated)} textes consolidés "
+          f"({elapsed_ms:.1f} ms) → {ARTICLES_FILE}")
+    for document_id, segments in index.articles.items():
+        if segments:
+            print(f"   📄 {document_id} : {len(segments)} articles "
+                  f"({segments[0]['article']} … {segments[-1]['article']})")
+        else:
+            print(f"   ⚠️  {document_id} : aucun article (texte source absent ou illisible)")
+
+    references = ReferenceIndex.build(documents)
+    questions = [args.question] if args.question else [q['question'] for q in load_questions()]
+    start = time.perf_counter()
+    results = [index.lookup(question, index.cited_texts(question, references)) for question in questions]
+    per_query_us = (time.perf_counter() - start) * 1e6 / max(len(questions), 1)
+    print(f"⏱️  {per_query_us:.1f} µs par question")
+
+    if args.question:
+        for hit in results[0]:
+            segment = index.get(hit['document_id'], hit['article'])
+            text = index.text(segment, pages[hit['document_id']])
+            print(f"\n🔎 Article {hit['article']} — {hit['document_id']} (p. {hit['page_start']}-{hit['page_end']})")
+            print(f"   {' '.join(text.split())[:300]}")
+
+
+if __name__ == "__main__":
+    main()
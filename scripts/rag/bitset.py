@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Ensembles de row ids sous forme de bitsets (un bit par ligne).
+Stockés en octets NumPy (ordre des bits little-endian), combinables par
+&, |, ~ et -, et sérialisés compressés (zlib) pour les index sur disque.
+Un Bitset sert directement de pré-filtre : `row in bitset` pour BM25,
+bitset.to_mask() pour l'index vectoriel.
+"""
+
+import base64
+import zlib
+from typing import Iterable
+
+import numpy as np
+
+# Nombre de bits à 1 pour chaque valeur d'octet
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class Bitset:
+    """Bitset de taille fixe sur les row ids 0..size-1."""
+
+    __slots__ = ('size', 'bits')
+
+    def __init__(self, size: int, bits: np.ndarray = None):
+        self.size = size
+        self.bits = bits if bits is not None else np.zeros((size + 7) // 8, dtype=np.uint8)
+
+    @classmethod
+    def from_rows(cls, size: int, rows: Iterable[int]) -> 'Bitset':
+        mask = np.zeros(size, dtype=bool)
+        mask[np.fromiter(rows, dtype=np.int64)] = True
+        return cls.from_mask(mask)
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> 'Bitset':
+        mask = np.asarray(mask, dtype=bool)
+        return cls(len(mask), np.packbits(mask, bitorder='little'))
+
+    @classmethod
+    def full(cls, size: int) -> 'Bitset':
+        return ~cls(size)
+
+    def to_mask(self) -> np.ndarray:
+        """Masque booléen (un élément par ligne)."""
+        return np.unpackbits(self.bits, count=self.size, bitorder='little').astype(bool)
+
+    def rows(self) -> np.ndarray:
+        """Row ids présents, croissants."""
+        return np.flatnonzero(self.to_mask())
+
+    def count(self) -> int:
+        return int(_POPCOUNT[self.bits].sum())
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __contains__(self, row: int) -> bool:
+        return 0 <= row < self.size and bool(self.bits[row >> 3] >> (row & 7) & 1)
+
+    def __iter__(self):
+        return iter(self.rows().tolist())
+
+    def _check(self, other: 'Bitset'):
+        if other.size != self.size:
+            raise ValueError(f"Bitsets de tailles différentes : {self.size} ≠ {other.size}")
+
+    def __and__(self, other: 'Bitset') -> 'Bitset':
+        self._check(other)
+        return Bitset(self.size, self.bits & other.bits)
+
+    def __or__(self, other: 'Bitset') -> 'Bitset':
+        self._check(other)
+        return Bitset(self.size, self.bits | other.bits)
+
+    def __sub__(self, other: 'Bitset') -> 'Bitset':
+        self._check(other)
+        return Bitset(self.size, self.bits & ~other.bits)
+
+    def __invert__(self) -> 'Bitset':
+        bits = ~self.bits
+        # Les bits au-delà de size restent à 0
+        if self.size % 8:
+            bits[-1] &= (1 << (self.size % 8)) - 1
+        return Bitset(self.size, bits)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Bitset) and self.size == other.size and np.array_equal(self.bits, other.bits)
+
+    def __repr__(self) -> str:
+        return f"Bitset({self.count()}/{self.size})"
+
+    def project(self, row_map: np.ndarray) -> 'Bitset':
+        """
+        Bitset sur un autre niveau de lignes (ex. documents → chunks).
+
+        Args:
+            row_map: Pour chaque ligne cible, sa ligne dans self (-1 si aucune)
+        """
+        row_map = np.asarray(row_map)
+        mask = self.to_mask()
+        target = np.zeros(len(row_map), dtype=bool)
+        known = row_map >= 0
+        target[known] = mask[row_map[known]]
+        return Bitset.from_mask(target)
+
+    def dumps(self) -> str:
+        """Sérialisation compressée (zlib + base64)."""
+        return base64.b64encode(zlib.compress(self.bits.tobytes(), 9)).decode('ascii')
+
+    @classmethod
+    def loads(cls, size: int, data: str) -> 'Bitset':
+        bits = np.frombuffer(zlib.decompress(base64.b64decode(data)), dtype=np.uint8).copy()
+        return cls(size, bits)
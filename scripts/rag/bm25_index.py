@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Index inversé BM25 sur les métadonnées documentaires (_metadata/documents).
+Champs indexés : titre, resume, mots_cles, vocabulaire_specifique et
+domaines_juridiques, avec l'analyseur français de analyzer.py.
+Les postings sont stockés dans un fichier binaire compact lu par mmap ;
+une requête renvoie les top-k document_id en quelques millisecondes et
+peut servir de pré-filtre avant la recherche vectorielle.
+"""
+
+import argparse
+import heapq
+import json
+import math
+import mmap
+import sys
+import time
+from array import array
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Container, Callable
+
+from analyzer import analyze
+from corpus import INDEX_DIR, load_documents, load_questions
+
+BM25_DIR = INDEX_DIR / "bm25"
+
+# Poids des champs (term frequency pondérée, façon BM25F simplifié)
+FIELD_WEIGHTS = {
+    'titre': 3,
+    'mots_cles': 2,
+    'vocabulaire_specifique': 2,
+    'domaines_juridiques': 1,
+    'resume': 1,
+}
+
+K1 = 1.2
+B = 0.75
+
+
+def document_fields(metadata: Dict[str, Any]) -> Dict[str, str]:
+    """Extrait le texte de chaque champ indexé d'une métadonnée."""
+    vocab_parts = []
+    for term in metadata.get('vocabulaire_specifique', []):
+        vocab_parts.append(term.get('terme', ''))
+        vocab_parts.extend(term.get('synonymes', []))
+    return {
+        'titre': metadata.get('metadata', {}).get('titre', ''),
+        'resume': metadata.get('resume', ''),
+        'mots_cles': ' '.join(metadata.get('mots_cles', [])),
+        'vocabulaire_specifique': ' '.join(vocab_parts),
+        'domaines_juridiques': ' '.join(metadata.get('classification', {}).get('domaines_juridiques', [])),
+    }
+
+
+def weighted_term_frequencies(metadata: Dict[str, Any]) -> Counter:
+    """Fréquences de termes pondérées par champ."""
+    frequencies = Counter()
+    for field, text in document_fields(metadata).items():
+        weight = FIELD_WEIGHTS[field]
+        for term in analyze(text):
+            frequencies[term] += weight
+    return frequencies
+
+
+class BM25Index:
+    """
+    Index BM25 persistant.
+
+    Fichiers (dans index_dir) :
+        postings.bin   : [row ids uint32 × P][tf uint16 × P], listes contiguës par terme
+        lexicon.json   : terme → [offset, df]
+        documents.json : document_id par row id, longueurs, paramètres
+    """
+
+    def __init__(self, index_dir: Path, doc_ids: List[str], doc_lengths: List[int],
+                 lexicon: Dict[str, List[int]], total_postings: int,
+                 k1: float = K1, b: float = B):
+        self.index_dir = index_dir
+        self.doc_ids = doc_ids
+        self.doc_lengths = doc_lengths
+        self.lexicon = lexicon
+        self.k1 = k1
+        self.b = b
+        self.avgdl = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+        # Normalisation de longueur précalculée par document
+        self._norms = [
+            k1 * (1 - b + b * (length / self.avgdl if self.avgdl else 0.0))
+            for length in doc_lengths
+        ]
+        self._row_by_id = {doc_id: row for row, doc_id in enumerate(doc_ids)}
+        # Expansion de requête optionnelle (synonyms.SynonymExpander)
+        self.expander = None
+
+        self._file = open(index_dir / "postings.bin", 'rb')
+        if total_postings:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(self._mmap)
+            self._rows = view[:4 * total_postings].cast('I')
+            self._tfs = view[4 * total_postings:6 * total_postings].cast('H')
+        else:
+            self._mmap = None
+            self._rows = self._tfs = []
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]], index_dir: Path = BM25_DIR,
+              frequencies: Callable[[Dict[str, Any]], Counter] = weighted_term_frequencies,
+              id_key: str = 'document_id') -> 'BM25Index':
+        """
+        Construit et écrit l'index à partir des métadonnées (ordre = row ids).
+
+        Args:
+            documents: Métadonnées triées (corpus.load_documents())
+            index_dir: Dossier de destination
+            frequencies: Fréquences de termes d'un élément (autres unités que
+                les documents, ex. chunks)
+            id_key: Clé de l'identifiant des éléments
+
+        Returns:
+            Index chargé
+        """
+        index_dir.mkdir(parents=True, exist_ok=True)
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_lengths = []
+        for row, metadata in enumerate(documents):
+            term_frequencies = frequencies(metadata)
+            doc_lengths.append(sum(term_frequencies.values()))
+            for term, tf in term_frequencies.items():
+                postings.setdefault(term, []).append((row, min(tf, 0xFFFF)))
+
+        rows = array('I')
+        tfs = array('H')
+        lexicon = {}
+        for term in sorted(postings):
+            entries = postings[term]
+            lexicon[term] = [len(rows), len(entries)]
+            rows.extend(row for row, _ in entries)
+            tfs.extend(tf for _, tf in entries)
+
+        if sys.byteorder != 'little':
+            rows.byteswap()
+            tfs.byteswap()
+        with open(index_dir / "postings.bin", 'wb') as f:
+            rows.tofile(f)
+            tfs.tofile(f)
+
+        with open(index_dir / "lexicon.json", 'w', encoding='utf-8') as f:
+            json.dump(lexicon, f, ensure_ascii=False, separators=(',', ':'))
+
+        with open(index_dir / "documents.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'k1': K1,
+                'b': B,
+                'field_weights': FIELD_WEIGHTS,
+                'total_postings': len(rows),
+                'doc_ids': [d[id_key] for d in documents],
+                'doc_lengths': doc_lengths,
+            }, f, ensure_ascii=False)
+
+        return cls.load(index_dir)
+
+    @classmethod
+    def load(cls, index_dir: Path = BM25_DIR) -> 'BM25Index':
+        """Ouvre un index existant (postings en mmap)."""
+        with open(index_dir / "documents.json", 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        with open(index_dir / "lexicon.json", 'r', encoding='utf-8') as f:
+            lexicon = json.load(f)
+        return cls(index_dir, info['doc_ids'], info['doc_lengths'], lexicon,
+                   info['total_postings'], info['k1'], info['b'])
+
+    def close(self):
+        self._rows = self._tfs = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def row_of(self, document_id: str) -> Optional[int]:
+        return self._row_by_id.get(document_id)
+
+    def idf(self, df: int) -> float:
+        n = len(self.doc_ids)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def score_terms(self, terms: List[str], candidates: Optional[Container[int]] = None,
+                    term_weights: Optional[Dict[str, float]] = None) -> Dict[int, float]:
+        """
+        Scores BM25 par row id pour des termes déjà analysés.
+
+        Args:
+            terms: Termes analysés de la requête
+            candidates: Row ids autorisés (pré-filtre facettes/dates), None = tous
+            term_weights: Poids optionnels par terme (expansion de requête)
+
+        Returns:
+            Dictionnaire row id → score
+        """
+        scores: Dict[int, float] = {}
+        k1 = self.k1
+        norms = self._norms
+        rows = self._rows
+        tfs = self._tfs
+        for term, query_tf in Counter(terms).items():
+            entry = self.lexicon.get(term)
+            if entry is None:
+                continue
+            offset, df = entry
+            weight = self.idf(df) * query_tf
+            if term_weights:
+                weight *= term_weights.get(term, 1.0)
+            for i in range(offset, offset + df):
+                row = rows[i]
+                if candidates is not None and row not in candidates:
+                    continue
+                tf = tfs[i]
+                scores[row] = scores.get(row, 0.0) + weight * tf * (k1 + 1) / (tf + norms[row])
+        return scores
+
+    def search_rows(self, query: str, k: int = 10,
+                    candidates: Optional[Container[int]] = None) -> List[Tuple[int, float]]:
+        """Top-k (row id, score) pour une requête en texte libre."""
+        if self.expander is not None:
+            terms, weights = self.expander.expand_terms(query)
+            scores = self.score_terms(terms, candidates, weights)
+        else:
+            scores = self.score_terms(analyze(query), candidates)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def search(self, query: str, k: int = 10,
+               candidates: Optional[Container[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k documents pour une requête.
+
+        Returns:
+            Liste de {'documentId', 'score'} triée par score décroissant
+        """
+        return [
+            {'documentId': self.doc_ids[row], 'score': score}
+            for row, score in self.search_rows(query, k, candidates)
+        ]
+
+    def prefilter(self, query: str, k: int = 100,
+                  candidates: Optional[Container[int]] = None) -> List[str]:
+        """Document_id candidats à passer à la recherche vectorielle."""
+        return [self.doc_ids[row] for row, _ in self.search_rows(query, k, candidates)]
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Construit l'index BM25 des métadonnées")
+    parser.add_argument('--query', help="Requête de test après construction")
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("INDEX BM25 DES MÉTADONNÉES")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    documents = load_documents()
+    index = BM25Index.build(documents)
+    elapsed = time.perf_counter() - start
+    size_kb = (BM25_DIR / "postings.bin").stat().st_size / 1024
+    print(f"✅ {len(index)} documents, {len(index.lexicon)} termes, postings {size_kb:.1f} Ko "
+          f"({elapsed:.2f} s) → {BM25_DIR}")
+
+    queries = [args.query] if args.query else [q['question'] for q in load_questions()]
+    start = time.perf_counter()
+    for query in queries:
+        results = index.search(query, args.k)
+    per_query_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+    print(f"⏱️  {per_query_ms:.3f} ms par requête ({len(queries)} requêtes)")
+
+    if args.query:
+        for rank, result in enumerate(results, 1):
+            print(f"  {rank:2d}. {result['score']:6.2f}  {result['documentId']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Découpage des documents en chunks pour les embeddings et l'index vectoriel.
+Les chunks suivent les paragraphes, dans un budget de tokens estimé, avec
+un recouvrement entre chunks consécutifs. Chaque chunk garde sa plage de
+pages et un chunkId stable (document_id#numéro). Dans les textes
+consolidés, un chunk ne chevauche jamais deux articles (article_index).
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+from article_index import is_consolidated, segment_articles
+
+MAX_TOKENS = 512
+OVERLAP_TOKENS = 64
+
+PARAGRAPH_SPLIT = re.compile(r'\n\s*\n')
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?;])\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation du nombre de tokens (≈ 4 caractères par token en français)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def normalize_whitespace(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def split_units(text: str, max_tokens: int) -> List[str]:
+    """Paragraphes, redécoupés en phrases (puis en mots) s'ils dépassent le budget."""
+    units = []
+    for paragraph in PARAGRAPH_SPLIT.split(text):
+        paragraph = normalize_whitespace(paragraph)
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append(paragraph)
+            continue
+        for sentence in SENTENCE_SPLIT.split(paragraph):
+            if estimate_tokens(sentence) <= max_tokens:
+                units.append(sentence)
+                continue
+            words = sentence.split()
+            step = max(1, max_tokens * 4 // 7)
+            units.extend(' '.join(words[i:i + step]) for i in range(0, len(words), step))
+    return units
+
+
+def chunk_pages(document_id: str, document_path: str, pages: List[str],
+                max_tokens: int = MAX_TOKENS, overlap_tokens: int = OVERLAP_TOKENS,
+                articles: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Découpe les pages d'un document en chunks.
+
+    Args:
+        document_id: Identifiant du document
+        document_path: Chemin du fichier source (documentPath)
+        pages: Texte de chaque page
+        max_tokens: Budget de tokens par chunk
+        overlap_tokens: Tokens repris du chunk précédent
+        articles: Articles du texte (article_index.segment_articles) : chaque
+            article commence un nouveau chunk, sans recouvrement avec le précédent
+
+    Returns:
+        Liste de {chunkId, documentId, documentPath, text, page_start, page_end}
+        (+ article si articles est fourni)
+    """
+    starts: Dict[int, List[tuple]] = {}
+    for article in articles or []:
+        starts.setdefault(article['page_start'], []).append((article['page_offset'], article['article']))
+
+    units = []
+    for page_number, page in enumerate(pages, 1):
+        # Page coupée aux débuts d'articles : (texte, article commencé ou None)
+        offsets = [(0, None)] + starts.get(page_number, [])
+        bounds = [offset for offset, _ in offsets[1:]] + [len(page)]
+        for (offset, article), end in zip(offsets, bounds):
+            for i, unit in enumerate(split_units(page[offset:end], max_tokens)):
+                units.append((unit, page_number, article if i == 0 else None))
+
+    chunks = []
+    current: List[tuple] = []
+    current_tokens = 0
+    current_article = None
+
+    def flush():
+        chunk = {
+            'chunkId': f"{document_id}#{len(chunks):04d}",
+            'documentId': document_id,
+            'documentPath': document_path,
+            'text': ' '.join(unit for unit, _ in current),
+            'page_start': current[0][1],
+            'page_end': current[-1][1],
+        }
+        if articles is not None:
+            chunk['article'] = current_article
+        chunks.append(chunk)
+
+    for unit, page_number, article in units:
+        tokens = estimate_tokens(unit)
+        if article is not None:
+            if current:
+                flush()
+                current, current_tokens = [], 0
+            current_article = article
+        elif current and current_tokens + tokens > max_tokens:
+            flush()
+            # Recouvrement : dernières unités du chunk précédent
+            kept, kept_tokens = [], 0
+            for previous in reversed(current):
+                previous_tokens = estimate_tokens(previous[0])
+                if kept_tokens + previous_tokens > overlap_tokens:
+                    break
+                kept.insert(0, previous)
+                kept_tokens += previous_tokens
+            current, current_tokens = kept, kept_tokens
+        current.append((unit, page_number))
+        current_tokens += tokens
+    if current:
+        flush()
+    return chunks
+
+
+def chunk_document(metadata: Dict[str, Any], pages: List[str], **kwargs) -> List[Dict[str, Any]]:
+    """Chunks d'un document à partir de ses métadonnées et de ses pages (articles des textes consolidés)."""
+    if 'articles' not in kwargs and is_consolidated(metadata):
+        kwargs['articles'] = segment_articles(pages)
+    return chunk_pages(metadata['document_id'], metadata['fichier'], pages, **kwargs)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Graphe des citations extrait du texte intégral de tout le corpus.
+Contrairement à enrich_metadata.extract_references (5 premières pages,
+5 articles / 3 décrets / 3 lois au plus), chaque page du cache
+document_text est parcourue une fois par un extracteur compilé (une seule
+expression régulière pour toutes les sortes de citations) : articles,
+codes, décrets, lois, ordonnances, avenants, circulaires, fil-info.
+Chaque citation est gardée avec sa page et ses positions ; celles qui
+désignent un document du corpus sont résolues par reference_index.
+L'extraction tourne en parallèle (un processus par CPU) ; le graphe
+pondéré (nombre de citations par paire de documents) est rangé en CSR.
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from corpus import INDEX_DIR, load_documents
+from document_text import load_pages
+from reference_index import NUMERO, REFERENCE_PATTERNS, ReferenceIndex, enumerated_numbers, reference_name
+
+CITATIONS_FILE = INDEX_DIR / "citations.jsonl"
+CITATION_GRAPH_FILE = INDEX_DIR / "citation_graph.npz"
+
+LEGAL_KINDS = ('article', 'code', 'decret', 'loi', 'ordonnance')
+INTERNAL_KINDS = ('avenant', 'circulaire', 'fil_info')
+
+CODES = (r'civil|p[ée]nal|du\s+travail|de\s+commerce|g[ée]n[ée]ral\s+des\s+imp[ôo]ts|de\s+la\s+consommation'
+         r'|mon[ée]taire\s+et\s+financier|de\s+proc[ée]dure\s+civile|de\s+la\s+s[ée]curit[ée]\s+sociale'
+         r'|de\s+l[’\']urbanisme|de\s+la\s+construction\s+et\s+de\s+l[’\']habitation|rural|de\s+d[ée]ontologie')
+
+# (sorte, motif dont le groupe 1 est le numéro ou le nom cité)
+CITATION_PATTERNS = [
+    ('article', r'\b(?:articles?|art\.)\s*([LRD]\.?\s?\d+(?:[-.]\d+)*|\d+(?:\.\d+)*(?:\s(?:bis|ter)\b)?)'),
+    ('code', r'\bcode\s+(' + CODES + r')\b'),
+    ('ordonnance', r'\bordonnance\s*' + NUMERO + r'(\d{2,4}-\d+)\b'),
+] + [
+    # Motifs de reference_index, sauf ceux ancrés en début de nom de fichier
+    (kind, pattern.pattern) for kind, pattern in REFERENCE_PATTERNS if not pattern.pattern.startswith('^')
+]
+
+# Extracteur compilé : une alternative nommée par motif, un seul passage par page
+EXTRACTOR = re.compile('|'.join(f'(?P<c{i}>{pattern})' for i, (_, pattern) in enumerate(CITATION_PATTERNS)),
+                       re.IGNORECASE)
+# Alternative → (sorte, numéro du groupe capturant le numéro)
+ALTERNATIVES = {f'c{i}': (kind, EXTRACTOR.groupindex[f'c{i}'] + 1) for i, (kind, _) in enumerate(CITATION_PATTERNS)}
+
+# "L. 1234-5" → "L1234-5"
+ARTICLE_PREFIX = re.compile(r'^([LRD])\.?\s?')
+
+
+def citation_name(kind: str, value: str) -> str:
+    """Forme canonique : "art. L. 1234-5" → "Article L1234-5", "code  du travail" → "Code du travail"."""
+    if kind == 'article':
+        number = ARTICLE_PREFIX.sub(r'\1', value.upper()).replace(' BIS', ' bis').replace(' TER', ' ter')
+        return f"Article {number}"
+    if kind == 'code':
+        return f"Code {' '.join(value.split()).lower()}"
+    if kind == 'ordonnance':
+        year, number = re.findall(r'\d+', value)[:2]
+        return f"Ordonnance {year}-{int(number)}"
+    return reference_name(kind, value)
+
+
+def extract_citations(pages: List[str]) -> List[Tuple[str, str, int, int, int]]:
+    """
+    Citations de toutes les pages.
+
+    Returns:
+        Liste de (sorte, nom canonique, page, début, fin), positions dans le texte de la page
+    """
+    citations = []
+    for page_number, page in enumerate(pages, start=1):
+        # Même longueur : les positions restent celles du texte d'origine
+        text = page.replace('_', ' ')
+        for match in EXTRACTOR.finditer(text):
+            kind, group = ALTERNATIVES[match.lastgroup]
+            citations.append((kind, citation_name(kind, match.group(group)), page_number,
+                              match.start(), match.end()))
+            # « avenants 55, 56 et 58 » : une citation par numéro
+            for start, end, numero in enumerated_numbers(kind, text, match.end()):
+                citations.append((kind, citation_name(kind, numero), page_number, start, end))
+    return citations
+
+
+def extract_document(metadata: Dict[str, Any]) -> Tuple[str, List[tuple], int]:
+    """Travail d'un processus : (document_id, citations, nombre de pages)."""
+    pages = load_pages(metadata)
+    return metadata['document_id'], extract_citations(pages), len(pages)
+
+
+def extract_corpus(documents: List[Dict[str, Any]], references: ReferenceIndex,
+                   output: Path = CITATIONS_FILE, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Extraction parallèle sur tout le corpus, écrite au fil de l'eau (une ligne JSON par document).
+
+    Args:
+        documents: Métadonnées triées (corpus.load_documents())
+        references: Résolution des citations vers les document_ids
+        output: Fichier JSONL des citations
+        workers: Processus d'extraction (défaut : nb de CPU)
+
+    Returns:
+        {edges: Counter((source, cible) → poids), external: Counter(nom → nb), kinds, pages, citations}
+    """
+    workers = workers or os.cpu_count() or 1
+    # Lots assez gros pour amortir l'aller-retour entre processus sur un grand corpus
+    chunksize = max(4, len(documents) // (workers * 16))
+    edges: Counter = Counter()
+    external: Counter = Counter()
+    kinds: Counter = Counter()
+    pages = 0
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        for document_id, citations, n_pages in pool.map(extract_document, documents, chunksize=chunksize):
+            pages += n_pages
+            rows = []
+            for kind, name, page, start, end in citations:
+                kinds[kind] += 1
+                targets = references.documents(name)
+                if targets:
+                    edges.update((document_id, target) for target in targets if target != document_id)
+                else:
+                    external[name] += 1
+                rows.append({'kind': kind, 'name': name, 'page': page, 'start': start, 'end': end,
+                             'document_ids': targets})
+            f.write(json.dumps({'document_id': document_id, 'citations': rows}, ensure_ascii=False) + '\n')
+
+    return {'edges': edges, 'external': external, 'kinds': kinds, 'pages': pages,
+            'citations': sum(kinds.values())}
+
+
+def weighted_csr(n_rows: int, sources: np.ndarray, targets: np.ndarray, weights: np.ndarray):
+    """Arêtes pondérées → (indptr, indices, poids), voisins triés par ligne."""
+    order = np.lexsort((targets, sources))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n_rows), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32), weights[order].astype(np.int32)
+
+
+class CitationGraph:
+    """Citations entre documents du corpus en CSR, dans les deux sens, pondérées."""
+
+    def __init__(self, document_ids: List[str], arrays: Dict[str, np.ndarray]):
+        self.document_ids = document_ids
+        self.row_of = {document_id: row for row, document_id in enumerate(document_ids)}
+        self.arrays = arrays
+
+    @classmethod
+    def build(cls, document_ids: List[str], edges: Counter) -> 'CitationGraph':
+        row_of = {document_id: row for row, document_id in enumerate(document_ids)}
+        triples = np.array([(row_of[s], row_of[t], w) for (s, t), w in edges.items()],
+                           dtype=np.int64).reshape(-1, 3)
+        arrays: Dict[str, np.ndarray] = {}
+        n = len(document_ids)
+        arrays['indptr'], arrays['indices'], arrays['weights'] = weighted_csr(
+            n, triples[:, 0], triples[:, 1], triples[:, 2])
+        arrays['in_indptr'], arrays['in_indices'], arrays['in_weights'] = weighted_csr(
+            n, triples[:, 1], triples[:, 0], triples[:, 2])
+        return cls(document_ids, arrays)
+
+    def save(self, path: Path = CITATION_GRAPH_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, document_ids=np.array(self.document_ids, dtype=str), **self.arrays)
+
+    @classmethod
+    def load(cls, path: Path = CITATION_GRAPH_FILE) -> 'CitationGraph':
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files if name != 'document_ids'}
+            return cls(data['document_ids'].tolist(), arrays)
+
+    def _slice(self, prefix: str, document_id: str) -> List[Tuple[str, int]]:
+        row = self.row_of[document_id]
+        indptr = self.arrays[f'{prefix}indptr']
+        span = slice(indptr[row], indptr[row + 1])
+        return [(self.document_ids[r], w) for r, w in zip(self.arrays[f'{prefix}indices'][span].tolist(),
+                                                          self.arrays[f'{prefix}weights'][span].tolist())]
+
+    def cites(self, document_id: str) -> List[Tuple[str, int]]:
+        """Documents cités par document_id, avec le nombre de citations."""
+        return self._slice('', document_id)
+
+    def cited_by(self, document_id: str) -> List[Tuple[str, int]]:
+        """Documents qui citent document_id, avec le nombre de citations."""
+        return self._slice('in_', document_id)
+
+    def edge_count(self) -> int:
+        return len(self.arrays['indices'])
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Extrait les citations du texte intégral et construit leur graphe")
+    parser.add_argument('--workers', type=int, default=None, help="Processus d'extraction (défaut : nb de CPU)")
+    parser.add_argument('--document', help="document_id dont afficher les citations")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("GRAPHE DES CITATIONS")
+    print("=" * 70)
+
+    documents = load_documents()
+    references = ReferenceIndex.build(documents)
+    start = time.perf_counter()
+    result = extract_corpus(documents, references, workers=args.workers)
+    graph = CitationGraph.build([d['document_id'] for d in documents], result['edges'])
+    graph.save()
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {result['citations']} citations dans {result['pages']} pages de {len(documents)} documents "
+          f"en {elapsed:.1f} s → {CITATIONS_FILE}")
+    print(f"   {', '.join(f'{kind} {n}' for kind, n in result['kinds'].most_common())}")
+    resolved = result['citations'] - sum(result['external'].values())
+    print(f"🕸️  {graph.edge_count()} arêtes entre documents ({resolved} citations résolues) → {CITATION_GRAPH_FILE}")
+    rate = len(documents) / elapsed if elapsed else 0.0
+    print(f"⏱️  {rate:.0f} documents/s, soit ~{100_000 / rate / 60:.0f} min pour 100 000 documents" if rate else "")
+
+    print("\n🏆 Documents les plus cités :")
+    cited = np.bincount(graph.arrays['indices'], weights=graph.arrays['weights'], minlength=len(documents))
+    for row in np.argsort(-cited)[:5].tolist():
+        if cited[row]:
+            print(f"   {int(cited[row]):4d}  {graph.document_ids[row]}")
+    print("📄 Textes externes les plus cités :")
+    for name, count in result['external'].most_common(5):
+        print(f"   {count:4d}  {name}")
+
+    if args.document:
+        print(f"\n📄 {args.document}")
+        for document_id, weight in graph.cites(args.document):
+            print(f"   → {document_id} ({weight})")
+        for document_id, weight in graph.cited_by(args.document):
+            print(f"   ← {document_id} ({weight})")
+
+
+if __name__ == "__main__":
+    main()
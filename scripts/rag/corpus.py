@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Accès partagé au corpus pour les index de recherche locaux.
+Chemins du projet et chargement des .metadata.json dans un ordre stable :
+la position d'un document dans cette liste est son numéro de ligne (row id)
+dans tous les index (BM25, vecteurs, facettes, temporalité, graphe).
+"""
+
+import json
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+METADATA_DIR = PROJECT_ROOT / "_metadata"
+DOCS_METADATA_DIR = METADATA_DIR / "documents"
+VOCABULARY_FILE = METADATA_DIR / "vocabulaire_notarial.json"
+INDEX_DIR = METADATA_DIR / "index"
+DATASET_PATH = PROJECT_ROOT / "tests" / "datasets" / "chatbot_test_dataset.json"
+
+
+def load_documents(docs_dir: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """
+    Charge toutes les métadonnées, triées par document_id.
+
+    Args:
+        docs_dir: Dossier des .metadata.json (par défaut _metadata/documents)
+
+    Returns:
+        Liste des métadonnées ; l'index dans la liste est le row id du document
+    """
+    docs_dir = docs_dir or DOCS_METADATA_DIR
+    documents = []
+    for filepath in docs_dir.glob("*.metadata.json"):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            documents.append(json.load(f))
+    documents.sort(key=lambda d: d['document_id'])
+    return documents
+
+
+def load_vocabulary(path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Charge le lexique notarial (vocabulaire_notarial.json)."""
+    with open(path or VOCABULARY_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_questions(path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Charge les qa_pairs du dataset de test."""
+    with open(path or DATASET_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f).get('qa_pairs', [])
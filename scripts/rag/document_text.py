@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Cache du texte intégral des documents sources, page par page.
+Chaque PDF est extrait une seule fois dans _metadata/index/text/ ; le cache
+est invalidé quand la taille ou la date du fichier source change. Sert au
+découpage en chunks, aux embeddings et à l'extraction des citations.
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from corpus import INDEX_DIR, PROJECT_ROOT, load_documents
+
+TEXT_DIR = INDEX_DIR / "text"
+
+
+def source_path(metadata: Dict[str, Any]) -> Path:
+    """Chemin absolu du fichier source d'un document."""
+    return PROJECT_ROOT / metadata['fichier']
+
+
+def extract_pages(pdf_path: Path) -> List[str]:
+    """Texte de chaque page d'un PDF (liste vide si illisible)."""
+    from PyPDF2 import PdfReader
+    try:
+        reader = PdfReader(pdf_path)
+        return [page.extract_text() or '' for page in reader.pages]
+    except Exception as e:
+        print(f"   Erreur extraction {pdf_path.name}: {str(e)[:50]}")
+        return []
+
+
+def load_pages(metadata: Dict[str, Any], text_dir: Path = TEXT_DIR) -> List[str]:
+    """
+    Pages du document, depuis le cache ou par extraction.
+
+    Args:
+        metadata: Métadonnées du document (document_id, fichier)
+        text_dir: Dossier du cache
+
+    Returns:
+        Texte de chaque page (vide pour les sources non PDF ou absentes)
+    """
+    source = source_path(metadata)
+    if source.suffix.lower() != '.pdf' or not source.exists():
+        return []
+    stat = source.stat()
+    cache_path = text_dir / f"{metadata['document_id']}.json"
+    if cache_path.exists():
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('size') == stat.st_size and cached.get('mtime_ns') == stat.st_mtime_ns:
+            return cached['pages']
+
+    pages = extract_pages(source)
+    text_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'document_id': metadata['document_id'],
+            'fichier': metadata['fichier'],
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'pages': pages,
+        }, f, ensure_ascii=False)
+    return pages
+
+
+def load_all_pages(documents: List[Dict[str, Any]], workers: Optional[int] = None) -> Dict[str, List[str]]:
+    """Pages de tous les documents (extractions manquantes en parallèle)."""
+    if workers == 1:
+        return {d['document_id']: load_pages(d) for d in documents}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pages = pool.map(load_pages, documents, chunksize=4)
+        return {d['document_id']: p for d, p in zip(documents, pages)}
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Remplit le cache du texte intégral des documents")
+    parser.add_argument('--workers', type=int, default=None, help="Processus d'extraction (défaut : nb de CPU)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("CACHE DU TEXTE INTÉGRAL")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    documents = load_documents()
+    all_pages = load_all_pages(documents, args.workers)
+    n_pages = sum(len(p) for p in all_pages.values())
+    n_chars = sum(len(page) for p in all_pages.values() for page in p)
+    empty = sum(1 for p in all_pages.values() if not p)
+    print(f"✅ {len(documents)} documents, {n_pages} pages, {n_chars / 1e6:.1f} M caractères "
+          f"({empty} sans texte) en {time.perf_counter() - start:.1f} s → {TEXT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
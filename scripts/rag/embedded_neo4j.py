@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Implémentation embarquée (en processus) de l'API de recherche de
+neo4j_service, pour faire tourner RAGService hors ligne.
+search_chunks_by_vector, search_chunks_by_fulltext,
+find_paths_between_entities et get_relations_from_chunks ont les mêmes
+signatures asynchrones et formats de résultats que le service Neo4j, mais
+s'appuient sur les index locaux : chunks et VectorIndex, BM25 sur le texte
+des chunks, entités du vocabulaire et graphe des relations documentaires.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import time
+from collections import Counter, deque
+from typing import List, Dict, Any, Optional, Tuple
+
+from analyzer import analyze
+from bm25_index import BM25Index
+from corpus import INDEX_DIR, load_documents, load_questions, load_vocabulary
+from ingest_embeddings import CHUNKS_INDEX_DIR
+from neo4j_export import collect_entities, entity_id, load_chunks
+from reference_index import ReferenceIndex
+from relation_graph import RELATIONS, RelationGraph
+from vector_index import VectorIndex
+
+CHUNKS_BM25_DIR = INDEX_DIR / "bm25_chunks"
+CHUNKS_FINGERPRINT_FILE = CHUNKS_BM25_DIR / "chunks.fingerprint"
+
+PATH_LIMIT = 20
+
+
+def chunk_frequencies(chunk: Dict[str, Any]) -> Counter:
+    return Counter(analyze(chunk['text']))
+
+
+def chunks_fingerprint(chunks: List[Dict[str, Any]]) -> str:
+    """
+    Empreinte BLAKE2b des chunkId et textes : les identifiants document_id#NNNN
+    restent les mêmes quand le texte ou les frontières des chunks changent.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk['chunkId'].encode('utf-8') + b'\0' + chunk['text'].encode('utf-8') + b'\0')
+    return digest.hexdigest()
+
+
+def load_chunk_fulltext(chunks: List[Dict[str, Any]]) -> BM25Index:
+    """Index BM25 des chunks, reconstruit si le stock de chunks (identifiants ou textes) a changé."""
+    fingerprint = chunks_fingerprint(chunks)
+    if (CHUNKS_BM25_DIR / "documents.json").exists() and CHUNKS_FINGERPRINT_FILE.exists():
+        if CHUNKS_FINGERPRINT_FILE.read_text(encoding='utf-8').strip() == fingerprint:
+            return BM25Index.load(CHUNKS_BM25_DIR)
+    index = BM25Index.build(chunks, CHUNKS_BM25_DIR, frequencies=chunk_frequencies, id_key='chunkId')
+    CHUNKS_FINGERPRINT_FILE.write_text(fingerprint + '\n', encoding='utf-8')
+    return index
+
+
+class EmbeddedNeo4jService:
+    """Substitut de neo4j_service adossé aux index du dépôt."""
+
+    def __init__(self, documents: List[Dict[str, Any]], chunks: List[Dict[str, Any]],
+                 vocabulary: List[Dict[str, Any]], graph: RelationGraph,
+                 vector_index: Optional[VectorIndex] = None, fulltext_index: Optional[BM25Index] = None,
+                 latency_ms: float = 0.0):
+        """
+        Args:
+            documents: Métadonnées triées (corpus.load_documents())
+            chunks: Stock de chunks (mêmes lignes que vector_index)
+            vocabulary: Vocabulaire notarial global
+            graph: Relations entre documents
+            vector_index: Index vectoriel des chunks (recherche vectorielle vide sinon)
+            fulltext_index: BM25 des chunks (construit si absent)
+            latency_ms: Aller-retour réseau simulé par appel
+        """
+        self.chunks = chunks
+        self.vector_index = vector_index
+        self.fulltext_index = fulltext_index or load_chunk_fulltext(chunks)
+        self.graph = graph
+        self.latency_ms = latency_ms
+        self.document_of_chunk = {c['chunkId']: c['documentId'] for c in chunks}
+        self.titles = {d['document_id']: d.get('metadata', {}).get('titre') or d['document_id'] for d in documents}
+        self.calls: Counter = Counter()
+
+        self.entities, mentions = collect_entities(documents, vocabulary)
+        # Nom ou synonyme normalisé → entité
+        self.entity_by_name: Dict[str, str] = {}
+        for key, entity in self.entities.items():
+            for name in entity['synonymes'] + [entity['nom']]:
+                self.entity_by_name.setdefault(entity_id(name), key)
+            self.entity_by_name[key] = key
+
+        # Graphe non orienté : nœud → [(voisin, type, sens direct ?)]
+        self.adjacency: Dict[tuple, List[Tuple[tuple, str, bool]]] = {}
+        self.entities_of_document: Dict[str, List[str]] = {}
+        for key, document_id in mentions:
+            self._link(('Entity', key), ('Document', document_id), 'MENTIONED_IN')
+            self.entities_of_document.setdefault(document_id, []).append(key)
+        for relation in RELATIONS:
+            for document_id in graph.document_ids:
+                for target in graph.targets(document_id, relation):
+                    self._link(('Document', document_id), ('Document', target), relation.upper())
+
+    def _link(self, start: tuple, end: tuple, rel_type: str):
+        self.adjacency.setdefault(start, []).append((end, rel_type, True))
+        self.adjacency.setdefault(end, []).append((start, rel_type, False))
+
+    @classmethod
+    def load(cls, latency_ms: float = 0.0) -> 'EmbeddedNeo4jService':
+        """Service construit à partir des métadonnées et des index locaux."""
+        documents = load_documents()
+        chunks, _ = load_chunks(documents)
+        vector_index = None
+        if (CHUNKS_INDEX_DIR / "rows.json").exists():
+            vector_index = VectorIndex.load(CHUNKS_INDEX_DIR)
+        graph = RelationGraph.build(documents, resolve=ReferenceIndex.build(documents).resolve)
+        return cls(documents, chunks, load_vocabulary(), graph, vector_index, latency_ms=latency_ms)
+
+    async def _round_trip(self, method: str):
+        self.calls[method] += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    async def search_chunks_by_vector(self, embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+        """Chunks les plus proches (cosinus) : {text, documentPath, documentId, chunkId, score}."""
+        await self._round_trip('search_chunks_by_vector')
+        if self.vector_index is None:
+            return []
+        if len(embedding) != self.vector_index.dim:
+            raise ValueError(f"Dimension de l'embedding {len(embedding)} ≠ index {self.vector_index.dim}")
+        return self.vector_index.search(embedding, limit)
+
+    async def search_chunks_by_fulltext(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Chunks les mieux classés en BM25 sur leur texte."""
+        await self._round_trip('search_chunks_by_fulltext')
+        results = []
+        for row, score in self.fulltext_index.search_rows(query, limit):
+            chunk = self.chunks[row]
+            results.append({
+                'text': chunk['text'],
+                'documentPath': chunk['documentPath'],
+                'documentId': chunk['documentId'],
+                'chunkId': chunk['chunkId'],
+                'score': score,
+            })
+        return results
+
+    def _label(self, node: tuple) -> str:
+        kind, key = node
+        return self.entities[key]['nom'] if kind == 'Entity' else self.titles.get(key, key)
+
+    def _format_path(self, path: List[tuple]) -> str:
+        parts = [f"'{self._label(path[0][0])}'"]
+        for node, rel_type, forward in path[1:]:
+            arrow = f"--[{rel_type}]-->" if forward else f"<--[{rel_type}]--"
+            parts.append(f"{arrow} '{self._label(node)}'")
+        return ' '.join(parts)
+
+    def _shortest_paths(self, source: tuple, target: tuple, max_depth: int, limit: int) -> List[List[tuple]]:
+        """Plus courts chemins (allShortestPaths) entre deux nœuds, au plus max_depth relations."""
+        parents: Dict[tuple, List[tuple]] = {source: []}
+        depth = {source: 0}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            if node == target or depth[node] >= max_depth:
+                continue
+            for neighbor, rel_type, forward in self.adjacency.get(node, []):
+                if neighbor not in depth:
+                    depth[neighbor] = depth[node] + 1
+                    parents[neighbor] = []
+                    queue.append(neighbor)
+                if depth[neighbor] == depth[node] + 1:
+                    parents[neighbor].append((node, rel_type, forward))
+        if target not in depth:
+            return []
+
+        paths = []
+
+        def unwind(node, suffix):
+            if len(paths) >= limit:
+                return
+            if node == source:
+                paths.append([(source, None, None)] + suffix)
+                return
+            for parent, rel_type, forward in parents[node]:
+                unwind(parent, [(node, rel_type, forward)] + suffix)
+
+        unwind(target, [])
+        return paths
+
+    async def find_paths_between_entities(self, entity_names: List[str], max_depth: int = 3) -> List[str]:
+        """
+        Chemins les plus courts entre toutes les paires d'entités nommées.
+
+        Returns:
+            Chemins lisibles, ex. "'Avenant' --[MENTIONED_IN]--> 'Avenant n°55' <--[MENTIONED_IN]-- 'Salaire'"
+        """
+        await self._round_trip('find_paths_between_entities')
+        keys = []
+        for name in entity_names:
+            key = self.entity_by_name.get(entity_id(name))
+            if key and key not in keys:
+                keys.append(key)
+        paths = []
+        for i, first in enumerate(keys):
+            for second in keys[i + 1:]:
+                for path in self._shortest_paths(('Entity', first), ('Entity', second), max_depth,
+                                                 PATH_LIMIT - len(paths)):
+                    paths.append(self._format_path(path))
+                if len(paths) >= PATH_LIMIT:
+                    return paths
+        return paths
+
+    async def get_relations_from_chunks(self, chunk_ids: List[str], limit: int = 10) -> List[Dict[str, str]]:
+        """Relations du graphe autour des documents des chunks : {entite, relation, autre_entite}."""
+        await self._round_trip('get_relations_from_chunks')
+        by_chunk = self.document_of_chunk
+        relations = []
+        for document_id in dict.fromkeys(by_chunk[c] for c in chunk_ids if c in by_chunk):
+            node = ('Document', document_id)
+            for neighbor, rel_type, forward in self.adjacency.get(node, []):
+                start, end = (node, neighbor) if forward else (neighbor, node)
+                relations.append({'entite': self._label(start), 'relation': rel_type, 'autre_entite': self._label(end)})
+                if len(relations) >= limit:
+                    return relations
+        return relations
+
+    def close(self):
+        self.fulltext_index.close()
+
+
+async def demo(service: EmbeddedNeo4jService, questions: List[str]):
+    start = time.perf_counter()
+    for question in questions:
+        await service.search_chunks_by_fulltext(question, 7)
+    fulltext_ms = (time.perf_counter() - start) * 1000 / max(len(questions), 1)
+    print(f"⏱️  search_chunks_by_fulltext : {fulltext_ms:.2f} ms par requête ({len(questions)} questions)")
+
+    if service.vector_index is not None:
+        embedding = service.vector_index.vectors[0].tolist()
+        start = time.perf_counter()
+        hits = await service.search_chunks_by_vector(embedding, 5)
+        print(f"⏱️  search_chunks_by_vector : {(time.perf_counter() - start) * 1000:.2f} ms "
+              f"(1er résultat {hits[0]['chunkId']})")
+    else:
+        print("⚠️  Index vectoriel des chunks absent : search_chunks_by_vector renvoie []")
+
+    hits = await service.search_chunks_by_fulltext(questions[0], 3)
+    print(f"\n🔎 {questions[0]}")
+    for hit in hits:
+        print(f"   {hit['score']:6.2f}  {hit['chunkId']}")
+    relations = await service.get_relations_from_chunks([hit['chunkId'] for hit in hits], 5)
+    for relation in relations:
+        print(f"   - '{relation['entite']}' {relation['relation']} '{relation['autre_entite']}'")
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Service Neo4j embarqué (index locaux)")
+    parser.add_argument('--entities', nargs='+', help="Entités dont chercher les chemins")
+    parser.add_argument('--max-depth', type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("SERVICE NEO4J EMBARQUÉ")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    service = EmbeddedNeo4jService.load()
+    print(f"✅ {len(service.chunks)} chunks, {len(service.entities)} entités, "
+          f"{sum(len(v) for v in service.adjacency.values()) // 2} relations "
+          f"({time.perf_counter() - start:.2f} s)\n")
+
+    questions = [q['question'] for q in load_questions()]
+    asyncio.run(demo(service, questions))
+
+    if args.entities:
+        start = time.perf_counter()
+        paths = asyncio.run(service.find_paths_between_entities(args.entities, args.max_depth))
+        print(f"\n🕸️  {len(paths)} chemins ({(time.perf_counter() - start) * 1000:.2f} ms)")
+        for path in paths:
+            print(f"   {path}")
+    service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Regroupement des chunks en requêtes d'embedding sous budget de tokens.
+Les textes en attente sont empaquetés en lots (nombre d'éléments et tokens
+maximum), envoyés avec une concurrence bornée (asyncio), relancés avec
+backoff exponentiel en cas d'échec, puis réassociés à leur chunkId.
+"""
+
+import asyncio
+import random
+import time
+import urllib.error
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple
+
+from chunking import estimate_tokens
+
+DEFAULT_MAX_ITEMS = 256
+DEFAULT_MAX_TOKENS = 100_000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+
+# Codes HTTP pour lesquels une nouvelle tentative a un sens
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def pack_batches(texts: List[str], max_items: int = DEFAULT_MAX_ITEMS,
+                 max_tokens: int = DEFAULT_MAX_TOKENS,
+                 token_counter: Callable[[str], int] = estimate_tokens) -> List[List[int]]:
+    """
+    Découpe les textes en lots consécutifs respectant les deux budgets.
+
+    Un texte plus long que max_tokens forme un lot à lui seul.
+
+    Returns:
+        Liste de lots (positions dans texts)
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = token_counter(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def is_retryable(error: Exception) -> bool:
+    """Erreurs transitoires (réseau, 429, 5xx)."""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in RETRYABLE_STATUS
+    return isinstance(error, (urllib.error.URLError, TimeoutError, ConnectionError, OSError))
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Délai imposé par l'en-tête Retry-After, s'il existe."""
+    headers = getattr(error, 'headers', None)
+    value = headers.get('Retry-After') if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class EmbeddingBatcher:
+    """
+    Envoi par lots d'une coroutine embed_batch(texts) → vecteurs.
+
+    embed_texts() a la signature attendue par embedding_cache.embed_with_cache ;
+    embed_chunks() renvoie {chunkId: vecteur}.
+    """
+
+    def __init__(self, embed_batch: Callable[[List[str]], Awaitable[List[List[float]]]],
+                 max_items: int = DEFAULT_MAX_ITEMS, max_tokens: int = DEFAULT_MAX_TOKENS,
+                 concurrency: int = DEFAULT_CONCURRENCY, max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_delay: float = 0.5, max_delay: float = 30.0,
+                 token_counter: Callable[[str], int] = estimate_tokens):
+        self.embed_batch = embed_batch
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.token_counter = token_counter
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'texts': 0, 'tokens': 0, 'seconds': 0.0}
+
+    async def _send(self, texts: List[str], semaphore: asyncio.Semaphore) -> List[List[float]]:
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.stats['requests'] += 1
+                    vectors = await self.embed_batch(texts)
+                    if len(vectors) != len(texts):
+                        raise ValueError(f"{len(vectors)} embeddings reçus pour {len(texts)} textes")
+                    return vectors
+                except Exception as e:
+                    if attempt == self.max_retries or not is_retryable(e):
+                        self.stats['failures'] += 1
+                        raise
+                    self.stats['retries'] += 1
+                    delay = retry_after(e)
+                    if delay is None:
+                        delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                    await asyncio.sleep(delay)
+
+    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings de tous les textes, dans l'ordre d'entrée."""
+        start = time.perf_counter()
+        batches = pack_batches(texts, self.max_items, self.max_tokens, self.token_counter)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        responses = await asyncio.gather(*(
+            self._send([texts[i] for i in batch], semaphore) for batch in batches
+        ))
+        vectors: List[Any] = [None] * len(texts)
+        for batch, batch_vectors in zip(batches, responses):
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = vector
+        self.stats['texts'] += len(texts)
+        self.stats['tokens'] += sum(self.token_counter(t) for t in texts)
+        self.stats['seconds'] += time.perf_counter() - start
+        return vectors
+
+    async def embed_chunks(self, chunks: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+        """Embeddings de chunks {chunkId, text}, indexés par chunkId."""
+        vectors = await self.embed_texts([chunk['text'] for chunk in chunks])
+        return {chunk['chunkId']: vector for chunk, vector in zip(chunks, vectors)}
+
+    def throughput(self) -> Tuple[float, float]:
+        """(textes/s, tokens/s) cumulés."""
+        seconds = self.stats['seconds'] or float('nan')
+        return self.stats['texts'] / seconds, self.stats['tokens'] / seconds
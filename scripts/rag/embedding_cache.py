@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Cache persistant des embeddings de chunks (Améliorations #8).
+Clé : (modèle, empreinte du texte normalisé). Un dossier par modèle contient
+keys.bin (empreintes de 16 octets, ajoutées à la suite) et vectors.f32
+(vecteurs float32 dans le même ordre, lus en mmap). Les recherches se font
+par lots ; seuls les textes absents du cache sont envoyés au modèle.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+import numpy as np
+
+from corpus import INDEX_DIR
+
+CACHE_DIR = INDEX_DIR / "embeddings"
+DIGEST_SIZE = 16
+
+# Prix indicatifs OpenAI (USD par million de tokens)
+PRICES_PER_MILLION_TOKENS = {
+    'text-embedding-3-small': 0.02,
+    'text-embedding-3-large': 0.13,
+    'text-embedding-ada-002': 0.10,
+}
+
+
+def normalize_text(text: str) -> str:
+    """Forme canonique d'un chunk : Unicode NFC, espaces compactés."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def text_digest(text: str) -> bytes:
+    """Empreinte BLAKE2b (16 octets) du texte normalisé."""
+    return hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+def estimate_cost(model: str, tokens: int) -> float:
+    """Coût estimé en USD d'un volume de tokens pour ce modèle."""
+    return tokens * PRICES_PER_MILLION_TOKENS.get(model, 0.0) / 1_000_000
+
+
+def model_slug(model: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', model)
+
+
+class EmbeddingCache:
+    """Stockage binaire des embeddings d'un modèle."""
+
+    def __init__(self, model: str, cache_dir: Path = CACHE_DIR):
+        self.model = model
+        self.directory = cache_dir / model_slug(model)
+        self.keys_path = self.directory / "keys.bin"
+        self.vectors_path = self.directory / "vectors.f32"
+        self.meta_path = self.directory / "meta.json"
+        self.dim: Optional[int] = None
+        self._rows: Dict[bytes, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._open()
+
+    def _open(self):
+        if not self.meta_path.exists():
+            return
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            self.dim = json.load(f)['dim']
+        keys = self.keys_path.read_bytes() if self.keys_path.exists() else b''
+        row_bytes = 4 * self.dim
+        n_vectors = self.vectors_path.stat().st_size // row_bytes if self.vectors_path.exists() else 0
+        # Après une interruption, on ne garde que les entrées complètes
+        count = min(len(keys) // DIGEST_SIZE, n_vectors)
+        if len(keys) != count * DIGEST_SIZE or n_vectors != count:
+            # 'ab' recrée un fichier manquant (premier écrit interrompu entre les deux fichiers)
+            for path, size in ((self.keys_path, count * DIGEST_SIZE), (self.vectors_path, count * row_bytes)):
+                with open(path, 'ab') as f:
+                    f.truncate(size)
+        self._rows = {keys[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]: i for i in range(count)}
+        self._vectors = (np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(count, self.dim))
+                         if count else None)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def lookup(self, digests: List[bytes]) -> np.ndarray:
+        """Ligne de chaque empreinte dans le cache (-1 si absente)."""
+        rows = self._rows
+        return np.fromiter((rows.get(d, -1) for d in digests), dtype=np.int64, count=len(digests))
+
+    def get_many(self, texts: List[str]) -> tuple:
+        """
+        Recherche par lot.
+
+        Returns:
+            (vecteurs (N × d) avec des zéros pour les absents ou None si le cache
+            est vide, masque booléen des textes trouvés)
+        """
+        rows = self.lookup([text_digest(t) for t in texts])
+        found = rows >= 0
+        if self._vectors is None:
+            return None, found
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        vectors[found] = self._vectors[rows[found]]
+        return vectors, found
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Ajoute des embeddings (les textes déjà présents sont ignorés)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(texts):
+            return
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'model': self.model, 'dim': self.dim, 'digest': f'blake2b-{DIGEST_SIZE}'}, f)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Dimension {vectors.shape[1]} ≠ {self.dim} pour le modèle {self.model}")
+
+        new_keys, new_rows = [], []
+        for i, text in enumerate(texts):
+            digest = text_digest(text)
+            if digest not in self._rows:
+                self._rows[digest] = len(self._rows)
+                new_keys.append(digest)
+                new_rows.append(i)
+        if not new_keys:
+            return
+        self._vectors = None
+        # Vecteurs d'abord : une clé n'est jamais écrite sans son vecteur
+        with open(self.vectors_path, 'ab') as f:
+            f.write(vectors[new_rows].astype('<f4').tobytes())
+        with open(self.keys_path, 'ab') as f:
+            f.write(b''.join(new_keys))
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                  shape=(len(self._rows), self.dim))
+
+
+async def embed_with_cache(texts: List[str], cache: EmbeddingCache,
+                           embed: Callable[[List[str]], Awaitable[List[List[float]]]],
+                           token_counter: Optional[Callable[[str], int]] = None) -> tuple:
+    """
+    Embeddings de tous les textes, en n'appelant le modèle que pour les absents.
+
+    Args:
+        texts: Textes à vectoriser
+        cache: Cache du modèle
+        embed: Coroutine texts → vecteurs (appel API)
+        token_counter: Estimation des tokens d'un texte (pour le coût évité)
+
+    Returns:
+        (matrice N × d, statistiques hits/misses/coût)
+    """
+    token_counter = token_counter or (lambda text: max(1, len(text) // 4))
+    vectors, found = cache.get_many(texts)
+
+    # Textes manquants, dédoublonnés par empreinte
+    missing: Dict[bytes, str] = {}
+    for text, hit in zip(texts, found):
+        if not hit:
+            missing.setdefault(text_digest(text), text)
+    if missing:
+        miss_texts = list(missing.values())
+        cache.put_many(miss_texts, await embed(miss_texts))
+        vectors, _ = cache.get_many(texts)
+
+    tokens_saved = sum(token_counter(t) for t, hit in zip(texts, found) if hit)
+    tokens_sent = sum(token_counter(t) for t in missing.values())
+    stats: Dict[str, Any] = {
+        'model': cache.model,
+        'texts': len(texts),
+        'hits': int(found.sum()),
+        'misses': int((~found).sum()),
+        'embedded': len(missing),
+        'hit_rate': float(found.mean()) if len(texts) else 0.0,
+        'tokens_saved': tokens_saved,
+        'tokens_sent': tokens_sent,
+        'cost_saved_usd': estimate_cost(cache.model, tokens_saved),
+        'cost_spent_usd': estimate_cost(cache.model, tokens_sent),
+    }
+    if vectors is None:
+        vectors = np.zeros((0, 0), dtype=np.float32)
+    return vectors, stats
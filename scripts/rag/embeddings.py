@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Clients compatibles avec l'API OpenAI : embeddings (POST /embeddings) et
+chat_json (POST /chat/completions, réponse JSON) partagé par les appels LLM
+des scripts (stratégie, raisonnement, entités).
+Bibliothèque standard uniquement (urllib dans un thread) : fonctionne avec
+l'API OpenAI comme avec un serveur local de test.
+"""
+
+import asyncio
+import json
+import os
+import urllib.request
+from typing import List, Dict, Any, Optional
+
+DEFAULT_MODEL = "text-embedding-3-small"
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_BATCH_SIZE = 256
+
+
+def resolve_base_url(base_url: Optional[str] = None) -> str:
+    """base_url explicite, sinon OPENAI_BASE_URL, sinon l'API OpenAI."""
+    return (base_url or os.environ.get('OPENAI_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+
+
+def chat_json(prompt: str, model: str, base_url: Optional[str] = None, api_key: Optional[str] = None,
+              timeout: float = 60.0, temperature: Optional[float] = 0) -> Dict[str, Any]:
+    """
+    Un message utilisateur, réponse au format JSON (appel bloquant : asyncio.to_thread côté async).
+
+    Args:
+        prompt: Contenu du message
+        model: Modèle de chat
+        base_url, api_key: API compatible OpenAI (défaut : OPENAI_BASE_URL, OPENAI_API_KEY)
+        timeout: Délai de la requête HTTP (s)
+        temperature: None pour la valeur par défaut du modèle
+
+    Returns:
+        Contenu de la réponse décodé ({} si ce n'est pas un objet JSON)
+    """
+    body = {
+        'model': model,
+        'messages': [{'role': 'user', 'content': prompt}],
+        'response_format': {'type': 'json_object'},
+    }
+    if temperature is not None:
+        body['temperature'] = temperature
+    request = urllib.request.Request(
+        f"{resolve_base_url(base_url)}/chat/completions",
+        data=json.dumps(body).encode('utf-8'),
+        headers={
+            'Content-Type': 'application/json',
+            'Authorization': f"Bearer {api_key or os.environ.get('OPENAI_API_KEY', '')}",
+        },
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        payload = json.load(response)
+    content = json.loads(payload['choices'][0]['message']['content'])
+    return content if isinstance(content, dict) else {}
+
+
+class OpenAIEmbedder:
+    """Appels /embeddings ; embed(texts) renvoie un vecteur par texte, dans l'ordre."""
+
+    def __init__(self, model: str = DEFAULT_MODEL, base_url: str = None, api_key: str = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, timeout: float = 60.0):
+        self.model = model
+        self.base_url = resolve_base_url(base_url)
+        self.api_key = api_key or os.environ.get('OPENAI_API_KEY', '')
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.requests = 0
+
+    def _post(self, texts: List[str]) -> List[List[float]]:
+        request = urllib.request.Request(
+            f"{self.base_url}/embeddings",
+            data=json.dumps({'model': self.model, 'input': texts}).encode('utf-8'),
+            headers={
+                'Content-Type': 'application/json',
+                'Authorization': f"Bearer {self.api_key}",
+            },
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            payload = json.load(response)
+        self.requests += 1
+        data = sorted(payload['data'], key=lambda item: item['index'])
+        return [item['embedding'] for item in data]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Une requête HTTP pour un lot de textes."""
+        return await asyncio.to_thread(self._post, texts)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings de tous les textes, par lots de batch_size."""
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(await self.embed_batch(texts[start:start + self.batch_size]))
+        return vectors
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Gazetteer compilé des entités notariales, chemin rapide de
+_extract_entities_from_query.
+Compile vocabulaire_notarial.json (termes et synonymes), les références
+propres des documents (reference_index : avenants, circulaires, fil-info,
+décrets), les sigles présents dans les titres (CSN, CRIDON, RPN) et
+les titres courts en une table tokens → entités. Une question est analysée
+en un seul passage de plus longue correspondance, en quelques µs ; les
+références absentes du corpus sont reconnues par motif. Le LLM n'est
+appelé que pour les fragments résiduels (noms propres, sigles inconnus),
+avec un cache des réponses.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple, Set
+
+from analyzer import analyze, normalize
+from corpus import INDEX_DIR, load_documents, load_questions, load_vocabulary
+from document_text import load_all_pages
+from embeddings import chat_json, resolve_base_url
+from reference_index import document_references, find_references
+from synonyms import sources_fingerprint
+
+GAZETTEER_FILE = INDEX_DIR / "gazetteer.json"
+
+DEFAULT_LLM_MODEL = "gpt-4.1-nano"
+CACHE_SIZE = 10_000
+
+# Au-delà, un titre n'est jamais tapé tel quel dans une question
+MAX_TITLE_TOKENS = 8
+
+# Sigles des titres : majuscules, surtout écrits ainsi dans le texte des documents
+SIGLE = re.compile(r'\b[A-Z]{2,6}\b')
+SIGLE_MIN_COUNT = 5
+# « clé Real » : un nom propre écrit aussi en capitales reste sous ce ratio
+SIGLE_UPPER_RATIO = 5
+# Deux lettres (RC, PJ, QR, FT) : abréviations de mots courants plutôt qu'entités
+SIGLE_MIN_LENGTH = 3
+
+# Fragments candidats au LLM : sigles et suites de mots capitalisés
+CANDIDATE = re.compile(r"\b[A-ZÀ-Ý][\w’'-]*(?:\s+(?:de\s+|du\s+|des\s+|d['’])?[A-ZÀ-Ý][\w’'-]*)*")
+
+# "n48" (titres de fichiers) → "48" ; "no", "numero" ignorés
+NUMBERED = re.compile(r'n(\d+)')
+NUMBER_WORDS = frozenset({'no', 'num', 'numero'})
+
+ENTITY_PROMPT = """Parmi ces fragments d'une question notariale, lesquels désignent une entité
+(organisme, texte, dispositif, personne, lieu) ? Donne leur forme canonique.
+
+Fragments: {spans}
+Question: "{question}"
+
+Réponds en JSON: {{"entities": ["..."]}}"""
+
+
+def phrase_key(text: str) -> Tuple[str, ...]:
+    """Tokens analysés d'une forme de surface, numéros normalisés."""
+    key = []
+    for token in analyze(text):
+        if token in NUMBER_WORDS:
+            continue
+        number = NUMBERED.fullmatch(token)
+        key.append(number.group(1) if number else token)
+    return tuple(key)
+
+
+def sigle_counts(pages: Dict[str, List[str]]) -> Tuple[Counter, Counter]:
+    """Occurrences en majuscules / autrement de chaque mot court du texte intégral."""
+    upper, other = Counter(), Counter()
+    for document_pages in pages.values():
+        for page in document_pages:
+            for word in re.findall(r'\b[A-Za-z]{2,6}\b', page):
+                if word.isupper():
+                    upper[word] += 1
+                else:
+                    other[word.upper()] += 1
+    return upper, other
+
+
+def corpus_words(pages: Dict[str, List[str]]) -> Counter:
+    """Occurrences des mots du texte intégral écrits autrement qu'en capitales."""
+    return Counter(word.lower() for document_pages in pages.values() for page in document_pages
+                   for word in re.findall(r'[^\W\d_]+', page) if not word.isupper())
+
+
+def split_fragments(title: str, words: Counter) -> Set[str]:
+    """
+    Fragments de mots coupés par l'extraction PDF dans un titre en capitales.
+
+    "CONTRA T", "SITUA TION" : deux tokens en majuscules séparés d'un espace
+    dont la concaténation est un mot courant du corpus (une URL isolée
+    comme « affiche-lcbft » ne suffit pas à couper « LCB FT »).
+    """
+    tokens = list(re.finditer(r'[^\W\d_]+', title))
+    fragments = set()
+    for left, right in zip(tokens, tokens[1:]):
+        if (title[left.end():right.start()] == ' ' and left.group().isupper() and right.group().isupper()
+                and words[(left.group() + right.group()).lower()] >= SIGLE_MIN_COUNT):
+            fragments.update((left.group(), right.group()))
+    return fragments
+
+
+class Gazetteer:
+    """
+    Table des entités compilée.
+
+    entities : [{'name': str, 'type': str, 'document_ids': [str]}] (id = position)
+    phrases  : tuple de tokens → ids des entités
+    """
+
+    def __init__(self, entities: List[Dict[str, Any]], phrases: Dict[Tuple[str, ...], List[int]],
+                 fingerprint: str = ''):
+        self.entities = entities
+        self.phrases = phrases
+        self.fingerprint = fingerprint
+        self.max_len = max((len(key) for key in phrases), default=0)
+        # Nom canonique → entité référence (« Avenant n°56 »), pour les numéros énumérés
+        self.references = {entity['name']: entity for entity in entities if entity['type'] == 'reference'}
+
+    @classmethod
+    def compile(cls, vocabulary: List[Dict[str, Any]], documents: List[Dict[str, Any]],
+                pages: Optional[Dict[str, List[str]]] = None, fingerprint: str = '') -> 'Gazetteer':
+        """
+        Compile les entités connues.
+
+        Args:
+            vocabulary: Entrées {terme, synonymes} de vocabulaire_notarial.json
+            documents: Métadonnées (vocabulaire_specifique, reference, titre)
+            pages: Texte des documents (document_text), pour retenir les sigles des titres
+            fingerprint: Empreinte des sources
+
+        Returns:
+            Gazetteer
+        """
+        entities: List[Dict[str, Any]] = []
+        by_name: Dict[Tuple[str, str], int] = {}
+        phrases: Dict[Tuple[str, ...], List[int]] = {}
+
+        def add(name: str, kind: str, forms: List[str], document_id: Optional[str] = None) -> Optional[int]:
+            key = (kind, phrase_key(name))
+            if not key[1]:
+                return None
+            if key not in by_name:
+                by_name[key] = len(entities)
+                entities.append({'name': name, 'type': kind, 'document_ids': []})
+            entity_id = by_name[key]
+            if document_id and document_id not in entities[entity_id]['document_ids']:
+                entities[entity_id]['document_ids'].append(document_id)
+            for form in [name] + forms:
+                form_key = phrase_key(form)
+                if form_key and entity_id not in phrases.setdefault(form_key, []):
+                    phrases[form_key].append(entity_id)
+            return entity_id
+
+        # Lexique global d'abord : ses formes canoniques priment
+        for group in vocabulary:
+            add(group.get('terme', '').strip(), 'vocabulaire', group.get('synonymes', []))
+        for metadata in documents:
+            for group in metadata.get('vocabulaire_specifique', []):
+                add(group.get('terme', '').strip(), 'vocabulaire', group.get('synonymes', []),
+                    metadata['document_id'])
+
+        for metadata in documents:
+            document_id = metadata['document_id']
+            for name in document_references(metadata):
+                add(name, 'reference', [], document_id)
+            title = metadata.get('metadata', {}).get('titre') or ''
+            # Un titre court déjà connu (avenant n51, RPN) rattache le document à l'entité existante
+            key = phrase_key(title)
+            if key in phrases:
+                for entity_id in phrases[key]:
+                    if document_id not in entities[entity_id]['document_ids']:
+                        entities[entity_id]['document_ids'].append(document_id)
+            elif 2 <= len(key) <= MAX_TITLE_TOKENS:
+                add(title, 'document', [], document_id)
+
+        if pages:
+            upper, other = sigle_counts(pages)
+            words = corpus_words(pages)
+            for metadata in documents:
+                title = metadata.get('metadata', {}).get('titre') or ''
+                fragments = split_fragments(title, words)
+                for sigle in dict.fromkeys(SIGLE.findall(title)):
+                    if len(sigle) < SIGLE_MIN_LENGTH or sigle in fragments:
+                        continue
+                    if upper[sigle] < SIGLE_MIN_COUNT or upper[sigle] <= SIGLE_UPPER_RATIO * other[sigle]:
+                        continue
+                    key = phrase_key(sigle)
+                    if key in phrases and all(entities[i]['type'] != 'sigle' for i in phrases[key]):
+                        continue
+                    add(sigle, 'sigle', [], metadata['document_id'])
+
+        return cls(entities, phrases, fingerprint)
+
+    def save(self, path: Path = GAZETTEER_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'fingerprint': self.fingerprint,
+                'entities': self.entities,
+                'phrases': {' '.join(key): ids for key, ids in self.phrases.items()},
+            }, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: Path = GAZETTEER_FILE, check: bool = True) -> 'Gazetteer':
+        """
+        Charge le gazetteer compilé, en le recompilant si les sources ont changé.
+
+        Args:
+            path: Fichier compilé
+            check: Vérifier l'empreinte des sources (désactiver pour un corpus figé)
+        """
+        fingerprint = sources_fingerprint() if check else None
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if fingerprint is None or data.get('fingerprint') == fingerprint:
+                phrases = {tuple(key.split()): ids for key, ids in data['phrases'].items()}
+                return cls(data['entities'], phrases, data.get('fingerprint', ''))
+
+        documents = load_documents()
+        gazetteer = cls.compile(load_vocabulary(), documents, load_all_pages(documents),
+                                fingerprint or sources_fingerprint())
+        gazetteer.save(path)
+        return gazetteer
+
+    def match(self, tokens: List[str]) -> List[Tuple[int, int, List[int]]]:
+        """
+        Plus longues correspondances, de gauche à droite, sans chevauchement.
+
+        Returns:
+            Liste de (début, fin, ids des entités) sur les positions de tokens
+        """
+        matches = []
+        phrases = self.phrases
+        n = len(tokens)
+        i = 0
+        while i < n:
+            for length in range(min(self.max_len, n - i), 0, -1):
+                ids = phrases.get(tuple(tokens[i:i + length]))
+                if ids:
+                    matches.append((i, i + length, ids))
+                    i += length
+                    break
+            else:
+                i += 1
+        return matches
+
+    def extract(self, question: str) -> Dict[str, Any]:
+        """
+        Entités connues d'une question et fragments résiduels.
+
+        Returns:
+            {entities: [noms canoniques], document_ids: [...], residual: [fragments inconnus]}
+        """
+        tokens = list(phrase_key(question))
+        names: Dict[str, None] = {}
+        document_ids: Dict[str, None] = {}
+        references = find_references(question)
+        spans = [(start, end) for start, end, _ in references]
+        reference_tokens = {token for start, end in spans for token in phrase_key(question[start:end])}
+        covered = set(reference_tokens)
+        for start, end, ids in self.match(tokens):
+            covered.update(tokens[start:end])
+            for entity_id in ids:
+                entity = self.entities[entity_id]
+                # "avenant" seul dans "avenant 99" : la référence suffit
+                if entity['type'] != 'reference' and reference_tokens.issuperset(tokens[start:end]):
+                    continue
+                names.setdefault(entity['name'])
+                document_ids.update(dict.fromkeys(entity['document_ids']))
+
+        # Références énumérées (« avenants 55 et 56 ») et hors corpus (avenant 99) : reconnues sans LLM
+        for _, _, name in references:
+            names.setdefault(name)
+            if name in self.references:
+                document_ids.update(dict.fromkeys(self.references[name]['document_ids']))
+
+        residual = []
+        for candidate in CANDIDATE.finditer(question):
+            text = candidate.group(0)
+            if any(start <= candidate.start() < end for start, end in spans):
+                continue
+            # Majuscule de début de phrase : pas un indice d'entité (sauf sigle)
+            before = question[:candidate.start()].rstrip()
+            if (not before or before[-1] in '.?!:') and not SIGLE.search(text):
+                continue
+            key = phrase_key(text)
+            if key and not covered.issuperset(key):
+                residual.append(text)
+
+        return {'entities': list(names), 'document_ids': list(document_ids), 'residual': residual}
+
+    def entity_names(self, question: str) -> List[str]:
+        """Entités connues seules (entity_matcher de StrategySelector)."""
+        return self.extract(question)['entities']
+
+
+class OpenAIEntityExtractor:
+    """Entités des fragments résiduels par le LLM (chat completions, réponse JSON)."""
+
+    def __init__(self, model: str = DEFAULT_LLM_MODEL, base_url: str = None, api_key: str = None,
+                 timeout: float = 30.0):
+        self.model = model
+        self.base_url = resolve_base_url(base_url)
+        self.api_key = api_key or os.environ.get('OPENAI_API_KEY', '')
+        self.timeout = timeout
+        self.requests = 0
+
+    def _post(self, question: str, spans: List[str]) -> List[str]:
+        prompt = ENTITY_PROMPT.format(spans=json.dumps(spans, ensure_ascii=False), question=question)
+        content = chat_json(prompt, self.model, self.base_url, self.api_key, self.timeout)
+        self.requests += 1
+        entities = content.get('entities', [])
+        return [e for e in entities if isinstance(e, str) and e.strip()]
+
+    async def __call__(self, question: str, spans: List[str]) -> List[str]:
+        return await asyncio.to_thread(self._post, question, spans)
+
+
+class EntityExtractor:
+    """Gazetteer d'abord, LLM pour les seuls fragments résiduels, réponses LLM en cache."""
+
+    def __init__(self, gazetteer: Gazetteer,
+                 llm: Optional[Callable[[str, List[str]], Awaitable[List[str]]]] = None,
+                 cache_size: int = CACHE_SIZE):
+        """
+        Args:
+            gazetteer: Table des entités connues
+            llm: Coroutine (question, fragments) → entités, pour les fragments inconnus
+            cache_size: Nombre de réponses LLM gardées en mémoire (LRU)
+        """
+        self.gazetteer = gazetteer
+        self.llm = llm
+        self.cache_size = cache_size
+        self.cache: 'OrderedDict[Tuple[str, ...], List[str]]' = OrderedDict()
+        self.stats = {'gazetteer': 0, 'llm': 0, 'cache': 0}
+
+    async def _residual_entities(self, question: str, residual: List[str]) -> List[str]:
+        key = tuple(sorted({normalize(span) for span in residual}))
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats['cache'] += 1
+            return cached
+        try:
+            entities = await self.llm(question, residual)
+        except Exception as e:
+            print(f"⚠️  Extraction LLM indisponible ({e}) : fragments ignorés")
+            return []
+        self.stats['llm'] += 1
+        self.cache[key] = entities
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return entities
+
+    async def __call__(self, question: str) -> List[str]:
+        """Entités de la question (remplace l'appel LLM de _extract_entities_from_query)."""
+        result = self.gazetteer.extract(question)
+        entities = result['entities']
+        if result['residual'] and self.llm is not None:
+            entities = list(dict.fromkeys(entities + await self._residual_entities(question,
+                                                                                  result['residual'])))
+        else:
+            self.stats['gazetteer'] += 1
+        return entities
+
+
+async def run_llm(extractor: EntityExtractor, questions: List[str]) -> float:
+    start = time.perf_counter()
+    for question in questions:
+        await extractor(question)
+    return (time.perf_counter() - start) * 1000 / max(len(questions), 1)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Compile le gazetteer des entités notariales")
+    parser.add_argument('--question', help="Question à analyser")
+    parser.add_argument('--force', action='store_true', help="Recompiler même si les sources n'ont pas changé")
+    parser.add_argument('--llm', action='store_true', help="Résoudre les fragments résiduels par le LLM")
+    parser.add_argument('--model', default=DEFAULT_LLM_MODEL)
+    parser.add_argument('--base-url', default=None, help="API compatible OpenAI (défaut : OPENAI_BASE_URL)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("GAZETTEER DES ENTITÉS NOTARIALES")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    if args.force:
+        documents = load_documents()
+        gazetteer = Gazetteer.compile(load_vocabulary(), documents, load_all_pages(documents),
+                                      sources_fingerprint())
+        gazetteer.save()
+    else:
+        gazetteer = Gazetteer.load()
+    elapsed = time.perf_counter() - start
+    types = Counter(entity['type'] for entity in gazetteer.entities)
+    print(f"✅ {len(gazetteer.entities)} entités ({', '.join(f'{n} {t}' for t, n in types.most_common())}), "
+          f"{len(gazetteer.phrases)} formes en {elapsed * 1000:.1f} ms → {GAZETTEER_FILE}")
+
+    if args.question:
+        result = gazetteer.extract(args.question)
+        print(f"🔎 {args.question}")
+        for name in result['entities']:
+            print(f"  🔗 {name}")
+        for span in result['residual']:
+            print(f"  ❓ {span}")
+        return
+
+    questions = [q['question'] for q in load_questions()]
+    start = time.perf_counter()
+    results = [gazetteer.extract(question) for question in questions]
+    per_query_us = (time.perf_counter() - start) * 1e6 / max(len(questions), 1)
+    residual = sum(1 for r in results if r['residual'])
+    print(f"⏱️  {per_query_us:.1f} µs par question ({len(questions)} questions)")
+    print(f"📊 {sum(1 for r in results if r['entities'])} questions avec entités connues, "
+          f"{residual} avec fragments résiduels ({residual / max(len(questions), 1):.0%} d'appels LLM)")
+
+    if args.llm:
+        extractor = EntityExtractor(gazetteer, OpenAIEntityExtractor(args.model, args.base_url))
+        try:
+            first = asyncio.run(run_llm(extractor, questions))
+            second = asyncio.run(run_llm(extractor, questions))
+        except OSError as e:
+            print(f"❌ LLM injoignable : {e}")
+            sys.exit(1)
+        print(f"⏱️  Avec LLM : {first:.1f} ms par question, {second:.2f} ms au 2e passage (cache) — {extractor.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Index de facettes en bitmaps pour le filtrage avant recherche (routing par
+collections thématiques, Améliorations #1).
+Un bitset compressé par valeur de facette (type_document, annee_reference,
+categories_metier, statut, categorie_dossier), sur les row ids des documents
+et, si l'index des chunks existe, sur les lignes de chunks. Les filtres se
+combinent en AND / OR / NOT ; le résultat est un Bitset utilisable
+directement par BM25Index.search(candidates=...) et VectorIndex (mask).
+"""
+
+import argparse
+import json
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+import numpy as np
+
+from bitset import Bitset
+from corpus import INDEX_DIR, load_documents
+
+FACETS_FILE = INDEX_DIR / "facets.json"
+
+# Facette → extraction de la (des) valeur(s) d'une métadonnée
+FACETS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'type_document': lambda m: m.get('classification', {}).get('type_document'),
+    'annee_reference': lambda m: m.get('classification', {}).get('annee_reference'),
+    'categories_metier': lambda m: m.get('classification', {}).get('categories_metier', []),
+    'statut': lambda m: m.get('metadata', {}).get('statut'),
+    'categorie_dossier': lambda m: m.get('classification', {}).get('categorie_dossier'),
+}
+
+FILTER_TOKEN = re.compile(r'\s*(?:(\()|(\))|(AND|OR|NOT)\b|(\w+)\s*(:|>=|<=|>|<)\s*("[^"]*"|[^\s()]+))')
+
+
+class FacetIndex:
+    """Bitsets par valeur de facette, au niveau documents et chunks."""
+
+    def __init__(self, n_documents: int, bitsets: Dict[str, Dict[str, Bitset]],
+                 document_rows: Optional[np.ndarray] = None):
+        self.n_documents = n_documents
+        self.bitsets = bitsets
+        # Ligne de document de chaque chunk (projection documents → chunks)
+        self.document_rows = document_rows
+        self._chunk_bitsets: Dict[tuple, Bitset] = {}
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]],
+              document_rows: Optional[np.ndarray] = None) -> 'FacetIndex':
+        """
+        Construit les bitsets à partir des métadonnées (ordre = row ids).
+
+        Args:
+            documents: Métadonnées triées (corpus.load_documents())
+            document_rows: Ligne de document de chaque chunk (VectorIndex.document_rows)
+        """
+        rows_by_value: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        for row, metadata in enumerate(documents):
+            for facet, extract in FACETS.items():
+                values = extract(metadata)
+                if values is None:
+                    continue
+                if not isinstance(values, list):
+                    values = [values]
+                for value in values:
+                    rows_by_value[facet].setdefault(str(value), []).append(row)
+
+        bitsets = {
+            facet: {value: Bitset.from_rows(len(documents), rows) for value, rows in sorted(values.items())}
+            for facet, values in rows_by_value.items()
+        }
+        return cls(len(documents), bitsets, document_rows)
+
+    def save(self, path: Path = FACETS_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'n_documents': self.n_documents,
+                'facets': {
+                    facet: {value: bitset.dumps() for value, bitset in values.items()}
+                    for facet, values in self.bitsets.items()
+                },
+            }, f, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path: Path = FACETS_FILE, document_rows: Optional[np.ndarray] = None) -> 'FacetIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        n_documents = data['n_documents']
+        bitsets = {
+            facet: {value: Bitset.loads(n_documents, encoded) for value, encoded in values.items()}
+            for facet, values in data['facets'].items()
+        }
+        return cls(n_documents, bitsets, document_rows)
+
+    def values(self, facet: str) -> List[str]:
+        return list(self.bitsets[facet])
+
+    def value(self, facet: str, value: Any) -> Bitset:
+        """Documents ayant cette valeur (bitset vide si inconnue)."""
+        if facet not in self.bitsets:
+            raise KeyError(f"Facette inconnue : {facet} (disponibles : {', '.join(self.bitsets)})")
+        return self.bitsets[facet].get(str(value), Bitset(self.n_documents))
+
+    def any_of(self, facet: str, values: List[Any]) -> Bitset:
+        """OR des valeurs d'une facette."""
+        result = Bitset(self.n_documents)
+        for value in values:
+            result = result | self.value(facet, value)
+        return result
+
+    def compare(self, facet: str, operator: str, bound: Any) -> Bitset:
+        """Valeurs numériques comparées à une borne (ex. annee_reference >= 2023)."""
+        tests = {
+            '>=': lambda v: v >= bound, '<=': lambda v: v <= bound,
+            '>': lambda v: v > bound, '<': lambda v: v < bound,
+        }
+        bound = float(bound)
+        return self.any_of(facet, [
+            value for value in self.values(facet)
+            if re.fullmatch(r'-?\d+(?:\.\d+)?', value) and tests[operator](float(value))
+        ])
+
+    def select(self, **criteria) -> Bitset:
+        """
+        AND entre facettes, OR entre les valeurs d'une même facette.
+
+        Exemple : select(categories_metier=['RH', 'DEONTOLOGIE'], statut='en_vigueur')
+        """
+        result = Bitset.full(self.n_documents)
+        for facet, values in criteria.items():
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            result = result & self.any_of(facet, list(values))
+        return result
+
+    def filter(self, expression: str) -> Bitset:
+        """
+        Évalue une expression de filtre.
+
+        Exemple : 'categories_metier:RH AND NOT type_document:fil_info
+        AND (annee_reference>=2024 OR categorie_dossier:"Convention Collective")'
+        """
+        tokens = []
+        position = 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = FILTER_TOKEN.match(expression, position)
+            if not match:
+                raise ValueError(f"Filtre invalide près de : {expression[position:]!r}")
+            position = match.end()
+            tokens.append(match.groups())
+        tokens.append(None)
+
+        def peek():
+            return tokens[0]
+
+        def take():
+            return tokens.pop(0)
+
+        def parse_or() -> Bitset:
+            result = parse_and()
+            while peek() and peek()[2] == 'OR':
+                take()
+                result = result | parse_and()
+            return result
+
+        def parse_and() -> Bitset:
+            result = parse_not()
+            while peek() and (peek()[2] == 'AND' or peek()[2] == 'NOT' or peek()[0] or peek()[3]):
+                if peek()[2] == 'AND':
+                    take()
+                result = result & parse_not()
+            return result
+
+        def parse_not() -> Bitset:
+            if peek() and peek()[2] == 'NOT':
+                take()
+                return ~parse_not()
+            return parse_atom()
+
+        def parse_atom() -> Bitset:
+            token = take()
+            if token is None:
+                raise ValueError("Filtre incomplet")
+            if token[0]:
+                result = parse_or()
+                if not peek() or not peek()[1]:
+                    raise ValueError("Parenthèse fermante manquante")
+                take()
+                return result
+            if token[3]:
+                facet, operator, value = token[3], token[4], token[5].strip('"')
+                if operator == ':':
+                    return self.value(facet, value)
+                return self.compare(facet, operator, value)
+            raise ValueError(f"Élément inattendu : {''.join(t for t in token if t)}")
+
+        result = parse_or()
+        if peek() is not None:
+            raise ValueError("Élément en trop dans le filtre")
+        return result
+
+    def counts(self, facet: str, within: Optional[Bitset] = None) -> Dict[str, int]:
+        """Nombre de documents par valeur (dans un sous-ensemble éventuel)."""
+        counts = {}
+        for value, bitset in self.bitsets[facet].items():
+            counts[value] = (bitset & within).count() if within is not None else bitset.count()
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+    def for_chunks(self, bitset: Bitset) -> Bitset:
+        """Projection d'un bitset de documents sur les lignes de chunks."""
+        if self.document_rows is None:
+            raise ValueError("Index des chunks non fourni (document_rows)")
+        return bitset.project(self.document_rows)
+
+    def chunk_value(self, facet: str, value: Any) -> Bitset:
+        """Bitset de chunks d'une valeur de facette (mis en cache)."""
+        key = (facet, str(value))
+        if key not in self._chunk_bitsets:
+            self._chunk_bitsets[key] = self.for_chunks(self.value(facet, value))
+        return self._chunk_bitsets[key]
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Construit l'index de facettes (bitmaps)")
+    parser.add_argument('--filter', help="Expression à évaluer, ex. 'categories_metier:RH AND NOT type_document:fil_info'")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("INDEX DE FACETTES")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    index = FacetIndex.build(load_documents())
+    index.save()
+    n_values = sum(len(values) for values in index.bitsets.values())
+    print(f"✅ {index.n_documents} documents, {len(index.bitsets)} facettes, {n_values} valeurs "
+          f"en {(time.perf_counter() - start) * 1000:.1f} ms → {FACETS_FILE}")
+
+    if args.filter:
+        start = time.perf_counter()
+        selection = index.filter(args.filter)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(f"\n🔎 {args.filter}")
+        print(f"   {selection.count()} documents ({elapsed_us:.0f} µs)")
+        for facet in index.bitsets:
+            counts = {value: n for value, n in index.counts(facet, selection).items() if n}
+            print(f"   {facet:20s} {counts}")
+
+
+if __name__ == "__main__":
+    main()
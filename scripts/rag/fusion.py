@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Fusion des résultats de recherche hybride (vecteur + plein texte).
+Déduplication par chunkId (documentId à défaut), puis Reciprocal Rank
+Fusion ou combinaison linéaire pondérée de scores normalisés, calculées
+sur des tableaux NumPy. Le script évalue une grille de poids sur le
+dataset de test à partir des retrievers de evaluate_retrieval.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from corpus import PROJECT_ROOT, load_questions
+
+REPORT_PATH = PROJECT_ROOT / "output" / "evaluation_fusion.json"
+
+DEFAULT_RRF_K = 60
+
+
+def hit_key(hit: Any) -> str:
+    """
+    Clé de déduplication d'un résultat.
+
+    Raises:
+        ValueError: Résultat sans chunkId ni documentId (sinon tous ces
+            résultats seraient fusionnés sous la même clé)
+    """
+    if isinstance(hit, dict):
+        key = hit.get('chunkId') or hit.get('documentId') or hit.get('document_id')
+    elif isinstance(hit, (tuple, list)):
+        key = hit[0] if hit else None
+    else:
+        key = hit
+    if key is None or key == '':
+        raise ValueError(f"Résultat sans identifiant (chunkId, documentId ou document_id) : {hit!r}")
+    return key
+
+
+def hit_score(hit: Any, rank: int) -> float:
+    """Score brut d'un résultat (1/rang s'il n'en a pas)."""
+    if isinstance(hit, dict) and hit.get('score') is not None:
+        return float(hit['score'])
+    if isinstance(hit, (tuple, list)) and len(hit) > 1:
+        return float(hit[1])
+    return 1.0 / (rank + 1)
+
+
+def as_result(hit: Any, score: float) -> Dict[str, Any]:
+    if isinstance(hit, dict):
+        return {**hit, 'score': score}
+    return {'documentId': hit_key(hit), 'score': score}
+
+
+def fuse(result_lists: Sequence[List[Any]], method: str = 'rrf',
+         weights: Optional[Sequence[float]] = None, rrf_k: float = DEFAULT_RRF_K,
+         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Fusionne plusieurs listes de résultats classés.
+
+    Args:
+        result_lists: Une liste de résultats par source (dicts search_chunks_*,
+            document_id ou tuples (id, score)), par ordre de pertinence
+        method: 'rrf' (rangs) ou 'weighted' (scores normalisés min-max)
+        weights: Poids par source (1 par défaut)
+        rrf_k: Constante de lissage de la RRF
+        limit: Nombre de résultats renvoyés (tous par défaut)
+
+    Returns:
+        Résultats dédupliqués, score fusionné décroissant ; chaque résultat
+        reprend le premier dict rencontré pour sa clé
+
+    Raises:
+        ValueError: Méthode inconnue ou résultat sans identifiant
+    """
+    hits = [hit for results in result_lists for hit in results]
+    if not hits:
+        return []
+    lengths = np.fromiter((len(results) for results in result_lists), dtype=np.int64, count=len(result_lists))
+    source = np.repeat(np.arange(len(result_lists)), lengths)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    ranks = np.arange(len(hits)) - starts[source]
+    weight = np.ones(len(result_lists)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    keys, first, inverse = np.unique(np.array([str(hit_key(hit)) for hit in hits]),
+                                     return_index=True, return_inverse=True)
+
+    if method == 'rrf':
+        contributions = weight[source] / (rrf_k + ranks + 1)
+    elif method == 'weighted':
+        raw = np.fromiter((hit_score(hit, rank) for hit, rank in zip(hits, ranks)),
+                          dtype=np.float64, count=len(hits))
+        present = lengths > 0
+        low = np.zeros(len(result_lists))
+        high = np.zeros(len(result_lists))
+        low[present] = np.minimum.reduceat(raw, starts[present])
+        high[present] = np.maximum.reduceat(raw, starts[present])
+        spread = high - low
+        normalized = np.where(spread[source] > 0, (raw - low[source]) / np.where(spread > 0, spread, 1)[source], 1.0)
+        contributions = weight[source] * normalized
+    else:
+        raise ValueError(f"Méthode de fusion inconnue : {method}")
+
+    fused = np.bincount(inverse.ravel(), weights=contributions, minlength=len(keys))
+    order = np.argsort(-fused, kind='stable')
+    if limit is not None:
+        order = order[:limit]
+    return [as_result(hits[first[i]], float(fused[i])) for i in order]
+
+
+class HybridRetriever:
+    """Interroge plusieurs retrievers et fusionne leurs résultats."""
+
+    def __init__(self, retrievers: Sequence[Any], method: str = 'rrf',
+                 weights: Optional[Sequence[float]] = None, rrf_k: float = DEFAULT_RRF_K,
+                 candidates: int = 50):
+        self.retrievers = retrievers
+        self.method = method
+        self.weights = weights
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        result_lists = [retriever.search(query, self.candidates) for retriever in self.retrievers]
+        return fuse(result_lists, self.method, self.weights, self.rrf_k, k)
+
+
+def weight_grid(n_sources: int, step: float) -> List[tuple]:
+    """Poids (somme 1) sur une grille régulière, sources au moins à 0."""
+    ticks = np.round(np.arange(0, 1 + step / 2, step), 6)
+    return [w for w in itertools.product(ticks, repeat=n_sources) if abs(sum(w) - 1) < 1e-6]
+
+
+def main():
+    """Évalue méthodes et poids de fusion sur le dataset de test."""
+    parser = argparse.ArgumentParser(description="Réglage de la fusion hybride sur le dataset de test")
+    parser.add_argument('--retrievers', nargs='+', default=['bm25_synonymes', 'keywords'],
+                        help="Retrievers de evaluate_retrieval à fusionner (ex. vector bm25)")
+    parser.add_argument('--candidates', type=int, default=50, help="Résultats demandés à chaque retriever")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--step', type=float, default=0.1, help="Pas de la grille de poids")
+    parser.add_argument('--rrf-k', type=float, nargs='+', default=[10, 30, 60, 100])
+    parser.add_argument('--output', type=Path, default=REPORT_PATH)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "validation"))
+    from evaluate_retrieval import _result_doc_ids, compute_metrics, load_retriever
+
+    print("=" * 70)
+    print("RÉGLAGE DE LA FUSION HYBRIDE")
+    print("=" * 70)
+
+    questions = [q for q in load_questions() if q.get('documents_sources_attendus')]
+    retrievers = [load_retriever(spec) for spec in args.retrievers]
+    candidates = [
+        [retriever.search(q['question'], args.candidates) for retriever in retrievers]
+        for q in questions
+    ]
+    print(f"📂 {len(questions)} questions, sources : {', '.join(args.retrievers)}")
+
+    def evaluate(method: str, weights: Sequence[float], rrf_k: float) -> Dict[str, Any]:
+        totals: Dict[str, float] = {}
+        start = time.perf_counter()
+        for question, result_lists in zip(questions, candidates):
+            fused = fuse(result_lists, method, weights, rrf_k, args.k)
+            metrics = compute_metrics(_result_doc_ids(fused), question['documents_sources_attendus'], [args.k])
+            for name, value in metrics.items():
+                totals[name] = totals.get(name, 0.0) + value
+        fuse_us = (time.perf_counter() - start) * 1e6 / len(questions)
+        return {
+            'method': method,
+            'weights': [float(w) for w in weights],
+            'rrf_k': rrf_k if method == 'rrf' else None,
+            **{name: value / len(questions) for name, value in totals.items()},
+            'fuse_us': fuse_us,
+        }
+
+    runs = []
+    for i, spec in enumerate(args.retrievers):
+        alone = [0.0] * len(retrievers)
+        alone[i] = 1.0
+        runs.append({**evaluate('weighted', alone, DEFAULT_RRF_K), 'label': f"{spec} seul"})
+    for weights in weight_grid(len(retrievers), args.step):
+        runs.append(evaluate('weighted', weights, DEFAULT_RRF_K))
+        for rrf_k in args.rrf_k:
+            runs.append(evaluate('rrf', weights, rrf_k))
+
+    recall_key = f'recall@{args.k}'
+    ranked = sorted(runs[len(retrievers):], key=lambda r: (r['mrr'] + r[recall_key]), reverse=True)
+    print("-" * 70)
+    for run in runs[:len(retrievers)]:
+        print(f"  {run['label']:35s} {recall_key} {run[recall_key]:.3f}  mrr {run['mrr']:.3f}")
+    print("-" * 70)
+    for run in ranked[:5]:
+        label = f"{run['method']} w={run['weights']}" + (f" k={run['rrf_k']:g}" if run['rrf_k'] else '')
+        print(f"  {label:35s} {recall_key} {run[recall_key]:.3f}  mrr {run['mrr']:.3f}  "
+              f"({run['fuse_us']:.0f} µs/requête)")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(),
+            'retrievers': args.retrievers,
+            'candidates': args.candidates,
+            'best': ranked[0] if ranked else None,
+            'runs': runs,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Rapport sauvegardé : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Écriture incrémentale du graphe par lots UNWIND.
+Les upserts de nœuds et de relations sont regroupés en requêtes
+paramétrées `UNWIND $rows AS row MERGE ...` de taille configurable, envoyées
+avec un nombre borné de transactions simultanées. Le driver est tout objet
+exposant run(query, parameters) (synchrone ou coroutine) ou session()
+(driver neo4j : une transaction gérée par lot, rejouée par le driver en cas
+d'erreur transitoire). Les lots de relations concurrents peuvent se bloquer
+mutuellement sur des nœuds partagés (DeadlockDetected) : avec run(), les
+erreurs transitoires sont rejouées avec un délai croissant. FakeDriver
+enregistre les requêtes en mémoire pour les tests et le benchmark.
+"""
+
+import asyncio
+import inspect
+import random
+import re
+import time
+from typing import List, Dict, Any, Optional, Iterable
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CONCURRENCY = 4
+
+# Rejeu des erreurs transitoires (interblocages, leader indisponible) pour les drivers run()
+MAX_RETRIES = 5
+RETRY_DELAY = 0.1
+
+# Labels et types ne sont pas paramétrables en Cypher : ils sont validés
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+NODE_QUERY = "UNWIND $rows AS row MERGE (n:{label} {{id: row.id}}) SET n += row.props"
+RELATIONSHIP_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (a:{start} {{id: row.start}}) MATCH (b:{end} {{id: row.end}}) "
+    "MERGE (a)-[r:{type}]->(b) SET r += row.props"
+)
+
+
+def identifier(name: str) -> str:
+    if not IDENTIFIER.match(name):
+        raise ValueError(f"Label ou type de relation invalide : {name!r}")
+    return name
+
+
+def is_transient(error: BaseException) -> bool:
+    """Erreur rejouable : neo4j TransientError (DeadlockDetected…) ou is_retryable()."""
+    retryable = getattr(error, 'is_retryable', None)
+    if callable(retryable):
+        return bool(retryable())
+    return any(cls.__name__ == 'TransientError' for cls in type(error).__mro__)
+
+
+def batches(rows: List[Any], size: int) -> List[List[Any]]:
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+class GraphWriter:
+    """Upserts de nœuds et relations par lots, concurrence bornée."""
+
+    def __init__(self, driver: Any, batch_size: int = DEFAULT_BATCH_SIZE,
+                 concurrency: int = DEFAULT_CONCURRENCY, database: Optional[str] = None):
+        self.driver = driver
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.database = database
+        self.stats = {'statements': 0, 'rows': 0, 'retries': 0, 'seconds': 0.0}
+
+    async def _run(self, query: str, rows: List[Dict[str, Any]]):
+        parameters = {'rows': rows}
+        if hasattr(self.driver, 'run'):
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    if inspect.iscoroutinefunction(self.driver.run):
+                        await self.driver.run(query, parameters)
+                    else:
+                        # Driver synchrone : exécuté dans un thread pour garder la concurrence
+                        await asyncio.to_thread(self.driver.run, query, parameters)
+                    return
+                except Exception as e:
+                    if attempt == MAX_RETRIES or not is_transient(e):
+                        raise
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+
+        async def work(tx):
+            result = await tx.run(query, parameters)
+            await result.consume()
+
+        kwargs = {'database': self.database} if self.database else {}
+        async with self.driver.session(**kwargs) as session:
+            # Transaction gérée : le driver rejoue les erreurs transitoires avec backoff
+            await session.execute_write(work)
+
+    async def _write(self, query: str, rows: List[Dict[str, Any]]):
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(batch):
+            async with semaphore:
+                await self._run(query, batch)
+                self.stats['statements'] += 1
+                self.stats['rows'] += len(batch)
+
+        await asyncio.gather(*(send(batch) for batch in batches(rows, self.batch_size)))
+        self.stats['seconds'] += time.perf_counter() - start
+
+    async def upsert_nodes(self, label: str, rows: Iterable[Dict[str, Any]]):
+        """
+        MERGE de nœuds par identifiant.
+
+        Args:
+            label: Label des nœuds (ex. 'Chunk')
+            rows: {'id': ..., 'props': {...}}
+        """
+        await self._write(NODE_QUERY.format(label=identifier(label)), list(rows))
+
+    async def upsert_relationships(self, rel_type: str, start_label: str, end_label: str,
+                                   rows: Iterable[Dict[str, Any]]):
+        """
+        MERGE de relations entre nœuds existants.
+
+        Args:
+            rel_type: Type de relation (ex. 'BELONGS_TO')
+            start_label, end_label: Labels des extrémités
+            rows: {'start': id, 'end': id, 'props': {...}}
+        """
+        query = RELATIONSHIP_QUERY.format(type=identifier(rel_type), start=identifier(start_label),
+                                          end=identifier(end_label))
+        await self._write(query, list(rows))
+
+    def throughput(self) -> float:
+        """Lignes écrites par seconde."""
+        return self.stats['rows'] / self.stats['seconds'] if self.stats['seconds'] else 0.0
+
+
+async def write_corpus(writer: GraphWriter, documents: List[Dict[str, Any]], chunks: List[Dict[str, Any]],
+                       vocabulary: List[Dict[str, Any]], graph) -> Dict[str, Any]:
+    """
+    Écrit documents, chunks, entités et relations (même modèle que neo4j_export).
+
+    Les nœuds sont écrits avant les relations qui les relient.
+    """
+    from neo4j_export import collect_entities
+    from relation_graph import RELATIONS
+
+    entities, mentions = collect_entities(documents, vocabulary)
+    await writer.upsert_nodes('Document', (
+        {'id': d['document_id'], 'props': {
+            'filePath': d.get('fichier', ''),
+            'titre': d.get('metadata', {}).get('titre', ''),
+            'type_document': d.get('classification', {}).get('type_document', ''),
+        }} for d in documents
+    ))
+    await writer.upsert_nodes('Chunk', (
+        {'id': c['chunkId'], 'props': {'documentId': c['documentId'], 'text': c['text']}} for c in chunks
+    ))
+    await writer.upsert_nodes('Entity', (
+        {'id': key, 'props': {'nom': e['nom'], 'type': e['type'], 'description': e['description']}}
+        for key, e in entities.items()
+    ))
+    await writer.upsert_relationships('BELONGS_TO', 'Chunk', 'Document', (
+        {'start': c['chunkId'], 'end': c['documentId'], 'props': {}} for c in chunks
+    ))
+    await writer.upsert_relationships('MENTIONED_IN', 'Entity', 'Document', (
+        {'start': key, 'end': document_id, 'props': {}} for key, document_id in mentions
+    ))
+    for relation in RELATIONS:
+        await writer.upsert_relationships(relation.upper(), 'Document', 'Document', (
+            {'start': document_id, 'end': target, 'props': {}}
+            for document_id in graph.document_ids for target in graph.targets(document_id, relation)
+        ))
+    return dict(writer.stats)
+
+
+class TransientError(Exception):
+    """Erreur transitoire simulée (même nom que neo4j.exceptions.TransientError)."""
+
+
+class FakeDriver:
+    """
+    Driver en mémoire : enregistre les requêtes et applique les MERGE.
+
+    Latence simulée : statement_ms par requête + row_us par ligne ; une
+    fraction deadlock_rate des requêtes de relations échoue en TransientError.
+    """
+
+    NODE_MERGE = re.compile(r'MERGE \(n:(\w+) ')
+    RELATIONSHIP_MERGE = re.compile(r'MATCH \(a:(\w+) .*MATCH \(b:(\w+) .*MERGE \(a\)-\[r:(\w+)\]')
+
+    def __init__(self, statement_ms: float = 0.0, row_us: float = 0.0, deadlock_rate: float = 0.0,
+                 seed: int = 42):
+        self.statement_ms = statement_ms
+        self.row_us = row_us
+        self.deadlock_rate = deadlock_rate
+        self.rng = random.Random(seed)
+        self.deadlocks = 0
+        self.statements: List[tuple] = []
+        self.nodes: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        self.relationships: Dict[tuple, Dict[str, Any]] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run(self, query: str, parameters: Optional[Dict[str, Any]] = None):
+        rows = (parameters or {}).get('rows', [])
+        self.statements.append((query, len(rows)))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.statement_ms / 1000 + self.row_us * len(rows) / 1e6
+            if delay:
+                await asyncio.sleep(delay)
+            if self.RELATIONSHIP_MERGE.search(query) and self.rng.random() < self.deadlock_rate:
+                self.deadlocks += 1
+                raise TransientError("DeadlockDetected (simulé)")
+            self._apply(query, rows)
+        finally:
+            self.in_flight -= 1
+
+    def _apply(self, query: str, rows: List[Dict[str, Any]]):
+        match = self.RELATIONSHIP_MERGE.search(query)
+        if match:
+            start_label, end_label, rel_type = match.groups()
+            for row in rows:
+                # MATCH sans résultat : la relation n'est pas créée
+                if row['start'] in self.nodes.get(start_label, {}) and row['end'] in self.nodes.get(end_label, {}):
+                    key = (rel_type, row['start'], row['end'])
+                    self.relationships.setdefault(key, {}).update(row.get('props', {}))
+            return
+        match = self.NODE_MERGE.search(query)
+        if match:
+            nodes = self.nodes.setdefault(match.group(1), {})
+            for row in rows:
+                nodes.setdefault(row['id'], {}).update(row.get('props', {}))
+
+    def count(self, label: Optional[str] = None, rel_type: Optional[str] = None) -> int:
+        if rel_type is not None:
+            return sum(1 for key in self.relationships if key[0] == rel_type)
+        return len(self.nodes.get(label, {}))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Ingestion des embeddings de chunks dans l'index vectoriel local.
+Texte intégral (cache) → chunks → embeddings via le cache par empreinte
+(seuls les chunks nouveaux ou modifiés sont envoyés au modèle, par lots
+sous budget de tokens) → VectorIndex.
+Le rapport donne hits/misses et le coût API évité.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from chunking import chunk_document, estimate_tokens
+from corpus import PROJECT_ROOT, load_documents
+from document_text import load_all_pages
+from embedding_batcher import DEFAULT_CONCURRENCY, DEFAULT_MAX_ITEMS, DEFAULT_MAX_TOKENS, EmbeddingBatcher
+from embedding_cache import EmbeddingCache, embed_with_cache
+from embeddings import DEFAULT_BASE_URL, DEFAULT_MODEL, OpenAIEmbedder
+from vector_index import VECTORS_DIR, VectorIndex
+
+CHUNKS_INDEX_DIR = VECTORS_DIR / "chunks"
+REPORT_PATH = PROJECT_ROOT / "output" / "ingestion_embeddings.json"
+
+
+async def ingest(documents, embedder, batcher, workers=None, index_dir: Path = CHUNKS_INDEX_DIR):
+    """
+    Vectorise les chunks de tous les documents et reconstruit l'index.
+
+    Returns:
+        Statistiques de l'ingestion
+    """
+    start = time.perf_counter()
+    all_pages = load_all_pages(documents, workers)
+    chunks = [
+        chunk
+        for metadata in documents
+        for chunk in chunk_document(metadata, all_pages[metadata['document_id']])
+    ]
+    chunking_seconds = time.perf_counter() - start
+    print(f"📄 {len(chunks)} chunks pour {len(documents)} documents ({chunking_seconds:.1f} s)")
+
+    start = time.perf_counter()
+    cache = EmbeddingCache(embedder.model)
+    vectors, stats = await embed_with_cache([c['text'] for c in chunks], cache, batcher.embed_texts, estimate_tokens)
+    stats['embedding_seconds'] = time.perf_counter() - start
+    stats['api_requests'] = batcher.stats['requests']
+    stats['api_retries'] = batcher.stats['retries']
+
+    if chunks:
+        VectorIndex.build(vectors, chunks, index_dir, [d['document_id'] for d in documents])
+    stats['chunks'] = len(chunks)
+    stats['documents'] = len(documents)
+    stats['chunking_seconds'] = chunking_seconds
+    return stats
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Embeddings des chunks avec cache par empreinte")
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--base-url', default=None, help="API compatible OpenAI (défaut : OPENAI_BASE_URL ou api.openai.com)")
+    parser.add_argument('--limit', type=int, default=None, help="Nombre maximum de documents")
+    parser.add_argument('--workers', type=int, default=None, help="Processus d'extraction PDF")
+    parser.add_argument('--batch-items', type=int, default=DEFAULT_MAX_ITEMS, help="Textes maximum par requête")
+    parser.add_argument('--batch-tokens', type=int, default=DEFAULT_MAX_TOKENS, help="Tokens maximum par requête")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Requêtes simultanées")
+    parser.add_argument('--output', type=Path, default=REPORT_PATH)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("INGESTION DES EMBEDDINGS")
+    print("=" * 70)
+
+    embedder = OpenAIEmbedder(args.model, args.base_url)
+    if embedder.base_url == DEFAULT_BASE_URL and not embedder.api_key:
+        print("❌ OPENAI_API_KEY manquant (ou --base-url vers un serveur local)")
+        sys.exit(1)
+
+    batcher = EmbeddingBatcher(embedder.embed_batch, args.batch_items, args.batch_tokens, args.concurrency)
+    documents = load_documents()[:args.limit]
+    stats = asyncio.run(ingest(documents, embedder, batcher, args.workers))
+
+    print("-" * 70)
+    print(f"  Hits cache      : {stats['hits']} ({stats['hit_rate']:.1%})")
+    print(f"  Misses          : {stats['misses']} ({stats['embedded']} textes distincts envoyés, "
+          f"{stats['api_requests']} requêtes, {stats['api_retries']} relances)")
+    print(f"  Tokens évités   : {stats['tokens_saved']:,} (~{stats['cost_saved_usd']:.4f} $)")
+    print(f"  Tokens envoyés  : {stats['tokens_sent']:,} (~{stats['cost_spent_usd']:.4f} $)")
+    print(f"  Embeddings      : {stats['embedding_seconds']:.1f} s")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'generated_at': datetime.now().isoformat(), **stats}, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Index vectoriel : {CHUNKS_INDEX_DIR}")
+    print(f"✅ Rapport sauvegardé : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Index ANN à fichiers inversés (IVF) pour les vecteurs de chunks.
+Un quantificateur grossier (k-means sphérique) répartit les vecteurs en
+listes ; une requête ne parcourt que les nprobe listes les plus proches.
+Les ajouts vont dans la liste la plus proche sans réentraînement (segment
+d'ajouts fusionné par compact()).
+Même format de résultats et de masques que vector_index.VectorIndex.
+"""
+
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from corpus import load_documents
+from vector_index import VECTORS_DIR, VectorIndex, normalize_rows, top_k
+
+IVF_DIR = VECTORS_DIR / "ivf"
+
+DEFAULT_NPROBE = 8
+# Échantillon d'entraînement du k-means : points par liste
+TRAINING_POINTS_PER_LIST = 64
+
+
+def default_n_lists(n_vectors: int) -> int:
+    """Nombre de listes usuel : ~4·√N."""
+    return max(1, min(n_vectors, int(4 * math.sqrt(n_vectors))))
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray, block_rows: int = 65536) -> np.ndarray:
+    """Liste la plus proche (cosinus) de chaque vecteur normalisé."""
+    lists = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), block_rows):
+        block = vectors[start:start + block_rows]
+        lists[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return lists
+
+
+def kmeans(vectors: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 42) -> np.ndarray:
+    """
+    K-means sphérique sur un échantillon des vecteurs.
+
+    Args:
+        vectors: Vecteurs normalisés (N × d)
+        n_lists: Nombre de centroïdes
+        iterations: Itérations de Lloyd
+        seed: Graine aléatoire
+
+    Returns:
+        Centroïdes normalisés (n_lists × d)
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_lists * TRAINING_POINTS_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = assign(sample, centroids)
+        counts = np.bincount(labels, minlength=n_lists)
+        order = np.argsort(labels, kind='stable')
+        sums = np.zeros_like(centroids)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        present = counts > 0
+        sums[present] = np.add.reduceat(sample[order], starts[present], axis=0)
+        # Listes vides : réinitialisées sur des points aléatoires
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex(VectorIndex):
+    """
+    Index IVF persistant.
+
+    Fichiers (dans index_dir) :
+        centroids.npy      : centroïdes (n_lists × d)
+        vectors.npy        : vecteurs regroupés par liste (mmap)
+        line_ids.npy       : ligne d'origine de chaque position de vectors.npy
+        offsets.npy        : début de chaque liste (n_lists + 1)
+        added_vectors.npy  : segment d'ajouts (vecteurs)
+        added_lists.npy    : liste de chaque ajout
+        document_rows.npy  : row id du document par ligne
+        rows.json          : métadonnées par ligne (format VectorIndex)
+    """
+
+    def __init__(self, index_dir: Path, centroids: np.ndarray, vectors: np.ndarray,
+                 line_ids: np.ndarray, offsets: np.ndarray, added_vectors: np.ndarray,
+                 added_lists: np.ndarray, document_rows: np.ndarray,
+                 rows: List[Dict[str, Any]], nprobe: int = DEFAULT_NPROBE):
+        super().__init__(index_dir, vectors, document_rows, rows)
+        self.centroids = centroids
+        self.line_ids = line_ids
+        self.offsets = offsets
+        self.added_vectors = added_vectors
+        self.added_lists = added_lists
+        self.nprobe = nprobe
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, rows: List[Dict[str, Any]], index_dir: Path = IVF_DIR,
+              doc_ids: Optional[Sequence[str]] = None, n_lists: Optional[int] = None,
+              iterations: int = 10, seed: int = 42) -> 'IVFIndex':
+        """
+        Entraîne le quantificateur, répartit les vecteurs et écrit l'index.
+
+        Args:
+            vectors: Embeddings (N × d), dans l'ordre de rows
+            rows: Métadonnées par ligne (chunkId, documentId, documentPath, text)
+            index_dir: Dossier de destination
+            doc_ids: document_id par row id de document (par défaut l'ordre du corpus)
+            n_lists: Nombre de listes (par défaut ~4·√N)
+            iterations: Itérations du k-means
+            seed: Graine aléatoire
+
+        Returns:
+            Index chargé
+        """
+        if len(vectors) != len(rows):
+            raise ValueError(f"{len(vectors)} vecteurs pour {len(rows)} lignes")
+        # Réutilise l'écriture de VectorIndex pour rows.json / document_rows.npy
+        flat = VectorIndex.build(vectors, rows, index_dir, doc_ids)
+        normalized = np.array(flat.vectors)
+
+        centroids = kmeans(normalized, n_lists or default_n_lists(len(normalized)), iterations, seed)
+        lists = assign(normalized, centroids)
+        order = np.argsort(lists, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=len(centroids)))])
+
+        del flat
+        np.save(index_dir / "centroids.npy", centroids)
+        np.save(index_dir / "vectors.npy", normalized[order])
+        np.save(index_dir / "line_ids.npy", order.astype(np.int64))
+        np.save(index_dir / "offsets.npy", offsets.astype(np.int64))
+        cls._save_added(index_dir, np.empty((0, centroids.shape[1]), dtype=np.float32),
+                        np.empty(0, dtype=np.int32))
+        return cls.load(index_dir)
+
+    @classmethod
+    def load(cls, index_dir: Path = IVF_DIR, nprobe: int = DEFAULT_NPROBE) -> 'IVFIndex':
+        """Ouvre un index existant (vecteurs regroupés en mmap)."""
+        with open(index_dir / "rows.json", 'r', encoding='utf-8') as f:
+            rows = json.load(f)['rows']
+        return cls(
+            index_dir,
+            np.load(index_dir / "centroids.npy"),
+            np.load(index_dir / "vectors.npy", mmap_mode='r'),
+            np.load(index_dir / "line_ids.npy"),
+            np.load(index_dir / "offsets.npy"),
+            np.load(index_dir / "added_vectors.npy"),
+            np.load(index_dir / "added_lists.npy"),
+            np.load(index_dir / "document_rows.npy"),
+            rows,
+            nprobe,
+        )
+
+    @staticmethod
+    def _save_added(index_dir: Path, added_vectors: np.ndarray, added_lists: np.ndarray):
+        np.save(index_dir / "added_vectors.npy", added_vectors)
+        np.save(index_dir / "added_lists.npy", added_lists)
+
+    def _save_rows(self):
+        np.save(self.index_dir / "document_rows.npy", self.document_rows)
+        with open(self.index_dir / "rows.json", 'w', encoding='utf-8') as f:
+            json.dump({'generated_at': datetime.now().isoformat(), 'rows': self.rows}, f, ensure_ascii=False)
+
+    def add(self, vectors: np.ndarray, rows: List[Dict[str, Any]],
+            doc_ids: Optional[Sequence[str]] = None):
+        """
+        Ajoute des vecteurs dans leur liste la plus proche, sans réentraînement.
+
+        Args:
+            vectors: Nouveaux embeddings (M × d)
+            rows: Métadonnées des nouvelles lignes
+            doc_ids: document_id par row id de document (par défaut l'ordre du corpus)
+        """
+        if len(vectors) != len(rows):
+            raise ValueError(f"{len(vectors)} vecteurs pour {len(rows)} lignes")
+        if doc_ids is None:
+            doc_ids = [d['document_id'] for d in load_documents()]
+        doc_row_by_id = {doc_id: row for row, doc_id in enumerate(doc_ids)}
+
+        normalized = normalize_rows(np.atleast_2d(vectors))
+        self.added_vectors = np.concatenate([self.added_vectors, normalized])
+        self.added_lists = np.concatenate([self.added_lists, assign(normalized, self.centroids)])
+        self.document_rows = np.concatenate([self.document_rows, np.array(
+            [doc_row_by_id.get(row.get('documentId'), -1) for row in rows], dtype=np.int32)])
+        self.rows.extend(
+            {
+                'chunkId': row.get('chunkId', row.get('documentId')),
+                'documentId': row.get('documentId'),
+                'documentPath': row.get('documentPath', ''),
+                'text': row.get('text', ''),
+            }
+            for row in rows
+        )
+        self._save_added(self.index_dir, self.added_vectors, self.added_lists)
+        self._save_rows()
+
+    def compact(self):
+        """Fusionne le segment d'ajouts dans les listes (sans nouveau k-means)."""
+        if not len(self.added_vectors):
+            return
+        main_lists = np.repeat(np.arange(self.n_lists, dtype=np.int32), np.diff(self.offsets))
+        first_added = len(self.rows) - len(self.added_vectors)
+        lists = np.concatenate([main_lists, self.added_lists])
+        vectors = np.concatenate([np.asarray(self.vectors), self.added_vectors])
+        line_ids = np.concatenate([self.line_ids, np.arange(first_added, len(self.rows), dtype=np.int64)])
+        order = np.argsort(lists, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=self.n_lists))])
+
+        self.vectors = None
+        np.save(self.index_dir / "vectors.npy", vectors[order])
+        np.save(self.index_dir / "line_ids.npy", line_ids[order])
+        np.save(self.index_dir / "offsets.npy", offsets.astype(np.int64))
+        self._save_added(self.index_dir, self.added_vectors[:0], self.added_lists[:0])
+
+        self.vectors = np.load(self.index_dir / "vectors.npy", mmap_mode='r')
+        self.line_ids = line_ids[order]
+        self.offsets = offsets.astype(np.int64)
+        self.added_vectors = self.added_vectors[:0]
+        self.added_lists = self.added_lists[:0]
+
+    def search_rows(self, queries: np.ndarray, k: int = 10,
+                    mask: Optional[np.ndarray] = None, nprobe: Optional[int] = None) -> List[List[tuple]]:
+        """
+        Top-k approximatif (ligne, score) pour un lot de requêtes.
+
+        Args:
+            queries: Embeddings des requêtes (Q × d) ou (d,)
+            k: Nombre de résultats par requête
+            mask: Booléens par ligne d'origine (True = autorisée), None = toutes
+            nprobe: Listes parcourues par requête (par défaut self.nprobe)
+
+        Returns:
+            Une liste de (ligne, score) par requête
+        """
+        queries = normalize_rows(np.atleast_2d(queries))
+        probes = top_k(queries @ self.centroids.T, nprobe or self.nprobe)
+        first_added = len(self.rows) - len(self.added_vectors)
+
+        results = []
+        for query, probe in zip(queries, probes):
+            positions = np.concatenate([
+                np.arange(self.offsets[lst], self.offsets[lst + 1]) for lst in probe
+            ])
+            added = np.flatnonzero(np.isin(self.added_lists, probe))
+            lines = np.concatenate([self.line_ids[positions], added + first_added])
+            scores = np.concatenate([self.vectors[positions] @ query, self.added_vectors[added] @ query])
+            if mask is not None:
+                scores[~mask[lines]] = -np.inf
+            best = top_k(scores[np.newaxis, :], k)[0]
+            results.append([
+                (int(lines[i]), float(scores[i])) for i in best if scores[i] != -np.inf
+            ])
+        return results
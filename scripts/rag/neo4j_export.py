@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Export du graphe au format CSV de `neo4j-admin database import`.
+Nœuds Document, Chunk et Entity, relations BELONGS_TO (Chunk → Document),
+MENTIONED_IN (Entity → Document) et REMPLACE / MODIFIE / REFERENCE /
+COMPLETE entre documents. Les identifiants sont stables (document_id,
+chunkId, forme normalisée du terme) et les en-têtes typés : une
+reconstruction complète du graphe est un import hors ligne unique, au
+lieu de requêtes Cypher élément par élément pendant l'ingestion.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+from analyzer import normalize
+from chunking import chunk_document
+from corpus import PROJECT_ROOT, load_documents, load_vocabulary
+from document_text import load_all_pages
+from ingest_embeddings import CHUNKS_INDEX_DIR
+from reference_index import ReferenceIndex
+from relation_graph import RELATIONS, RelationGraph
+from vector_index import VectorIndex
+
+EXPORT_DIR = PROJECT_ROOT / "output" / "neo4j_import"
+
+ARRAY_DELIMITER = ';'
+
+# En-têtes typés (id:ID(groupe), propriété:type, :LABEL / :TYPE)
+DOCUMENT_HEADER = [
+    'id:ID(Document)', 'filePath', 'titre', 'type_document', 'statut', 'date_publication:date',
+    'date_effet:date', 'annee_reference:int', 'categories_metier:string[]', 'mots_cles:string[]', ':LABEL',
+]
+CHUNK_HEADER = ['id:ID(Chunk)', 'documentId', 'text', 'page_start:int', 'page_end:int', ':LABEL']
+ENTITY_HEADER = ['id:ID(Entity)', 'nom', 'type', 'description', 'synonymes:string[]', ':LABEL']
+BELONGS_TO_HEADER = [':START_ID(Chunk)', ':END_ID(Document)', ':TYPE']
+MENTIONED_IN_HEADER = [':START_ID(Entity)', ':END_ID(Document)', ':TYPE']
+DOCUMENT_RELATION_HEADER = [':START_ID(Document)', ':END_ID(Document)', ':TYPE']
+
+
+def entity_id(term: str) -> str:
+    """Identifiant stable d'une entité : forme normalisée du terme."""
+    return normalize(term).replace(' ', '_')
+
+
+def array(values: List[Any]) -> str:
+    """Valeur de tableau neo4j-admin (le délimiteur est retiré des éléments)."""
+    return ARRAY_DELIMITER.join(str(v).replace(ARRAY_DELIMITER, ',') for v in values if v not in (None, ''))
+
+
+def load_chunks(documents: List[Dict[str, Any]], index_dir: Path = CHUNKS_INDEX_DIR,
+                with_vectors: bool = False) -> Tuple[List[Dict[str, Any]], Optional[np.ndarray]]:
+    """
+    Chunks de l'index vectoriel s'il existe, sinon découpés depuis le cache du texte intégral.
+
+    Returns:
+        (chunks, vecteurs ou None)
+    """
+    if (index_dir / "rows.json").exists():
+        index = VectorIndex.load(index_dir)
+        return index.rows, (np.asarray(index.vectors) if with_vectors else None)
+    all_pages = load_all_pages(documents)
+    chunks = [
+        chunk
+        for metadata in documents
+        for chunk in chunk_document(metadata, all_pages[metadata['document_id']])
+    ]
+    return chunks, None
+
+
+def document_rows(documents: List[Dict[str, Any]]) -> Iterator[List[Any]]:
+    for metadata in documents:
+        meta = metadata.get('metadata', {})
+        classification = metadata.get('classification', {})
+        yield [
+            metadata['document_id'], metadata.get('fichier', ''), meta.get('titre', ''),
+            classification.get('type_document', ''), meta.get('statut', ''),
+            (meta.get('date_publication') or '')[:10], (meta.get('date_effet') or '')[:10],
+            classification.get('annee_reference', ''), array(classification.get('categories_metier', [])),
+            array(metadata.get('mots_cles', [])), 'Document',
+        ]
+
+
+def chunk_rows(chunks: List[Dict[str, Any]], vectors: Optional[np.ndarray] = None) -> Iterator[List[Any]]:
+    for i, chunk in enumerate(chunks):
+        row = [chunk['chunkId'], chunk['documentId'], chunk['text'],
+               chunk.get('page_start', ''), chunk.get('page_end', ''), 'Chunk']
+        if vectors is not None:
+            row.insert(-1, array(f'{x:.6g}' for x in vectors[i].tolist()))
+        yield row
+
+
+def collect_entities(documents: List[Dict[str, Any]],
+                     vocabulary: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[tuple]]:
+    """
+    Entités du vocabulaire global et des vocabulaire_specifique des documents,
+    fusionnées par forme normalisée.
+
+    Returns:
+        (entités par identifiant, arêtes (entité, document_id))
+    """
+    entities: Dict[str, Dict[str, Any]] = {}
+
+    def add(term: str, kind: str, description: str, synonyms: List[str]) -> Optional[str]:
+        key = entity_id(term)
+        if not key:
+            return None
+        entity = entities.setdefault(key, {'nom': term, 'type': kind, 'description': description, 'synonymes': []})
+        entity['description'] = entity['description'] or description
+        entity['synonymes'].extend(s for s in synonyms if s not in entity['synonymes'])
+        return key
+
+    for entry in vocabulary:
+        add(entry['terme'], entry.get('domaine') or 'terme', entry.get('definition', ''), entry.get('synonymes', []))
+
+    mentions = set()
+    for metadata in documents:
+        for entry in metadata.get('vocabulaire_specifique', []):
+            key = add(entry['terme'], 'terme', entry.get('definition', ''), entry.get('synonymes', []))
+            if key:
+                mentions.add((key, metadata['document_id']))
+    return entities, sorted(mentions)
+
+
+def write_csv(path: Path, header: List[str], rows) -> int:
+    """Écrit un fichier avec en-tête ; renvoie le nombre de lignes."""
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def import_command(files: Dict[str, str], database: str = 'neo4j') -> str:
+    """Commande neo4j-admin correspondant aux fichiers exportés."""
+    nodes = ' '.join(f"--nodes={name}" for name, kind in files.items() if kind == 'nodes')
+    relationships = ' '.join(f"--relationships={name}" for name, kind in files.items() if kind == 'relationships')
+    return (f"neo4j-admin database import full {nodes} {relationships} "
+            f"--array-delimiter='{ARRAY_DELIMITER}' --multiline-fields=true --overwrite-destination {database}")
+
+
+def export(documents: List[Dict[str, Any]], chunks: List[Dict[str, Any]], vocabulary: List[Dict[str, Any]],
+           graph: RelationGraph, output_dir: Path = EXPORT_DIR,
+           vectors: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Écrit les fichiers nœuds / relations et le manifeste.
+
+    Args:
+        documents: Métadonnées triées (corpus.load_documents())
+        chunks: Chunks {chunkId, documentId, text, page_start, page_end}
+        vocabulary: Vocabulaire notarial global
+        graph: Relations entre documents
+        output_dir: Dossier de sortie
+        vectors: Embeddings des chunks (colonne embedding:float[] si fournis)
+
+    Returns:
+        Manifeste : nombre de lignes par fichier et commande d'import
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    entities, mentions = collect_entities(documents, vocabulary)
+    chunk_header = CHUNK_HEADER if vectors is None else CHUNK_HEADER[:-1] + ['embedding:float[]', ':LABEL']
+
+    def relation_rows():
+        for relation in RELATIONS:
+            for document_id in graph.document_ids:
+                for target in graph.targets(document_id, relation):
+                    yield [document_id, target, relation.upper()]
+
+    outputs = [
+        ('documents.csv', 'nodes', DOCUMENT_HEADER, document_rows(documents)),
+        ('chunks.csv', 'nodes', chunk_header, chunk_rows(chunks, vectors)),
+        ('entities.csv', 'nodes', ENTITY_HEADER, (
+            [key, e['nom'], e['type'], e['description'], array(e['synonymes']), 'Entity']
+            for key, e in sorted(entities.items())
+        )),
+        ('belongs_to.csv', 'relationships', BELONGS_TO_HEADER, (
+            [chunk['chunkId'], chunk['documentId'], 'BELONGS_TO'] for chunk in chunks
+        )),
+        ('mentioned_in.csv', 'relationships', MENTIONED_IN_HEADER, (
+            [key, document_id, 'MENTIONED_IN'] for key, document_id in mentions
+        )),
+        ('document_relations.csv', 'relationships', DOCUMENT_RELATION_HEADER, relation_rows()),
+    ]
+    counts = {name: write_csv(output_dir / name, header, rows) for name, _, header, rows in outputs}
+    files = {name: kind for name, kind, _, _ in outputs}
+    manifest = {
+        'generated_at': datetime.now().isoformat(),
+        'files': {name: {'kind': files[name], 'rows': counts[name]} for name in files},
+        'command': import_command(files),
+    }
+    with open(output_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def check_export(output_dir: Path = EXPORT_DIR) -> List[str]:
+    """
+    Vérifie un export sans base : identifiants uniques par groupe et
+    extrémités de relations existantes.
+
+    Returns:
+        Liste des problèmes (vide si l'export est importable)
+    """
+    problems = []
+    ids: Dict[str, set] = {}
+    with open(output_dir / "manifest.json", 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    for name, info in manifest['files'].items():
+        with open(output_dir / name, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            if info['kind'] == 'nodes':
+                group = header[0].split('(')[1].rstrip(')')
+                seen = ids.setdefault(group, set())
+                for row in reader:
+                    if len(row) != len(header):
+                        problems.append(f"{name} : {len(row)} colonnes au lieu de {len(header)}")
+                    if row[0] in seen:
+                        problems.append(f"{name} : identifiant dupliqué {row[0]}")
+                    seen.add(row[0])
+    for name, info in manifest['files'].items():
+        if info['kind'] != 'relationships':
+            continue
+        with open(output_dir / name, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            start_group = header[0].split('(')[1].rstrip(')')
+            end_group = header[1].split('(')[1].rstrip(')')
+            for row in reader:
+                if row[0] not in ids.get(start_group, ()):
+                    problems.append(f"{name} : {start_group} inconnu {row[0]}")
+                if row[1] not in ids.get(end_group, ()):
+                    problems.append(f"{name} : {end_group} inconnu {row[1]}")
+    return problems
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Export CSV pour neo4j-admin database import")
+    parser.add_argument('--output', type=Path, default=EXPORT_DIR)
+    parser.add_argument('--embeddings', action='store_true', help="Inclure les embeddings des chunks (index vectoriel)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("EXPORT NEO4J (IMPORT EN MASSE)")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    documents = load_documents()
+    chunks, vectors = load_chunks(documents, with_vectors=args.embeddings)
+    if args.embeddings and vectors is None:
+        print("⚠️  Index vectoriel des chunks absent : export sans embeddings")
+    graph = RelationGraph.build(documents, resolve=ReferenceIndex.build(documents).resolve)
+    manifest = export(documents, chunks, load_vocabulary(), graph, args.output, vectors)
+    elapsed = time.perf_counter() - start
+
+    for name, info in manifest['files'].items():
+        print(f"   {name:25s} {info['kind']:14s} {info['rows']:7d} lignes")
+    problems = check_export(args.output)
+    if problems:
+        for problem in problems[:20]:
+            print(f"❌ {problem}")
+        print(f"❌ {len(problems)} problèmes dans l'export")
+        sys.exit(1)
+    print(f"\n✅ Export vérifié en {elapsed:.1f} s → {args.output}")
+    print(f"\n{manifest['command']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Serveur HTTP asynchrone local au format de l'API OpenAI (POST
+/chat/completions et /embeddings, avec ou sans préfixe /v1), pour tester en
+charge le chemin RAG sans réseau.
+Les embeddings sont déterministes (somme de projections aléatoires amorcées
+par le hachage de chaque mot, normalisée : des textes proches ont des
+vecteurs proches) ; les complétions sont des réponses JSON préparées selon
+le prompt (stratégie, entités, raisonnement, synthèse). Distribution de
+latence, taux d'erreurs et limite de débit (429 + Retry-After) sont
+configurables. GET /stats renvoie les compteurs et percentiles.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+import numpy as np
+
+DEFAULT_DIM = 1536
+WORD = re.compile(r'\w+')
+QUESTION = re.compile(r'Question\s*:\s*"(.+?)"\s*$', re.MULTILINE)
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 429: 'Too Many Requests',
+               500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+def latency_distribution(spec: str) -> Callable[[random.Random], float]:
+    """
+    Distribution de latence (ms) à partir d'une description.
+
+    Formats : 'fixed:50', 'uniform:20:80', 'exp:100' (moyenne),
+    'lognormal:200:0.6' (médiane, sigma), 'pareto:50:1.5' (minimum, forme)
+    """
+    kind, *params = spec.split(':')
+    values = [float(p) for p in params]
+    if kind == 'fixed':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'exp':
+        return lambda rng: rng.expovariate(1 / values[0])
+    if kind == 'lognormal':
+        return lambda rng: values[0] * rng.lognormvariate(0, values[1])
+    if kind == 'pareto':
+        return lambda rng: values[0] * rng.paretovariate(values[1])
+    raise ValueError(f"Distribution de latence inconnue : {spec}")
+
+
+@lru_cache(maxsize=100_000)
+def word_vector(word: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+    return np.random.default_rng(seed).standard_normal(dim, dtype=np.float32)
+
+
+def stub_embedding(text: str, dim: int = DEFAULT_DIM) -> List[float]:
+    """Embedding déterministe : projections des mots sommées puis normalisées."""
+    words = WORD.findall(text.lower()) or [text]
+    vector = np.sum([word_vector(word, dim) for word in words], axis=0)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def question_of(messages: List[Dict[str, Any]]) -> str:
+    """Question posée : `Question: "..."` dans le prompt, sinon dernier message utilisateur."""
+    for message in reversed(messages):
+        if message.get('role') == 'user':
+            content = message.get('content')
+            content = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+            quoted = QUESTION.search(content)
+            return quoted.group(1) if quoted else content
+    return ''
+
+
+def default_completion(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Réponse JSON préparée selon la tâche reconnue dans le prompt."""
+    prompt = ' '.join(str(m.get('content', '')) for m in messages)
+    question = question_of(messages)
+    digest = hashlib.blake2b(question.encode('utf-8'), digest_size=4).digest()
+    if re.search(r'VECTOR_ONLY|GRAPH_FIRST|strat[ée]gie|strategy', prompt, re.IGNORECASE):
+        return {'strategy': ('VECTOR_ONLY', 'GRAPH_FIRST', 'HYBRID')[digest[0] % 3]}
+    if re.search(r'entit', prompt, re.IGNORECASE):
+        return {'entities': re.findall(r"\b[A-ZÉ][\w'-]*(?:\s+[A-ZÉ][\w'-]*)*", question)[:5]}
+    if re.search(r'search_query|reformul|raisonnement|thought', prompt, re.IGNORECASE):
+        return {'thought': "Recherche directe de la question", 'search_query': question}
+    if re.search(r'rerank|pertinence|classe', prompt, re.IGNORECASE):
+        return {'ranking': list(range(5))}
+    return {'answer': f"Réponse simulée à : {question[:200]}", 'citations': []}
+
+
+def check_request(endpoint: str, request: Any):
+    """Forme minimale d'une requête ; ValueError (→ 400 invalid_request_error) sinon."""
+    if not isinstance(request, dict):
+        raise ValueError("Le corps de la requête doit être un objet JSON")
+    if endpoint == '/embeddings':
+        texts = request.get('input', [])
+        if not isinstance(texts, str) and not (isinstance(texts, list) and all(isinstance(t, str) for t in texts)):
+            raise ValueError("input doit être une chaîne ou une liste de chaînes (tableaux de jetons non pris en charge)")
+    else:
+        messages = request.get('messages', [])
+        if not isinstance(messages, list) or not all(isinstance(m, dict) for m in messages):
+            raise ValueError("messages doit être une liste d'objets")
+
+
+class StubConfig:
+    """Paramètres du serveur simulé."""
+
+    def __init__(self, chat_latency: str = 'lognormal:800:0.5', embedding_latency: str = 'lognormal:150:0.4',
+                 item_ms: float = 0.2, error_rate: float = 0.0, rate_limit: Optional[float] = None,
+                 burst: int = 10, dim: int = DEFAULT_DIM, seed: int = 42,
+                 responses: Optional[List[Dict[str, Any]]] = None):
+        """
+        Args:
+            chat_latency, embedding_latency: Distributions (voir latency_distribution)
+            item_ms: Latence ajoutée par texte à vectoriser
+            error_rate: Part de réponses 500 / 503
+            rate_limit: Requêtes par seconde autorisées (None = illimité)
+            burst: Capacité du seau de jetons
+            dim: Dimension des embeddings (le paramètre `dimensions` de la requête prime)
+            seed: Graine des latences et des erreurs
+            responses: Réponses préparées [{'pattern': regex sur le prompt, 'content': JSON}]
+        """
+        self.chat_latency = latency_distribution(chat_latency)
+        self.embedding_latency = latency_distribution(embedding_latency)
+        self.item_ms = item_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.dim = dim
+        self.seed = seed
+        self.responses = [(re.compile(r['pattern'], re.IGNORECASE), r['content']) for r in (responses or [])]
+        self.description = {
+            'chat_latency': chat_latency, 'embedding_latency': embedding_latency, 'item_ms': item_ms,
+            'error_rate': error_rate, 'rate_limit': rate_limit, 'burst': burst, 'dim': dim, 'seed': seed,
+        }
+
+
+class OpenAIStubServer:
+    """Serveur asyncio ; start() dans une boucle existante ou start_in_thread()."""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or StubConfig()
+        self.host = host
+        self.port = port
+        self.rng = random.Random(self.config.seed)
+        self.tokens = float(self.config.burst)
+        self.refilled_at = time.monotonic()
+        self.stats: Dict[str, Any] = {'requests': {}, 'statuses': {}, 'latencies_ms': {}}
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def start_in_thread(self) -> str:
+        """Démarre le serveur dans sa propre boucle (thread démon) ; renvoie base_url."""
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.base_url
+
+    def shutdown(self):
+        """Arrête un serveur lancé par start_in_thread()."""
+        future = asyncio.run_coroutine_threadsafe(self.stop(), self._loop)
+        future.result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _rate_limited(self) -> Optional[float]:
+        """Délai avant le prochain jeton si la limite est atteinte."""
+        if not self.config.rate_limit:
+            return None
+        now = time.monotonic()
+        self.tokens = min(self.config.burst, self.tokens + (now - self.refilled_at) * self.config.rate_limit)
+        self.refilled_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return None
+        return (1 - self.tokens) / self.config.rate_limit
+
+    def _record(self, endpoint: str, status: int, elapsed_ms: float):
+        self.stats['requests'][endpoint] = self.stats['requests'].get(endpoint, 0) + 1
+        self.stats['statuses'][str(status)] = self.stats['statuses'].get(str(status), 0) + 1
+        if status != 429:
+            self.stats['latencies_ms'].setdefault(endpoint, []).append(elapsed_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        """Compteurs et percentiles de latence par point d'entrée."""
+        percentiles = {
+            endpoint: {f"p{p}": float(np.percentile(values, p)) for p in (50, 90, 99)}
+            for endpoint, values in self.stats['latencies_ms'].items() if values
+        }
+        return {'requests': self.stats['requests'], 'statuses': self.stats['statuses'],
+                'latency_ms': percentiles, 'config': self.config.description}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+            lines = head.decode('latin-1').split('\r\n')
+            method, path, _ = lines[0].split(' ', 2)
+            headers = {k.strip().lower(): v.strip() for k, v in (line.split(':', 1) for line in lines[1:] if ':' in line)}
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            status, payload, extra = await self._route(method, path.split('?')[0], body)
+        except (asyncio.IncompleteReadError, ValueError) as e:
+            status, payload, extra = 400, {'error': {'message': str(e), 'type': 'invalid_request_error'}}, {}
+        except Exception as e:
+            # Toujours une réponse HTTP : un client ne doit pas voir la connexion coupée
+            status, payload, extra = 500, {'error': {'message': f"{type(e).__name__}: {e}", 'type': 'server_error'}}, {}
+
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        response = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}", 'Content-Type: application/json',
+                    f"Content-Length: {len(data)}", 'Connection: close']
+        response.extend(f"{k}: {v}" for k, v in extra.items())
+        writer.write(('\r\n'.join(response) + '\r\n\r\n').encode('latin-1') + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes):
+        endpoint = path[3:] if path.startswith('/v1/') else path
+        if method == 'GET' and endpoint == '/stats':
+            return 200, self.summary(), {}
+        if method != 'POST' or endpoint not in ('/chat/completions', '/embeddings'):
+            return 404, {'error': {'message': f"{method} {path} inconnu", 'type': 'invalid_request_error'}}, {}
+
+        start = time.perf_counter()
+        request = json.loads(body or b'{}')
+        check_request(endpoint, request)
+        wait = self._rate_limited()
+        if wait is not None:
+            self._record(endpoint, 429, 0.0)
+            return 429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_exceeded'}}, \
+                {'Retry-After': f"{wait:.3f}"}
+
+        if endpoint == '/embeddings':
+            texts = request.get('input', [])
+            texts = [texts] if isinstance(texts, str) else texts
+            delay_ms = self.config.embedding_latency(self.rng) + self.config.item_ms * len(texts)
+        else:
+            delay_ms = self.config.chat_latency(self.rng)
+        fail = self.rng.random() < self.config.error_rate
+        await asyncio.sleep(delay_ms / 1000)
+
+        if fail:
+            status = self.rng.choice((500, 503))
+            self._record(endpoint, status, (time.perf_counter() - start) * 1000)
+            return status, {'error': {'message': 'Simulated failure', 'type': 'server_error'}}, {}
+
+        if endpoint == '/embeddings':
+            payload = self._embeddings(request, texts)
+        else:
+            payload = self._chat(request)
+        self._record(endpoint, 200, (time.perf_counter() - start) * 1000)
+        return 200, payload, {}
+
+    def _embeddings(self, request: Dict[str, Any], texts: List[str]) -> Dict[str, Any]:
+        dim = request.get('dimensions') or self.config.dim
+        tokens = sum(estimate_tokens(text) for text in texts)
+        return {
+            'object': 'list',
+            'data': [{'object': 'embedding', 'index': i, 'embedding': stub_embedding(text, dim)}
+                     for i, text in enumerate(texts)],
+            'model': request.get('model'),
+            'usage': {'prompt_tokens': tokens, 'total_tokens': tokens},
+        }
+
+    def _chat(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        messages = request.get('messages', [])
+        prompt = ' '.join(str(m.get('content', '')) for m in messages)
+        content = next((c for pattern, c in self.config.responses if pattern.search(prompt)), None)
+        if content is None:
+            content = default_completion(messages)
+        text = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(text)
+        return {
+            'id': f"chatcmpl-stub-{sum(self.stats['requests'].values())}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        }
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Serveur OpenAI simulé (chat + embeddings)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--chat-latency', default='lognormal:800:0.5', help="Ex. fixed:50, lognormal:800:0.5")
+    parser.add_argument('--embedding-latency', default='lognormal:150:0.4')
+    parser.add_argument('--item-ms', type=float, default=0.2, help="Latence par texte à vectoriser")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None, help="Requêtes par seconde")
+    parser.add_argument('--burst', type=int, default=10)
+    parser.add_argument('--dim', type=int, default=DEFAULT_DIM)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--responses', type=Path, default=None,
+                        help="JSON [{pattern, content}] de réponses préparées")
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses, 'r', encoding='utf-8') as f:
+            responses = json.load(f)
+    config = StubConfig(args.chat_latency, args.embedding_latency, args.item_ms, args.error_rate,
+                        args.rate_limit, args.burst, args.dim, args.seed, responses)
+    server = OpenAIStubServer(config, args.host, args.port)
+
+    print("=" * 70)
+    print("SERVEUR OPENAI SIMULÉ")
+    print("=" * 70)
+
+    async def serve():
+        await server.start()
+        print(f"✅ {server.base_url} (OPENAI_BASE_URL)  chat {args.chat_latency}, "
+              f"embeddings {args.embedding_latency}, {args.error_rate:.0%} d'erreurs")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n📊 {json.dumps(server.summary(), ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Cache à deux niveaux des embeddings de requêtes (questions utilisateur et
+search_query reformulées par _reasoning_step).
+Niveau 1 : LRU en mémoire ; niveau 2 : base SQLite sur disque. La clé est la
+requête normalisée (casse, accents, espaces) ; les entrées expirent après un
+TTL et les deux niveaux sont bornés en taille. Se place devant l'appel
+d'embedding : CachedQueryEmbedder(service._get_embeddings, cache).
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+import numpy as np
+
+from analyzer import strip_accents
+from corpus import INDEX_DIR, load_questions
+from embeddings import DEFAULT_BASE_URL, DEFAULT_MODEL, OpenAIEmbedder
+
+QUERY_CACHE_PATH = INDEX_DIR / "query_embeddings.sqlite"
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_DISK_ENTRIES = 100_000
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+
+def normalize_query(query: str) -> str:
+    """Clé de cache : minuscules, sans accents, espaces compactés."""
+    return ' '.join(strip_accents(query.lower()).split())
+
+
+class QueryEmbeddingCache:
+    """LRU en mémoire + stockage SQLite, avec TTL et métriques."""
+
+    def __init__(self, model: str, path: Optional[Path] = QUERY_CACHE_PATH,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 disk_entries: int = DEFAULT_DISK_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.model = model
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict = OrderedDict()
+        self.metrics = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+        self._db = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    model TEXT NOT NULL,
+                    query_key TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, query_key)
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON query_embeddings (model, last_used)")
+            self._db.commit()
+
+    def _remember(self, key: str, vector: np.ndarray, created_at: float):
+        self._memory[key] = (vector, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.metrics['evictions'] += 1
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """Embedding en cache (None si absent ou expiré)."""
+        key = normalize_query(query)
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            vector, created_at = entry
+            if now - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.metrics['memory_hits'] += 1
+                return vector
+            del self._memory[key]
+            self.metrics['expired'] += 1
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT vector, created_at FROM query_embeddings WHERE model = ? AND query_key = ?",
+                (self.model, key),
+            ).fetchone()
+            if row is not None:
+                if now - row[1] <= self.ttl_seconds:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._db.execute(
+                        "UPDATE query_embeddings SET last_used = ? WHERE model = ? AND query_key = ?",
+                        (now, self.model, key),
+                    )
+                    self._db.commit()
+                    self._remember(key, vector, row[1])
+                    self.metrics['disk_hits'] += 1
+                    return vector
+                self._db.execute("DELETE FROM query_embeddings WHERE model = ? AND query_key = ?", (self.model, key))
+                self._db.commit()
+                self.metrics['expired'] += 1
+
+        self.metrics['misses'] += 1
+        return None
+
+    def put(self, query: str, vector):
+        """Enregistre un embedding dans les deux niveaux."""
+        key = normalize_query(query)
+        vector = np.asarray(vector, dtype=np.float32)
+        now = time.time()
+        self._remember(key, vector, now)
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?, ?, ?)",
+            (self.model, key, vector.tobytes(), now, now),
+        )
+        # Bornes du niveau disque : entrées expirées puis moins récemment utilisées
+        self._db.execute("DELETE FROM query_embeddings WHERE model = ? AND created_at < ?",
+                         (self.model, now - self.ttl_seconds))
+        overflow = self._db.execute("SELECT COUNT(*) FROM query_embeddings WHERE model = ?",
+                                    (self.model,)).fetchone()[0] - self.disk_entries
+        if overflow > 0:
+            self._db.execute("""
+                DELETE FROM query_embeddings WHERE rowid IN (
+                    SELECT rowid FROM query_embeddings WHERE model = ? ORDER BY last_used LIMIT ?
+                )
+            """, (self.model, overflow))
+            self.metrics['evictions'] += overflow
+        self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Métriques cumulées (taux de hit global et par niveau)."""
+        lookups = self.metrics['memory_hits'] + self.metrics['disk_hits'] + self.metrics['misses']
+        hits = self.metrics['memory_hits'] + self.metrics['disk_hits']
+        return {
+            **self.metrics,
+            'lookups': lookups,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_hit_rate': self.metrics['memory_hits'] / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory),
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class CachedQueryEmbedder:
+    """
+    Enveloppe d'une coroutine d'embedding (texts → vecteurs), même signature
+    que RAGService._get_embeddings. Les requêtes identiques en vol sont
+    regroupées en un seul appel.
+    """
+
+    def __init__(self, embed: Callable[[List[str]], Awaitable[List[List[float]]]],
+                 cache: QueryEmbeddingCache):
+        self.embed = embed
+        self.cache = cache
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def __call__(self, texts: List[str]) -> List[List[float]]:
+        results: List[Optional[np.ndarray]] = [self.cache.get(text) for text in texts]
+        waiting: Dict[int, asyncio.Future] = {}
+        to_embed: Dict[str, List[int]] = {}
+        for i, (text, vector) in enumerate(zip(texts, results)):
+            if vector is not None:
+                continue
+            key = normalize_query(text)
+            if key in self._pending:
+                waiting[i] = self._pending[key]
+            else:
+                to_embed.setdefault(key, []).append(i)
+
+        if to_embed:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in to_embed}
+            self._pending.update(futures)
+            try:
+                keys = list(to_embed)
+                vectors = await self.embed([texts[to_embed[key][0]] for key in keys])
+                if len(vectors) != len(keys):
+                    raise ValueError(f"Le service d'embedding a renvoyé {len(vectors)} vecteurs "
+                                     f"pour {len(keys)} requêtes")
+                for key, vector in zip(keys, vectors):
+                    self.cache.put(texts[to_embed[key][0]], vector)
+                    vector = np.asarray(vector, dtype=np.float32)
+                    futures[key].set_result(vector)
+                    for i in to_embed[key]:
+                        results[i] = vector
+            except BaseException as e:
+                # Aucune attente regroupée ne doit rester suspendue, y compris si l'appelant est annulé
+                for future in futures.values():
+                    if future.done():
+                        continue
+                    if isinstance(e, Exception):
+                        future.set_exception(e)
+                        # Relevée par l'appelant : pas d'avertissement si personne n'attendait
+                        future.exception()
+                    else:
+                        future.cancel()
+                raise
+            finally:
+                for key in to_embed:
+                    self._pending.pop(key, None)
+
+        for i, future in waiting.items():
+            results[i] = await future
+        return [vector.tolist() for vector in results]
+
+
+def query_variants(question: str, rng: random.Random) -> str:
+    """Reformulation de surface (casse, accents, espaces) d'une question."""
+    variant = question
+    if rng.random() < 0.5:
+        variant = variant.lower()
+    if rng.random() < 0.3:
+        variant = strip_accents(variant)
+    if rng.random() < 0.3:
+        variant = '  '.join(variant.split())
+    return variant
+
+
+async def replay(embedder: CachedQueryEmbedder, questions: List[str], rounds: int, seed: int) -> List[float]:
+    """Rejoue les questions (avec variantes de surface) ; renvoie les latences."""
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(rounds):
+        for question in rng.sample(questions, len(questions)):
+            start = time.perf_counter()
+            await embedder([query_variants(question, rng)])
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    """Rejoue le dataset de test à travers le cache et affiche le taux de hit."""
+    parser = argparse.ArgumentParser(description="Cache des embeddings de requêtes")
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--base-url', default=None, help="API compatible OpenAI (défaut : OPENAI_BASE_URL ou api.openai.com)")
+    parser.add_argument('--rounds', type=int, default=3, help="Passages sur les questions du dataset")
+    parser.add_argument('--memory-entries', type=int, default=DEFAULT_MEMORY_ENTRIES)
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL_SECONDS, help="Durée de vie en secondes")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("CACHE DES EMBEDDINGS DE REQUÊTES")
+    print("=" * 70)
+
+    client = OpenAIEmbedder(args.model, args.base_url)
+    if client.base_url == DEFAULT_BASE_URL and not client.api_key:
+        print("❌ OPENAI_API_KEY manquant (ou --base-url vers un serveur local)")
+        sys.exit(1)
+
+    cache = QueryEmbeddingCache(args.model, memory_entries=args.memory_entries, ttl_seconds=args.ttl)
+    embedder = CachedQueryEmbedder(client.embed, cache)
+    questions = [q['question'] for q in load_questions()]
+    latencies = asyncio.run(replay(embedder, questions, args.rounds, args.seed))
+    cache.close()
+
+    stats = cache.stats()
+    latencies_ms = sorted(1000 * s for s in latencies)
+    print(f"📊 {stats['lookups']} requêtes, {client.requests} appels API")
+    print(f"  Hit rate        : {stats['hit_rate']:.1%} (mémoire {stats['memory_hits']}, "
+          f"disque {stats['disk_hits']}, misses {stats['misses']})")
+    print(f"  Expirées        : {stats['expired']} | évictions : {stats['evictions']}")
+    print(f"  Latence p50     : {latencies_ms[len(latencies_ms) // 2]:.3f} ms | max {latencies_ms[-1]:.1f} ms")
+    print(f"\n✅ Cache disque : {QUERY_CACHE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
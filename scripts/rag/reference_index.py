@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Index des références normalisées : « avenant 56 » → document_ids en O(1).
+Reconnaît avenants, circulaires (N° AAAA-N et NN-AA), fil-info, décrets et
+lois dans les noms de fichiers, titres et champs reference, avec leurs
+variantes d'écriture (N°, n°, no, n48, 2020/3, 2020-3, 05-20) et les
+énumérations d'avenants et de fil-info (« avenants 55, 56 et 58 »).
+Sert à la requête (correspondance exacte avant la recherche vectorielle)
+et à l'ingestion (résolution des cibles de relations_documentaires :
+RelationGraph.build(documents, resolve=index.resolve)).
+"""
+
+import argparse
+import json
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+from corpus import INDEX_DIR, load_documents, load_questions
+
+REFERENCES_FILE = INDEX_DIR / "references.json"
+
+# Marque de numéro facultative : N°, n°, no, numéro, "n48"
+NUMERO = r'(?:n\s*[°º]?|no\.?|num[ée]ro)?\s*'
+
+# (type, motif) appliqués au texte, "_" remplacés par des espaces
+REFERENCE_PATTERNS = [
+    ('avenant', re.compile(r'\bavenants?\s*' + NUMERO + r'(\d{1,3})\b', re.IGNORECASE)),
+    ('circulaire', re.compile(r'\bcirculaire[\s-]*(?:csn\s*)?' + NUMERO
+                              + r'(\d{4}\s?[-/ ]\s?\d{1,2}|\d{1,2}\s?[-/ ]\s?\d{2})\b', re.IGNORECASE)),
+    ('circulaire', re.compile(r'\b(\d{4}-\d{1,2})\s+circulaire\b', re.IGNORECASE)),
+    ('fil_info', re.compile(r'\bfil[\s-]?info[\s-]*' + NUMERO + r'(\d+)\b', re.IGNORECASE)),
+    ('decret', re.compile(r'\bd[ée]cret\s*' + NUMERO + r'(\d{2,4}\s?[-/ ]\s?\d+)\b', re.IGNORECASE)),
+    # Décrets consolidés nommés d_56-220_...
+    ('decret', re.compile(r'^d\s(\d{2}-\d{3,4})\b', re.IGNORECASE)),
+    ('loi', re.compile(r'\bloi\s*' + NUMERO + r'(\d{2,4}-\d+)\b', re.IGNORECASE)),
+]
+
+# Suite d'une énumération après le premier numéro : « , 56 et 58 », « et n°59 »
+# (les virgules seules ne suffisent pas : « avenant 12, 3 ans »)
+ENUMERATED = r'(?:\s*,\s*' + NUMERO + r'\d{{1,{n}}}\b)*\s*,?\s*(?:\bet\b|\bou\b|&)\s*' + NUMERO + r'\d{{1,{n}}}\b'
+ENUMERATIONS = {
+    'avenant': re.compile(ENUMERATED.format(n=3), re.IGNORECASE),
+    'fil_info': re.compile(ENUMERATED.format(n=4), re.IGNORECASE),
+}
+ENUMERATED_NUMBER = re.compile(r'\d+')
+
+REFERENCE_NAMES = {
+    'avenant': "Avenant n°{}",
+    'circulaire': "Circulaire {}",
+    'fil_info': "Fil-Info {}",
+    'decret': "Décret {}",
+    'loi': "Loi {}",
+}
+
+
+def canonical_numero(kind: str, numero: str) -> str:
+    """
+    Numéro normalisé : "056" → "56", "2020/3" → "2020-3", "05-20" → "2020-5".
+
+    Les circulaires NN-AA (numéro-année) sont ramenées à la forme AAAA-N.
+    """
+    groups = re.findall(r'\d+', numero)
+    if kind in ('avenant', 'fil_info') or len(groups) < 2:
+        return str(int(groups[0]))
+    first, second = groups[0], groups[1]
+    if kind == 'circulaire' and len(first) <= 2 and len(second) == 2:
+        return f"20{second}-{int(first)}"
+    return f"{first}-{int(second)}"
+
+
+def reference_name(kind: str, numero: str) -> str:
+    """Forme canonique : ("circulaire", "N° 2020/3") → "Circulaire 2020-3"."""
+    return REFERENCE_NAMES[kind].format(canonical_numero(kind, numero))
+
+
+def enumerated_numbers(kind: str, text: str, position: int) -> List[Tuple[int, int, str]]:
+    """
+    Numéros qui suivent une référence énumérée : « avenants 55, 56 et 58 » → 56, 58.
+
+    Args:
+        kind: Type de la référence trouvée
+        text: Texte analysé
+        position: Fin de la référence trouvée
+
+    Returns:
+        (début, fin, numéro) de chaque numéro supplémentaire
+    """
+    pattern = ENUMERATIONS.get(kind)
+    match = pattern.match(text, position) if pattern else None
+    if not match:
+        return []
+    return [(position + number.start(), position + number.end(), number.group(0))
+            for number in ENUMERATED_NUMBER.finditer(match.group(0))]
+
+
+def find_references(text: str) -> List[Tuple[int, int, str]]:
+    """Références d'un texte : (début, fin, nom canonique) en caractères, dans l'ordre."""
+    text = text.replace('_', ' ')
+    found = {}
+    for kind, pattern in REFERENCE_PATTERNS:
+        for match in pattern.finditer(text):
+            found.setdefault((match.start(), match.end()), reference_name(kind, match.group(1)))
+            for start, end, numero in enumerated_numbers(kind, text, match.end()):
+                found.setdefault((start, end), reference_name(kind, numero))
+    return sorted((start, end, name) for (start, end), name in found.items())
+
+
+def document_references(metadata: Dict[str, Any]) -> List[str]:
+    """
+    Références qui désignent le document lui-même : champ reference, puis
+    première référence du nom de fichier et du titre (les suivantes sont des
+    citations).
+    """
+    names = []
+    reference = metadata.get('reference')
+    if reference and reference.get('type') in REFERENCE_NAMES and reference.get('numero'):
+        names.append(reference_name(reference['type'], reference['numero']))
+    for text in (metadata.get('nom_fichier') or '', metadata.get('metadata', {}).get('titre') or ''):
+        found = find_references(text)
+        if found and found[0][2] not in names:
+            names.append(found[0][2])
+    return names
+
+
+class ReferenceIndex:
+    """Référence canonique → document_ids."""
+
+    def __init__(self, entries: Dict[str, List[str]]):
+        self.entries = entries
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]]) -> 'ReferenceIndex':
+        entries: Dict[str, List[str]] = {}
+        for metadata in documents:
+            for name in document_references(metadata):
+                entries.setdefault(name, []).append(metadata['document_id'])
+        return cls(entries)
+
+    def save(self, path: Path = REFERENCES_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'references': self.entries,
+            }, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: Path = REFERENCES_FILE) -> 'ReferenceIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)['references'])
+
+    def documents(self, name: str) -> List[str]:
+        """document_ids d'une référence canonique ("Avenant n°56")."""
+        return self.entries.get(name, [])
+
+    def resolve(self, text: str) -> List[str]:
+        """
+        document_ids de toutes les références d'un texte libre.
+        Convient comme resolve de RelationGraph.build (« Décret 2024-906 »).
+        """
+        document_ids: Dict[str, None] = {}
+        for _, _, name in find_references(text):
+            document_ids.update(dict.fromkeys(self.entries.get(name, [])))
+        return list(document_ids)
+
+    def lookup(self, question: str) -> Dict[str, Any]:
+        """
+        Correspondance exacte d'une question, avant la recherche vectorielle.
+
+        Returns:
+            {references: {nom: document_ids}, document_ids: [...], unresolved: [noms hors corpus]}
+            document_ids non vide : les documents cités peuvent être servis directement
+        """
+        references: Dict[str, List[str]] = {}
+        for _, _, name in find_references(question):
+            references.setdefault(name, self.entries.get(name, []))
+        document_ids = list(dict.fromkeys(d for ids in references.values() for d in ids))
+        return {
+            'references': references,
+            'document_ids': document_ids,
+            'unresolved': [name for name, ids in references.items() if not ids],
+        }
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Construit l'index des références documentaires")
+    parser.add_argument('--question', help="Question à résoudre")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("INDEX DES RÉFÉRENCES DOCUMENTAIRES")
+    print("=" * 70)
+
+    documents = load_documents()
+    start = time.perf_counter()
+    index = ReferenceIndex.build(documents)
+    index.save()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    covered = len({d for ids in index.entries.values() for d in ids})
+    ambiguous = sum(1 for ids in index.entries.values() if len(ids) > 1)
+    print(f"✅ {len(index.entries)} références, {covered}/{len(documents)} documents couverts, "
+          f"{ambiguous} références partagées ({elapsed_ms:.1f} ms) → {REFERENCES_FILE}")
+
+    # Cibles de relations_documentaires résolues à l'ingestion
+    targets = [target for metadata in documents
+               for values in metadata.get('relations_documentaires', {}).values()
+               for target in values if isinstance(target, str)]
+    known = {metadata['document_id'] for metadata in documents}
+    textual = [target for target in targets if target not in known]
+    resolved = sum(1 for target in textual if index.resolve(target))
+    print(f"🔗 Relations : {resolved}/{len(textual)} cibles textuelles résolues")
+
+    questions = [args.question] if args.question else [q['question'] for q in load_questions()]
+    start = time.perf_counter()
+    results = [index.lookup(question) for question in questions]
+    per_query_us = (time.perf_counter() - start) * 1e6 / max(len(questions), 1)
+    hits = sum(1 for r in results if r['document_ids'])
+    print(f"⏱️  {per_query_us:.1f} µs par question, {hits}/{len(questions)} résolues par correspondance exacte")
+
+    if args.question:
+        for name, document_ids in results[0]['references'].items():
+            print(f"  🔎 {name} → {', '.join(document_ids) or 'hors corpus'}")
+
+
+if __name__ == "__main__":
+    main()
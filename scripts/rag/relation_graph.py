@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Graphe des relations_documentaires (remplace, modifie, reference, complete)
+en tableaux CSR (indptr / indices) sur les row ids des documents, dans les
+deux sens. La fermeture transitive de remplace / modifie est précalculée :
+« dernière version » et « tous les amendements » d'un document sont une
+lecture de tableau, sans parcours à la requête.
+Les séries annuelles sans relation déclarée (accords de salaires) sont
+chaînées par date : chaque accord remplace le précédent.
+"""
+
+import argparse
+import time
+from datetime import date
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+import numpy as np
+
+from corpus import INDEX_DIR, load_documents
+from reference_index import ReferenceIndex
+from temporal_index import parse_date, series_edges
+
+RELATIONS_FILE = INDEX_DIR / "relations.npz"
+
+RELATIONS = ('remplace', 'modifie', 'reference', 'complete')
+SUPERSEDING_RELATIONS = ('remplace', 'modifie')
+
+def document_date(metadata: Dict[str, Any]) -> Optional[date]:
+    meta = metadata.get('metadata', {})
+    return parse_date(meta.get('date_effet')) or parse_date(meta.get('date_publication'))
+
+
+def to_csr(n_rows: int, sources: np.ndarray, targets: np.ndarray):
+    """Arêtes (source, cible) → (indptr, indices), voisins triés par ligne."""
+    order = np.lexsort((targets, sources))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n_rows), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32)
+
+
+class RelationGraph:
+    """Adjacences CSR par relation et fermetures de remplacement précalculées."""
+
+    def __init__(self, document_ids: List[str], ordinals: np.ndarray, arrays: Dict[str, np.ndarray]):
+        self.document_ids = document_ids
+        self.row_of = {document_id: row for row, document_id in enumerate(document_ids)}
+        self.size = len(document_ids)
+        # Date ordinale de chaque document (0 si inconnue)
+        self.ordinals = ordinals
+        self.arrays = arrays
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]],
+              resolve: Optional[Callable[[str], List[str]]] = None) -> 'RelationGraph':
+        """
+        Construit le graphe à partir des métadonnées (ordre = row ids).
+
+        Args:
+            documents: Métadonnées triées (corpus.load_documents())
+            resolve: Résolution d'une cible textuelle (ex. « Décret 2024-906 »)
+                en document_ids ; par défaut seuls les document_id exacts sont reliés
+
+        Returns:
+            RelationGraph
+        """
+        by_id = {d['document_id']: row for row, d in enumerate(documents)}
+        dates = [document_date(d) for d in documents]
+        ordinals = np.array([d.toordinal() if d else 0 for d in dates], dtype=np.int64)
+        n = len(documents)
+
+        edges: Dict[str, set] = {relation: set() for relation in RELATIONS}
+        unresolved: List[List[str]] = [[] for _ in documents]
+        for source, metadata in enumerate(documents):
+            relations = metadata.get('relations_documentaires', {})
+            for relation in RELATIONS:
+                for target in relations.get(relation, []):
+                    if target in by_id:
+                        rows = [by_id[target]]
+                    else:
+                        rows = [by_id[t] for t in (resolve(target) if resolve else []) if t in by_id]
+                    if not rows:
+                        unresolved[source].append(f"{relation}:{target}")
+                    edges[relation].update((source, row) for row in rows if row != source)
+        edges['remplace'].update(series_edges(documents, dates))
+
+        arrays: Dict[str, np.ndarray] = {}
+        for relation, pairs in edges.items():
+            pairs = np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+            arrays[f'{relation}_indptr'], arrays[f'{relation}_indices'] = to_csr(n, pairs[:, 0], pairs[:, 1])
+            # Sens inverse : qui me remplace / modifie / référence / complète
+            arrays[f'{relation}_in_indptr'], arrays[f'{relation}_in_indices'] = to_csr(n, pairs[:, 1], pairs[:, 0])
+
+        counts = np.array([len(u) for u in unresolved], dtype=np.int64)
+        arrays['unresolved_indptr'] = np.concatenate([[0], np.cumsum(counts)])
+        arrays['unresolved'] = np.array([t for u in unresolved for t in u], dtype=str)
+
+        graph = cls([d['document_id'] for d in documents], ordinals, arrays)
+        graph._close()
+        return graph
+
+    def _neighbors(self, relation: str, row: int, incoming: bool = False) -> np.ndarray:
+        key = f'{relation}_in' if incoming else relation
+        indptr = self.arrays[f'{key}_indptr']
+        return self.arrays[f'{key}_indices'][indptr[row]:indptr[row + 1]]
+
+    def _valid(self, newer: int, older: int) -> bool:
+        """Faux si la relation est incohérente (le texte qui remplace/modifie est plus ancien)."""
+        return not (self.ordinals[newer] and self.ordinals[older] and self.ordinals[newer] <= self.ordinals[older])
+
+    def _reach(self, row: int, relations: tuple, incoming: bool) -> List[int]:
+        """Lignes atteintes depuis row (parcours en profondeur, row exclue)."""
+        seen = {row}
+        stack = [row]
+        while stack:
+            current = stack.pop()
+            for relation in relations:
+                for other in self._neighbors(relation, current, incoming).tolist():
+                    newer, older = (other, current) if incoming else (current, other)
+                    if other not in seen and self._valid(newer, older):
+                        seen.add(other)
+                        stack.append(other)
+        seen.discard(row)
+        return sorted(seen, key=lambda r: (self.ordinals[r], r))
+
+    def _close(self):
+        """Fermetures transitives de remplace / modifie, rangées en CSR."""
+        latest = np.arange(self.size, dtype=np.int32)
+        closures: Dict[str, List[List[int]]] = {'amendments': [], 'history': []}
+        for row in range(self.size):
+            closures['amendments'].append(self._reach(row, SUPERSEDING_RELATIONS, incoming=True))
+            closures['history'].append(self._reach(row, SUPERSEDING_RELATIONS, incoming=False))
+            # Dernière version : le plus récent des remplaçants transitifs
+            replacing = self._reach(row, ('remplace',), incoming=True)
+            if replacing:
+                latest[row] = replacing[-1]
+
+        for name, rows in closures.items():
+            counts = np.array([len(r) for r in rows], dtype=np.int64)
+            self.arrays[f'{name}_indptr'] = np.concatenate([[0], np.cumsum(counts)])
+            self.arrays[f'{name}_indices'] = np.array([r for group in rows for r in group], dtype=np.int32)
+        self.arrays['latest'] = latest
+
+    def save(self, path: Path = RELATIONS_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, document_ids=np.array(self.document_ids, dtype=str), ordinals=self.ordinals, **self.arrays)
+
+    @classmethod
+    def load(cls, path: Path = RELATIONS_FILE) -> 'RelationGraph':
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files if name not in ('document_ids', 'ordinals')}
+            return cls(data['document_ids'].tolist(), data['ordinals'], arrays)
+
+    def _slice(self, name: str, document_id: str) -> List[str]:
+        row = self.row_of[document_id]
+        indptr = self.arrays[f'{name}_indptr']
+        return [self.document_ids[r] for r in self.arrays[f'{name}_indices'][indptr[row]:indptr[row + 1]].tolist()]
+
+    def targets(self, document_id: str, relation: str) -> List[str]:
+        """Cibles déclarées (ou résolues) d'une relation."""
+        return self._slice(relation, document_id)
+
+    def sources(self, document_id: str, relation: str) -> List[str]:
+        """Documents ayant cette relation vers document_id (ex. qui le modifie)."""
+        return self._slice(f'{relation}_in', document_id)
+
+    def latest_version(self, document_id: str) -> str:
+        """Dernière version en vigueur (le document lui-même s'il n'est pas remplacé)."""
+        return self.document_ids[int(self.arrays['latest'][self.row_of[document_id]])]
+
+    def amendments(self, document_id: str) -> List[str]:
+        """Tous les textes qui le modifient ou le remplacent, directement ou non (ordre chronologique)."""
+        return self._slice('amendments', document_id)
+
+    def history(self, document_id: str) -> List[str]:
+        """Tous les textes qu'il modifie ou remplace, directement ou non (ordre chronologique)."""
+        return self._slice('history', document_id)
+
+    def unresolved(self, document_id: str) -> List[str]:
+        """Cibles « relation:texte » non rattachées à un document du corpus."""
+        row = self.row_of[document_id]
+        indptr = self.arrays['unresolved_indptr']
+        return self.arrays['unresolved'][indptr[row]:indptr[row + 1]].tolist()
+
+    def edge_count(self, relation: str) -> int:
+        return len(self.arrays[f'{relation}_indices'])
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Construit le graphe des relations documentaires")
+    parser.add_argument('--document', help="document_id à interroger")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("GRAPHE DES RELATIONS DOCUMENTAIRES")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    documents = load_documents()
+    graph = RelationGraph.build(documents, resolve=ReferenceIndex.build(documents).resolve)
+    graph.save()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    edges = ', '.join(f"{relation} {graph.edge_count(relation)}" for relation in RELATIONS)
+    superseded = int((graph.arrays['latest'] != np.arange(graph.size)).sum())
+    amended = int((np.diff(graph.arrays['amendments_indptr']) > 0).sum())
+    print(f"✅ {graph.size} documents, arêtes : {edges} ({elapsed_ms:.1f} ms) → {RELATIONS_FILE}")
+    print(f"   {superseded} documents remplacés, {amended} avec amendements, "
+          f"{len(graph.arrays['unresolved'])} cibles non résolues")
+
+    if args.document:
+        start = time.perf_counter()
+        latest = graph.latest_version(args.document)
+        amendments = graph.amendments(args.document)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(f"\n📄 {args.document} ({elapsed_us:.0f} µs)")
+        print(f"   Dernière version : {latest}")
+        for document_id in amendments:
+            print(f"   ↳ amendé par {document_id}")
+        for document_id in graph.history(args.document):
+            print(f"   ↤ amende {document_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Recherche spéculative en parallèle de l'étape de raisonnement (Améliorations
+#9 « Parallélisation recherche »).
+Dans le flux DAN v5, query() attend _reasoning_step pour obtenir la
+search_query, puis calcule l'embedding et lance les recherches vectorielle
+et plein texte. En mode spéculatif, embedding + recherches démarrent sur la
+question brute pendant le raisonnement : si la search_query est
+quasi identique à la question, les résultats sont réutilisés tels quels ;
+sinon la recherche est relancée sur la search_query et les deux jeux de
+résultats sont fusionnés. Chaque appel renvoie le détail des temps.
+"""
+
+import asyncio
+import os
+import time
+from typing import List, Dict, Any, Callable, Awaitable
+
+from analyzer import analyze
+from embeddings import chat_json, resolve_base_url
+
+# Similarité (Jaccard des termes analysés) au-delà de laquelle la recherche
+# sur la question brute est réutilisée
+REUSE_SIMILARITY = 0.8
+
+VECTOR_LIMIT = 7
+FULLTEXT_LIMIT = 7
+
+REASONING_PROMPT = """Tu prépares une recherche documentaire notariale.
+Analyse la question puis reformule-la en requête de recherche.
+
+Question: "{question}"
+
+Réponds en JSON: {{"thought": "...", "search_query": "..."}}"""
+
+
+def similarity(first: str, second: str) -> float:
+    a, b = set(analyze(first)), set(analyze(second))
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def merge_chunks(*result_lists: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Déduplication par chunkId, dans l'ordre des listes (comme query())."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for results in result_lists:
+        for chunk in results:
+            merged.setdefault(chunk['chunkId'], chunk)
+    return list(merged.values())
+
+
+class OpenAIReasoner:
+    """_reasoning_step : {thought, search_query} via chat completions."""
+
+    def __init__(self, model: str = "gpt-4.1-mini", base_url: str = None, api_key: str = None,
+                 timeout: float = 60.0):
+        self.model = model
+        self.base_url = resolve_base_url(base_url)
+        self.api_key = api_key or os.environ.get('OPENAI_API_KEY', '')
+        self.timeout = timeout
+
+    def _post(self, question: str) -> Dict[str, str]:
+        step = chat_json(REASONING_PROMPT.format(question=question), self.model, self.base_url, self.api_key,
+                         self.timeout, temperature=None)
+        return {'thought': step.get('thought', ''), 'search_query': step.get('search_query') or question}
+
+    async def __call__(self, question: str) -> Dict[str, str]:
+        return await asyncio.to_thread(self._post, question)
+
+
+class RetrievalPipeline:
+    """Raisonnement + recherche hybride, séquentiel ou spéculatif."""
+
+    def __init__(self, neo4j_service: Any, embed: Callable[[List[str]], Awaitable[List[List[float]]]],
+                 reason: Callable[[str], Awaitable[Dict[str, str]]],
+                 reuse_similarity: float = REUSE_SIMILARITY,
+                 vector_limit: int = VECTOR_LIMIT, fulltext_limit: int = FULLTEXT_LIMIT):
+        """
+        Args:
+            neo4j_service: search_chunks_by_vector / search_chunks_by_fulltext
+                (neo4j_service ou EmbeddedNeo4jService)
+            embed: Coroutine textes → embeddings (_get_embeddings)
+            reason: Coroutine question → {thought, search_query} (_reasoning_step)
+            reuse_similarity: Seuil de réutilisation des résultats spéculatifs
+        """
+        self.neo4j = neo4j_service
+        self.embed = embed
+        self.reason = reason
+        self.reuse_similarity = reuse_similarity
+        self.vector_limit = vector_limit
+        self.fulltext_limit = fulltext_limit
+
+    async def _retrieve(self, query: str) -> Dict[str, Any]:
+        """Embedding puis recherches vectorielle et plein texte (plein texte lancé sans attendre l'embedding)."""
+        start = time.perf_counter()
+        fulltext = asyncio.create_task(self.neo4j.search_chunks_by_fulltext(query, limit=self.fulltext_limit))
+        try:
+            embeddings = await self.embed([query])
+            vector = await self.neo4j.search_chunks_by_vector(embeddings[0], limit=self.vector_limit) if embeddings else []
+            return {
+                'vector': vector,
+                'fulltext': await fulltext,
+                'ms': (time.perf_counter() - start) * 1000,
+            }
+        except BaseException:
+            # Pas de recherche orpheline si l'embedding échoue ou si l'appelant est annulé
+            fulltext.cancel()
+            raise
+
+    async def sequential(self, question: str) -> Dict[str, Any]:
+        """Flux DAN v5 actuel : raisonnement, puis recherche sur la search_query."""
+        start = time.perf_counter()
+        step = await self.reason(question)
+        reasoning_ms = (time.perf_counter() - start) * 1000
+        retrieved = await self._retrieve(step['search_query'])
+        return {
+            'search_query': step['search_query'],
+            'chunks': merge_chunks(retrieved['vector'], retrieved['fulltext']),
+            'timings': {
+                'reasoning_ms': reasoning_ms,
+                'retrieval_ms': retrieved['ms'],
+                'total_ms': (time.perf_counter() - start) * 1000,
+            },
+        }
+
+    async def speculative(self, question: str) -> Dict[str, Any]:
+        """Recherche sur la question brute pendant le raisonnement, réutilisée ou fusionnée."""
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(self._retrieve(question))]
+        try:
+            step = await self.reason(question)
+            reasoning_ms = (time.perf_counter() - start) * 1000
+            search_query = step['search_query']
+
+            overlap = similarity(question, search_query)
+            timings = {'reasoning_ms': reasoning_ms, 'similarity': overlap}
+            if overlap >= self.reuse_similarity:
+                raw = await tasks[0]
+                chunks = merge_chunks(raw['vector'], raw['fulltext'])
+                timings['rewritten_ms'] = 0.0
+            else:
+                tasks.append(asyncio.create_task(self._retrieve(search_query)))
+                raw, rewritten = await asyncio.gather(*tasks)
+                # Résultats de la search_query d'abord, puis ceux de la question brute
+                chunks = merge_chunks(rewritten['vector'], rewritten['fulltext'], raw['vector'], raw['fulltext'])
+                timings['rewritten_ms'] = rewritten['ms']
+        except BaseException:
+            # Raisonnement ou recherche en échec : les recherches encore en vol sont annulées
+            for task in tasks:
+                task.cancel()
+            raise
+        timings['raw_ms'] = raw['ms']
+        timings['total_ms'] = (time.perf_counter() - start) * 1000
+        # Attente après le raisonnement, à comparer à retrieval_ms du mode séquentiel
+        timings['after_reasoning_ms'] = timings['total_ms'] - reasoning_ms
+        return {
+            'search_query': search_query,
+            'reused': overlap >= self.reuse_similarity,
+            'chunks': chunks,
+            'timings': timings,
+        }
+
+    async def query(self, question: str, speculative: bool = True) -> Dict[str, Any]:
+        return await (self.speculative(question) if speculative else self.sequential(question))
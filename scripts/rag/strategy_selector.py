@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Choix local de la stratégie RAG (VECTOR_ONLY, GRAPH_FIRST, HYBRID) sans
+appel LLM dans le cas courant.
+Les indices viennent des références documentaires (REFERENCE_PATTERNS,
+décrets, lois), des entités reconnues par le lexique de synonymes et de la
+forme de la question (définition, relation, question composée). Quand
+l'écart entre les scores est trop faible, la décision revient au LLM
+(même prompt que _select_rag_strategy) ; les décisions sont mises en cache
+par question normalisée. Le script mesure l'accord avec le LLM sur le
+dataset de test.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+from analyzer import normalize
+from corpus import PROJECT_ROOT, load_questions
+from embeddings import chat_json, resolve_base_url
+from synonyms import SynonymExpander
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from index_bible_notariale import REFERENCE_PATTERNS  # noqa: E402
+
+REPORT_PATH = PROJECT_ROOT / "output" / "evaluation_strategy_selector.json"
+
+STRATEGIES = ('VECTOR_ONLY', 'GRAPH_FIRST', 'HYBRID')
+DEFAULT_STRATEGY = 'HYBRID'
+DEFAULT_LLM_MODEL = "gpt-4.1-nano"
+
+# Écart de score minimal pour décider sans LLM
+MIN_MARGIN = 1.5
+CACHE_SIZE = 10_000
+
+REFERENCES = [re.compile(pattern, re.IGNORECASE) for pattern in REFERENCE_PATTERNS.values()] + [
+    re.compile(r'\b[Dd]écret\s*n?°?\s*\d{4}-\d+', re.IGNORECASE),
+    re.compile(r'\b[Ll]oi\s*n?°?\s*\d{4}-\d+', re.IGNORECASE),
+    re.compile(r'\bfil[- ]info\s*n?°?\s*\d+', re.IGNORECASE),
+    re.compile(r'\barticles?\s+\d+(?:\.\d+)*', re.IGNORECASE),
+]
+
+# Indices de forme, sur la question normalisée (minuscules, sans accents)
+DEFINITION = re.compile(r"^(?:qu est ce qu|que signifie|que veut dire|c est quoi|definition|definis|explique)")
+RELATION = re.compile(r"\b(?:lien|liens|relation|relations|articul\w*|entre .+ et|rapport entre|difference"
+                      r"|differences|distingue|signataires?|qui sont|modifie[es]* par|remplace[es]* par)\b")
+COMPOUND = re.compile(r"\bet (?:quel|quels|quelle|quelles|comment|pourquoi|qu est)\b")
+BROAD = re.compile(r"\b(?:toutes|tous les|evolution|comment|pourquoi|en quoi|procedure|conditions)\b")
+
+PLANNER_PROMPT = """Détermine la meilleure stratégie parmi :
+
+- "VECTOR_ONLY": Questions générales, conceptuelles
+  Ex: "Qu'est-ce qu'une SMO ?"
+
+- "GRAPH_FIRST": Questions sur des relations entre entités
+  Ex: "Quel est le lien entre MMA IARD et le contrat Cyber ?"
+
+- "HYBRID": Questions complexes (défaut)
+  Ex: "Quelle est la procédure si un cohéritier ne répond pas ?"
+
+Question: "{question}"
+
+Réponds en JSON: {{"strategy": "HYBRID"}}"""
+
+
+def normalize_question(question: str) -> str:
+    """Clé de cache : minuscules, sans accents ni ponctuation."""
+    return normalize(question)
+
+
+class OpenAIStrategyPlanner:
+    """Choix de stratégie par le LLM (chat completions, réponse JSON)."""
+
+    def __init__(self, model: str = DEFAULT_LLM_MODEL, base_url: str = None, api_key: str = None,
+                 timeout: float = 30.0):
+        self.model = model
+        self.base_url = resolve_base_url(base_url)
+        self.api_key = api_key or os.environ.get('OPENAI_API_KEY', '')
+        self.timeout = timeout
+        self.requests = 0
+
+    def _post(self, question: str) -> str:
+        content = chat_json(PLANNER_PROMPT.format(question=question), self.model, self.base_url, self.api_key,
+                            self.timeout)
+        self.requests += 1
+        strategy = content.get('strategy', DEFAULT_STRATEGY)
+        return strategy if strategy in STRATEGIES else DEFAULT_STRATEGY
+
+    async def __call__(self, question: str) -> str:
+        return await asyncio.to_thread(self._post, question)
+
+
+class StrategySelector:
+    """Règles locales, repli LLM si incertain, cache par question normalisée."""
+
+    def __init__(self, expander: Optional[SynonymExpander] = None,
+                 llm: Optional[Callable[[str], Awaitable[str]]] = None,
+                 entity_matcher: Optional[Callable[[str], List[Any]]] = None,
+                 min_margin: float = MIN_MARGIN, cache_size: int = CACHE_SIZE):
+        """
+        Args:
+            expander: Lexique de synonymes (reconnaissance des entités du vocabulaire)
+            llm: Coroutine question → stratégie, appelée si les règles hésitent
+            entity_matcher: Entités reconnues dans une question (défaut : expander.matched_terms)
+            min_margin: Écart de score pour une décision sûre
+            cache_size: Nombre de décisions gardées en mémoire (LRU)
+        """
+        self.expander = expander
+        self.llm = llm
+        self.entity_matcher = entity_matcher or (expander.matched_terms if expander else (lambda q: []))
+        self.min_margin = min_margin
+        self.cache_size = cache_size
+        self.cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.stats = {'rules': 0, 'llm': 0, 'cache': 0, 'default': 0}
+
+    def features(self, question: str) -> Dict[str, Any]:
+        normalized = normalize_question(question)
+        references = {m.group(0).lower() for pattern in REFERENCES for m in pattern.finditer(question)}
+        return {
+            'references': len(references),
+            'entities': len(set(self.entity_matcher(question))),
+            'definition': bool(DEFINITION.search(normalized)),
+            'relation': bool(RELATION.search(normalized)),
+            'compound': bool(COMPOUND.search(normalized)),
+            'broad': bool(BROAD.search(normalized)),
+        }
+
+    def score(self, question: str) -> Dict[str, Any]:
+        """
+        Décision par règles seules.
+
+        Returns:
+            {strategy, margin, confident, scores, features}
+        """
+        f = self.features(question)
+        scores = dict.fromkeys(STRATEGIES, 0.0)
+        if f['definition']:
+            scores['VECTOR_ONLY'] += 2.0
+        if f['relation']:
+            scores['GRAPH_FIRST'] += 2.0
+        if f['entities'] >= 2:
+            scores['GRAPH_FIRST'] += 1.0
+        elif f['entities'] == 1 and not f['references']:
+            # Avec une référence, l'entité unique est en général son type (« avenant »)
+            scores['VECTOR_ONLY'] += 0.5
+        if f['references']:
+            # Une seule référence suffit à décider : « Que dit l'avenant n°56 ? »
+            scores['HYBRID'] += 2.0
+        if f['references'] >= 2 or (f['references'] and f['relation']):
+            # Plusieurs références, ou une référence point de départ d'une relation (« modifié par l'avenant 59 »)
+            scores['GRAPH_FIRST'] += 1.0
+        if f['compound']:
+            scores['HYBRID'] += 1.5
+        if f['broad']:
+            scores['HYBRID'] += 1.0
+
+        ranked = sorted(STRATEGIES, key=lambda s: scores[s], reverse=True)
+        margin = scores[ranked[0]] - scores[ranked[1]]
+        return {
+            'strategy': ranked[0] if scores[ranked[0]] > 0 else DEFAULT_STRATEGY,
+            'margin': margin,
+            'confident': margin >= self.min_margin,
+            'scores': scores,
+            'features': f,
+        }
+
+    async def select(self, question: str) -> Dict[str, Any]:
+        """
+        Stratégie pour une question (remplace l'appel LLM de _select_rag_strategy).
+
+        Returns:
+            {strategy, source: 'rules' | 'llm' | 'default' | 'cache', margin}
+        """
+        key = normalize_question(question)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats['cache'] += 1
+            return {**cached, 'source': 'cache'}
+
+        decision = self.score(question)
+        if decision['confident']:
+            source = 'rules'
+        elif self.llm is not None:
+            try:
+                decision['strategy'] = await self.llm(question)
+                source = 'llm'
+            except Exception as e:
+                print(f"⚠️  Sélecteur LLM indisponible ({e}) : stratégie par règles")
+                source = 'default'
+        else:
+            source = 'default'
+        self.stats[source] += 1
+
+        result = {'strategy': decision['strategy'], 'source': source, 'margin': decision['margin']}
+        if source == 'default' and self.llm is not None:
+            # Échec du LLM : pas de mise en cache, la question sera retentée
+            return result
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+
+async def evaluate(selector: StrategySelector, planner: OpenAIStrategyPlanner,
+                   questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Accord règles / LLM sur chaque question."""
+    rows = []
+    for question in questions:
+        start = time.perf_counter()
+        decision = selector.score(question['question'])
+        rules_us = (time.perf_counter() - start) * 1e6
+        start = time.perf_counter()
+        llm_strategy = await planner(question['question'])
+        llm_ms = (time.perf_counter() - start) * 1000
+        rows.append({
+            'id': question.get('id'),
+            'question': question['question'],
+            'rules': decision['strategy'],
+            'confident': decision['confident'],
+            'margin': decision['margin'],
+            'llm': llm_strategy,
+            'rules_us': rules_us,
+            'llm_ms': llm_ms,
+        })
+
+    def agreement(subset):
+        return sum(r['rules'] == r['llm'] for r in subset) / len(subset) if subset else None
+
+    confident = [r for r in rows if r['confident']]
+    confusion = {s: {t: sum(1 for r in rows if r['rules'] == s and r['llm'] == t) for t in STRATEGIES}
+                 for s in STRATEGIES}
+    return {
+        'questions': len(rows),
+        'coverage': len(confident) / len(rows) if rows else 0.0,
+        'agreement_confident': agreement(confident),
+        'agreement_all': agreement(rows),
+        'confusion_rules_vs_llm': confusion,
+        'rules_us_mean': sum(r['rules_us'] for r in rows) / max(len(rows), 1),
+        'llm_ms_mean': sum(r['llm_ms'] for r in rows) / max(len(rows), 1),
+        'rows': rows,
+    }
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Sélecteur de stratégie RAG par règles, accord avec le LLM")
+    parser.add_argument('--question', help="Question à classer")
+    parser.add_argument('--model', default=DEFAULT_LLM_MODEL)
+    parser.add_argument('--base-url', default=None, help="API compatible OpenAI (défaut : OPENAI_BASE_URL)")
+    parser.add_argument('--min-margin', type=float, default=MIN_MARGIN)
+    parser.add_argument('--output', type=Path, default=REPORT_PATH)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("SÉLECTION DE STRATÉGIE RAG PAR RÈGLES")
+    print("=" * 70)
+
+    selector = StrategySelector(SynonymExpander.load(), min_margin=args.min_margin)
+    if args.question:
+        decision = selector.score(args.question)
+        print(f"🔎 {args.question}")
+        print(f"   {decision['strategy']} (écart {decision['margin']:.1f}, "
+              f"{'sûr' if decision['confident'] else 'incertain → LLM'})")
+        print(f"   {decision['features']}")
+        return
+
+    questions = load_questions()
+    planner = OpenAIStrategyPlanner(args.model, args.base_url)
+    print(f"📂 {len(questions)} questions, LLM {args.model} @ {planner.base_url}")
+    try:
+        report = asyncio.run(evaluate(selector, planner, questions))
+    except OSError as e:
+        print(f"❌ LLM injoignable : {e}")
+        sys.exit(1)
+
+    print("-" * 70)
+    print(f"   Couverture des règles : {report['coverage']:.0%} des questions décidées sans LLM")
+    print(f"   Accord (décisions sûres) : {report['agreement_confident'] or 0:.0%}")
+    print(f"   Accord (toutes) : {report['agreement_all']:.0%}")
+    print(f"⏱️  Règles {report['rules_us_mean']:.0f} µs / LLM {report['llm_ms_mean']:.0f} ms par question")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'generated_at': datetime.now().isoformat(), 'model': args.model,
+                   'min_margin': args.min_margin, **report}, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Rapport sauvegardé : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Expansion de requête par le lexique notarial (Améliorations #6).
+Compile vocabulaire_notarial.json et les vocabulaire_specifique des documents
+en une table formes de surface normalisées (y compris expressions de
+plusieurs mots) → identifiants de termes canoniques. Une requête est
+étendue en un seul passage de plus longue correspondance, en quelques µs.
+La table compilée est reconstruite automatiquement si le vocabulaire change.
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+from analyzer import analyze
+from corpus import DOCS_METADATA_DIR, INDEX_DIR, VOCABULARY_FILE, load_documents, load_questions, load_vocabulary
+
+SYNONYMS_FILE = INDEX_DIR / "synonyms.json"
+
+# Poids BM25 des termes ajoutés par expansion (les termes de la requête valent 1).
+# Mesuré sur le dataset de test (MRR 0.354 sans expansion) : pas de perte
+# jusqu'à 0.1 (0.365), baisse dès 0.25 (0.351) puis 0.5 (0.320), où les
+# synonymes font passer des documents voisins devant les correspondances exactes.
+SYNONYM_WEIGHT = 0.1
+
+
+def sources_fingerprint(vocabulary_file: Path = VOCABULARY_FILE,
+                        docs_dir: Path = DOCS_METADATA_DIR) -> str:
+    """Empreinte des sources : contenu du lexique + taille/date des métadonnées."""
+    digest = hashlib.sha256()
+    if vocabulary_file.exists():
+        digest.update(vocabulary_file.read_bytes())
+    for filepath in sorted(docs_dir.glob("*.metadata.json")):
+        stat = filepath.stat()
+        digest.update(f"{filepath.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def phrase_key(text: str) -> Tuple[str, ...]:
+    """Forme normalisée d'une expression (tokens analysés)."""
+    return tuple(analyze(text))
+
+
+class SynonymExpander:
+    """
+    Table d'expansion compilée.
+
+    terms   : [{'canonical': str, 'forms': [str, ...]}] (id = position)
+    phrases : tuple de tokens → ids des termes
+    """
+
+    def __init__(self, terms: List[Dict[str, Any]], phrases: Dict[Tuple[str, ...], List[int]],
+                 fingerprint: str = ''):
+        self.terms = terms
+        self.phrases = phrases
+        self.fingerprint = fingerprint
+        self.max_len = max((len(key) for key in phrases), default=0)
+        self._form_keys = [[phrase_key(form) for form in term['forms']] for term in terms]
+        self._term_tokens = [
+            sorted({token for key in keys for token in key}) for keys in self._form_keys
+        ]
+
+    @classmethod
+    def compile(cls, vocabulary: List[Dict[str, Any]],
+                documents: List[Dict[str, Any]], fingerprint: str = '') -> 'SynonymExpander':
+        """
+        Compile les groupes de synonymes (lexique global puis documents).
+
+        Args:
+            vocabulary: Entrées {terme, synonymes} de vocabulaire_notarial.json
+            documents: Métadonnées dont on reprend vocabulaire_specifique
+            fingerprint: Empreinte des sources
+
+        Returns:
+            Table d'expansion
+        """
+        groups = list(vocabulary)
+        for metadata in documents:
+            groups.extend(metadata.get('vocabulaire_specifique', []))
+
+        terms: List[Dict[str, Any]] = []
+        term_ids: Dict[Tuple[str, ...], int] = {}
+        for group in groups:
+            canonical = group.get('terme', '').strip()
+            key = phrase_key(canonical)
+            if not key:
+                continue
+            if key not in term_ids:
+                term_ids[key] = len(terms)
+                terms.append({'canonical': canonical, 'forms': [canonical]})
+            forms = terms[term_ids[key]]['forms']
+            for synonym in group.get('synonymes', []):
+                if synonym and synonym not in forms:
+                    forms.append(synonym)
+
+        phrases: Dict[Tuple[str, ...], List[int]] = {}
+        for term_id, term in enumerate(terms):
+            for form in term['forms']:
+                key = phrase_key(form)
+                if key and term_id not in phrases.setdefault(key, []):
+                    phrases[key].append(term_id)
+
+        return cls(terms, phrases, fingerprint)
+
+    def save(self, path: Path = SYNONYMS_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'fingerprint': self.fingerprint,
+                'terms': self.terms,
+                'phrases': {' '.join(key): ids for key, ids in self.phrases.items()},
+            }, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: Path = SYNONYMS_FILE, check: bool = True) -> 'SynonymExpander':
+        """
+        Charge la table compilée, en la recompilant si les sources ont changé.
+
+        Args:
+            path: Fichier compilé
+            check: Vérifier l'empreinte des sources (désactiver pour un corpus figé)
+        """
+        fingerprint = sources_fingerprint() if check else None
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if fingerprint is None or data.get('fingerprint') == fingerprint:
+                phrases = {tuple(key.split()): ids for key, ids in data['phrases'].items()}
+                return cls(data['terms'], phrases, data.get('fingerprint', ''))
+
+        expander = cls.compile(load_vocabulary(), load_documents(),
+                               fingerprint or sources_fingerprint())
+        expander.save(path)
+        return expander
+
+    def match(self, tokens: List[str]) -> List[Tuple[int, int, List[int]]]:
+        """
+        Plus longues correspondances, de gauche à droite, sans chevauchement.
+
+        Returns:
+            Liste de (début, fin, ids des termes) sur les positions de tokens
+        """
+        matches = []
+        phrases = self.phrases
+        n = len(tokens)
+        i = 0
+        while i < n:
+            for length in range(min(self.max_len, n - i), 0, -1):
+                ids = phrases.get(tuple(tokens[i:i + length]))
+                if ids:
+                    matches.append((i, i + length, ids))
+                    i += length
+                    break
+            else:
+                i += 1
+        return matches
+
+    def matched_terms(self, query: str) -> List[int]:
+        """Ids des termes canoniques reconnus dans la requête."""
+        return [term_id for _, _, ids in self.match(analyze(query)) for term_id in ids]
+
+    def expand_terms(self, query: str) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Tokens de la requête + tokens des synonymes reconnus (pour BM25).
+
+        Returns:
+            (tokens, poids des tokens ajoutés)
+        """
+        tokens = analyze(query)
+        present = set(tokens)
+        weights: Dict[str, float] = {}
+        for _, _, ids in self.match(tokens):
+            for term_id in ids:
+                for token in self._term_tokens[term_id]:
+                    if token not in present and token not in weights:
+                        weights[token] = SYNONYM_WEIGHT
+        return tokens + list(weights), weights
+
+    def expand(self, query: str) -> str:
+        """
+        Requête enrichie en texte (recherche vectorielle / plein texte).
+
+        "Que prévoit la CCN ?" → "Que prévoit la CCN ? Convention Collective
+        Nationale IDCC 2205 convention du notariat accord de branche"
+        """
+        tokens = analyze(query)
+        matches = self.match(tokens)
+        present = {tuple(tokens[start:end]) for start, end, _ in matches}
+        added = []
+        for _, _, ids in matches:
+            for term_id in ids:
+                for form, key in zip(self.terms[term_id]['forms'], self._form_keys[term_id]):
+                    if key not in present:
+                        present.add(key)
+                        added.append(form)
+        if not added:
+            return query
+        return f"{query} {' '.join(added)}"
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Compile le lexique d'expansion de requête")
+    parser.add_argument('--query', help="Requête à étendre")
+    parser.add_argument('--force', action='store_true', help="Recompiler même si le lexique n'a pas changé")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("EXPANSION DE REQUÊTE - LEXIQUE NOTARIAL")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    if args.force:
+        expander = SynonymExpander.compile(load_vocabulary(), load_documents(), sources_fingerprint())
+        expander.save()
+    else:
+        expander = SynonymExpander.load()
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(expander.terms)} termes, {len(expander.phrases)} formes "
+          f"(≤ {expander.max_len} mots) en {elapsed * 1000:.1f} ms → {SYNONYMS_FILE}")
+
+    queries = [args.query] if args.query else [q['question'] for q in load_questions()]
+    start = time.perf_counter()
+    for query in queries:
+        expander.expand_terms(query)
+    per_query_us = (time.perf_counter() - start) * 1e6 / max(len(queries), 1)
+    print(f"⏱️  {per_query_us:.1f} µs par requête ({len(queries)} requêtes)")
+
+    if args.query:
+        for term_id in expander.matched_terms(args.query):
+            print(f"  🔗 {expander.terms[term_id]['canonical']}")
+        print(f"  → {expander.expand(args.query)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Index de validité temporelle : « documents en vigueur à la date D ».
+date_entree_vigueur et date_fin_validite sont dérivées des métadonnées
+(date_effet, date_publication) et des relations remplace / modifie : un
+document remplacé cesse d'être en vigueur à l'entrée en vigueur de son
+remplaçant ; un document modifié reste en vigueur (ses modifications sont
+datées dans modifie_par). Les séries sans relation déclarée (accords de
+salaires) sont chaînées par date : chaque texte remplace le précédent ;
+relation_graph reprend les mêmes remplacements implicites. Les débuts et fins forment une suite d'événements
+triés avec un instantané (Bitset compacté, un bit par document) tous les
+checkpoint_every événements, au plus MAX_CHECKPOINTS instantanés pour que la
+mémoire reste linéaire en taille de corpus : valid_at(D) = recherche
+dichotomique + copie d'un instantané + au plus checkpoint_every événements
+rejoués, sans parcourir le corpus.
+"""
+
+import argparse
+import bisect
+import json
+import re
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from bitset import Bitset
+from corpus import INDEX_DIR, load_documents
+
+TEMPORAL_FILE = INDEX_DIR / "temporal.json"
+
+# Espacement minimal des instantanés, et leur nombre maximal (≈ 32 octets par document au total)
+CHECKPOINT_EVERY = 64
+MAX_CHECKPOINTS = 256
+
+# Relations qui mettent fin à la validité de leur cible
+ENDING_RELATIONS = ('remplace',)
+AMENDING_RELATIONS = ('modifie',)
+
+ENDED_STATUSES = {'abroge', 'remplace', 'obsolete'}
+
+# Séries dont chaque texte remplace le précédent (motif sur le titre)
+SERIES = {
+    'accord_de_salaires': re.compile(r'accords?\s+de\s+salaires?', re.IGNORECASE),
+}
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """Date ISO (AAAA-MM-JJ) ou None."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def query_date(value: Any) -> date:
+    """Date d'une requête (date ou chaîne ISO) ; ValueError si illisible."""
+    if isinstance(value, date):
+        return value
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"Date invalide : {value!r} (attendu AAAA-MM-JJ)")
+    return parsed
+
+
+def series_edges(documents: List[Dict[str, Any]], dates: List[Optional[date]]) -> List[tuple]:
+    """Arêtes remplace implicites (plus récent → précédent) au sein de chaque série."""
+    edges = []
+    for pattern in SERIES.values():
+        members = sorted(
+            (dates[row], row) for row, metadata in enumerate(documents)
+            if dates[row] and pattern.search(metadata.get('metadata', {}).get('titre', '') or '')
+        )
+        edges.extend((newer, older) for (_, older), (_, newer) in zip(members, members[1:]))
+    return edges
+
+
+def derive_validity(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Calcule les périodes de validité de chaque document (ordre = row ids).
+
+    Returns:
+        Par document : document_id, date_entree_vigueur, date_fin_validite
+        (None = toujours en vigueur), remplace_par, modifie_par
+    """
+    by_id = {d['document_id']: i for i, d in enumerate(documents)}
+    validity = []
+    for metadata in documents:
+        meta = metadata.get('metadata', {})
+        start = (parse_date(meta.get('date_entree_vigueur')) or parse_date(meta.get('date_effet'))
+                 or parse_date(meta.get('date_publication')))
+        validity.append({
+            'document_id': metadata['document_id'],
+            'statut': meta.get('statut'),
+            'date_entree_vigueur': start,
+            'date_fin_validite': parse_date(meta.get('date_fin_validite')),
+            'remplace_par': [],
+            'modifie_par': [],
+        })
+
+    # Relations déclarées, puis remplacements implicites des séries
+    links = []
+    for source_row, metadata in enumerate(documents):
+        relations = metadata.get('relations_documentaires', {})
+        for relation in ENDING_RELATIONS + AMENDING_RELATIONS:
+            links.extend((source_row, by_id[target_id], relation)
+                         for target_id in relations.get(relation, []) if target_id in by_id)
+    starts = [entry['date_entree_vigueur'] for entry in validity]
+    links.extend((newer, older, 'remplace') for newer, older in series_edges(documents, starts))
+
+    for source_row, target_row, relation in links:
+        if target_row == source_row:
+            continue
+        source, target = validity[source_row], validity[target_row]
+        # Relation incohérente (texte plus ancien que sa cible) : ignorée
+        if (source['date_entree_vigueur'] and target['date_entree_vigueur']
+                and source['date_entree_vigueur'] <= target['date_entree_vigueur']):
+            continue
+        entry = {'document_id': source['document_id'], 'date': source['date_entree_vigueur']}
+        if relation in ENDING_RELATIONS:
+            if entry in target['remplace_par']:
+                continue
+            target['remplace_par'].append(entry)
+            end = source['date_entree_vigueur']
+            if end and (target['date_fin_validite'] is None or end < target['date_fin_validite']):
+                target['date_fin_validite'] = end
+        else:
+            target['modifie_par'].append(entry)
+
+    return validity
+
+
+def series_without_end(documents: List[Dict[str, Any]], validity: List[Dict[str, Any]]) -> List[str]:
+    """Membres d'une série (accords de salaires) sans date de fin, hors le plus récent : doit être vide."""
+    starts = [entry['date_entree_vigueur'] for entry in validity]
+    superseded = {older for _, older in series_edges(documents, starts)}
+    return [validity[row]['document_id'] for row in sorted(superseded) if not validity[row]['date_fin_validite']]
+
+
+class TemporalIndex:
+    """Événements début/fin triés + instantanés de l'ensemble en vigueur."""
+
+    def __init__(self, validity: List[Dict[str, Any]], checkpoint_every: Optional[int] = None):
+        self.validity = validity
+        self.size = len(validity)
+
+        events = []
+        for row, entry in enumerate(validity):
+            start = entry['date_entree_vigueur'] or date.min
+            end = entry['date_fin_validite']
+            if end is not None and end <= start:
+                # Fin ≤ début : document jamais en vigueur
+                continue
+            events.append((start.toordinal(), 1, row))
+            if end is not None:
+                events.append((end.toordinal(), -1, row))
+        events.sort()
+        self.start_days = np.array([(e['date_entree_vigueur'] or date.min).toordinal() for e in validity])
+        self.end_days = np.array([
+            e['date_fin_validite'].toordinal() if e['date_fin_validite'] else date.max.toordinal()
+            for e in validity
+        ])
+        self.event_days = [day for day, _, _ in events]
+        self.event_kinds = np.array([kind for _, kind, _ in events], dtype=np.int8)
+        self.event_rows = np.array([row for _, _, row in events], dtype=np.int64)
+        self.checkpoint_every = checkpoint_every or max(CHECKPOINT_EVERY, -(-len(events) // MAX_CHECKPOINTS))
+
+        # Instantané avant les événements [i * checkpoint_every, ...)
+        self.checkpoints: List[Bitset] = []
+        bits = Bitset(self.size).bits
+        for position in range(0, len(events) + 1, self.checkpoint_every):
+            self.checkpoints.append(Bitset(self.size, bits.copy()))
+            self._apply(bits, position, min(position + self.checkpoint_every, len(events)))
+
+    def _apply(self, bits: np.ndarray, begin: int, end: int):
+        """Rejoue les événements [begin, end) sur des bits compactés (débuts puis fins : début < fin par ligne)."""
+        kinds = self.event_kinds[begin:end]
+        rows = self.event_rows[begin:end]
+        started, ended = rows[kinds > 0], rows[kinds < 0]
+        np.bitwise_or.at(bits, started >> 3, (1 << (started & 7)).astype(np.uint8))
+        np.bitwise_and.at(bits, ended >> 3, ~(1 << (ended & 7)).astype(np.uint8))
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]]) -> 'TemporalIndex':
+        return cls(derive_validity(documents))
+
+    def save(self, path: Path = TEMPORAL_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        def serializable(entry):
+            return {
+                **entry,
+                'date_entree_vigueur': entry['date_entree_vigueur'] and entry['date_entree_vigueur'].isoformat(),
+                'date_fin_validite': entry['date_fin_validite'] and entry['date_fin_validite'].isoformat(),
+                'remplace_par': [{**e, 'date': e['date'] and e['date'].isoformat()} for e in entry['remplace_par']],
+                'modifie_par': [{**e, 'date': e['date'] and e['date'].isoformat()} for e in entry['modifie_par']],
+            }
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'ending_relations': list(ENDING_RELATIONS),
+                'documents': [serializable(entry) for entry in self.validity],
+            }, f, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path: Path = TEMPORAL_FILE) -> 'TemporalIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        validity = []
+        for entry in data['documents']:
+            validity.append({
+                **entry,
+                'date_entree_vigueur': parse_date(entry['date_entree_vigueur']),
+                'date_fin_validite': parse_date(entry['date_fin_validite']),
+                'remplace_par': [{**e, 'date': parse_date(e['date'])} for e in entry['remplace_par']],
+                'modifie_par': [{**e, 'date': parse_date(e['date'])} for e in entry['modifie_par']],
+            })
+        return cls(validity)
+
+    def valid_at(self, when: Any) -> Bitset:
+        """
+        Documents en vigueur à une date (début ≤ D < fin).
+
+        Args:
+            when: date ou chaîne ISO
+
+        Returns:
+            Bitset sur les row ids des documents
+
+        Raises:
+            ValueError: date illisible
+        """
+        when = query_date(when)
+        position = bisect.bisect_right(self.event_days, when.toordinal())
+        checkpoint = position // self.checkpoint_every
+        bits = self.checkpoints[checkpoint].bits.copy()
+        self._apply(bits, checkpoint * self.checkpoint_every, position)
+        return Bitset(self.size, bits)
+
+    def valid_between(self, start: Any, end: Any) -> Bitset:
+        """Documents en vigueur à un moment quelconque de [start, end] (parcours vectorisé)."""
+        start, end = query_date(start), query_date(end)
+        return Bitset.from_mask((self.start_days <= end.toordinal()) & (self.end_days > start.toordinal())
+                                & (self.end_days > self.start_days))
+
+    def current(self) -> Bitset:
+        """Documents en vigueur aujourd'hui (hors statut abrogé/remplacé sans date de fin)."""
+        ended = Bitset.from_mask(np.array([entry.get('statut') in ENDED_STATUSES for entry in self.validity],
+                                          dtype=bool))
+        return self.valid_at(date.today()) - ended
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Construit l'index de validité temporelle")
+    parser.add_argument('--date', help="Date à interroger (AAAA-MM-JJ)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("INDEX DE VALIDITÉ TEMPORELLE")
+    print("=" * 70)
+
+    documents = load_documents()
+    start = time.perf_counter()
+    index = TemporalIndex.build(documents)
+    index.save()
+    ended = sum(1 for entry in index.validity if entry['date_fin_validite'])
+    amended = sum(1 for entry in index.validity if entry['modifie_par'])
+    undated = sum(1 for entry in index.validity if not entry['date_entree_vigueur'])
+    print(f"✅ {index.size} documents : {ended} avec date de fin, {amended} modifiés, {undated} sans date "
+          f"({(time.perf_counter() - start) * 1000:.1f} ms) → {TEMPORAL_FILE}")
+    starts = [entry['date_entree_vigueur'] for entry in index.validity]
+    print(f"🔗 {len(series_edges(documents, starts))} remplacements implicites (séries : {', '.join(SERIES)})")
+    missing = series_without_end(documents, index.validity)
+    if missing:
+        print(f"❌ {len(missing)} textes remplacés d'une série sans date de fin : {', '.join(missing)}")
+        sys.exit(1)
+
+    if args.date:
+        start = time.perf_counter()
+        valid = index.valid_at(args.date)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(f"\n📅 En vigueur au {args.date} : {valid.count()} documents ({elapsed_us:.0f} µs)")
+        for row in valid.rows()[-10:]:
+            entry = index.validity[row]
+            print(f"   {entry['date_entree_vigueur']}  {entry['document_id'][:60]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Index vectoriel dense en mémoire mappée (embeddings de chunks ou de documents).
+La matrice float32 normalisée est stockée dans un .npy ouvert en mmap, à côté
+de la correspondance ligne → chunkId/documentId. Les requêtes sont traitées
+par lots (un seul produit matriciel) avec argpartition pour le top-k, et un
+masque de pré-filtrage optionnel (facettes, dates, BM25).
+Les résultats ont la forme de neo4j_service.search_chunks_by_vector :
+{text, documentPath, documentId, chunkId, score}.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from corpus import INDEX_DIR, load_documents
+
+VECTORS_DIR = INDEX_DIR / "vectors"
+
+# Nombre de lignes de la matrice traitées à la fois (borne la mémoire des scores)
+BLOCK_ROWS = 65536
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normalisation L2 ligne à ligne (le produit scalaire devient le cosinus)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices des k meilleurs scores par ligne, triés par score décroissant."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k < scores.shape[1]:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(part, order, axis=1)
+
+
+class VectorIndex:
+    """
+    Index vectoriel persistant.
+
+    Fichiers (dans index_dir) :
+        vectors.npy       : matrice float32 (N × d), lignes normalisées
+        document_rows.npy : row id du document de chaque ligne (int32, -1 si inconnu)
+        rows.json         : [{chunkId, documentId, documentPath, text}] par ligne
+    """
+
+    def __init__(self, index_dir: Path, vectors: np.ndarray, document_rows: np.ndarray,
+                 rows: List[Dict[str, Any]]):
+        self.index_dir = index_dir
+        self.vectors = vectors
+        self.document_rows = document_rows
+        self.rows = rows
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, rows: List[Dict[str, Any]], index_dir: Path,
+              doc_ids: Optional[Sequence[str]] = None) -> 'VectorIndex':
+        """
+        Écrit l'index puis le rouvre en mmap.
+
+        Args:
+            vectors: Embeddings (N × d), dans l'ordre de rows
+            rows: Métadonnées par ligne (chunkId, documentId, documentPath, text)
+            index_dir: Dossier de destination
+            doc_ids: document_id par row id de document (par défaut l'ordre du corpus)
+
+        Returns:
+            Index chargé
+        """
+        if len(vectors) != len(rows):
+            raise ValueError(f"{len(vectors)} vecteurs pour {len(rows)} lignes")
+        if doc_ids is None:
+            doc_ids = [d['document_id'] for d in load_documents()]
+        doc_row_by_id = {doc_id: row for row, doc_id in enumerate(doc_ids)}
+
+        index_dir.mkdir(parents=True, exist_ok=True)
+        np.save(index_dir / "vectors.npy", normalize_rows(vectors))
+        np.save(index_dir / "document_rows.npy", np.array(
+            [doc_row_by_id.get(row.get('documentId'), -1) for row in rows], dtype=np.int32))
+        with open(index_dir / "rows.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'rows': [
+                    {
+                        'chunkId': row.get('chunkId', row.get('documentId')),
+                        'documentId': row.get('documentId'),
+                        'documentPath': row.get('documentPath', ''),
+                        'text': row.get('text', ''),
+                    }
+                    for row in rows
+                ],
+            }, f, ensure_ascii=False)
+        return cls.load(index_dir)
+
+    @classmethod
+    def load(cls, index_dir: Path) -> 'VectorIndex':
+        """Ouvre un index existant (matrice en mmap, lecture seule)."""
+        vectors = np.load(index_dir / "vectors.npy", mmap_mode='r')
+        document_rows = np.load(index_dir / "document_rows.npy")
+        with open(index_dir / "rows.json", 'r', encoding='utf-8') as f:
+            rows = json.load(f)['rows']
+        return cls(index_dir, vectors, document_rows, rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def mask_from_documents(self, document_mask: np.ndarray) -> np.ndarray:
+        """
+        Convertit un masque par row id de document en masque par ligne.
+
+        Args:
+            document_mask: Booléens indexés par row id de document (corpus)
+        """
+        document_mask = np.asarray(document_mask, dtype=bool)
+        known = self.document_rows >= 0
+        mask = np.zeros(len(self.document_rows), dtype=bool)
+        mask[known] = document_mask[self.document_rows[known]]
+        return mask
+
+    def search_rows(self, queries: np.ndarray, k: int = 10,
+                    mask: Optional[np.ndarray] = None) -> List[List[tuple]]:
+        """
+        Top-k (ligne, score) pour un lot de requêtes.
+
+        Args:
+            queries: Embeddings des requêtes (Q × d) ou (d,)
+            k: Nombre de résultats par requête
+            mask: Booléens par ligne (True = autorisée), None = toutes
+
+        Returns:
+            Une liste de (ligne, score) par requête
+        """
+        queries = normalize_rows(np.atleast_2d(queries))
+        n_queries = queries.shape[0]
+        best_rows = np.empty((n_queries, 0), dtype=np.int64)
+        best_scores = np.empty((n_queries, 0), dtype=np.float32)
+
+        for start in range(0, len(self.rows), BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, len(self.rows))
+            scores = queries @ self.vectors[start:stop].T
+            if mask is not None:
+                scores[:, ~mask[start:stop]] = -np.inf
+            local = top_k(scores, k)
+            best_rows = np.concatenate([best_rows, local + start], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, local, axis=1)], axis=1)
+            if best_rows.shape[1] > k:
+                keep = top_k(best_scores, k)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        return [
+            [(int(row), float(score)) for row, score in zip(rows, scores) if score != -np.inf]
+            for rows, scores in zip(best_rows, best_scores)
+        ]
+
+    def result(self, row: int, score: float) -> Dict[str, Any]:
+        """Résultat au format search_chunks_by_vector."""
+        return {**self.rows[row], 'score': score}
+
+    def search_batch(self, embeddings: np.ndarray, limit: int = 10,
+                     mask: Optional[np.ndarray] = None) -> List[List[Dict[str, Any]]]:
+        """Recherche par lot : une liste de résultats par embedding."""
+        return [
+            [self.result(row, score) for row, score in hits]
+            for hits in self.search_rows(embeddings, limit, mask)
+        ]
+
+    def search(self, embedding: Sequence[float], limit: int = 10,
+               mask: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Recherche pour un seul embedding (même signature que search_chunks_by_vector)."""
+        return self.search_batch(np.asarray(embedding, dtype=np.float32), limit, mask)[0]
+
+
+def main():
+    """Benchmark de l'index sur des vecteurs aléatoires."""
+    parser = argparse.ArgumentParser(description="Benchmark de l'index vectoriel mmap")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--dim', type=int, default=1536)
+    parser.add_argument('--queries', type=int, default=64)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--index-dir', type=Path, default=VECTORS_DIR / "benchmark")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("INDEX VECTORIEL - BENCHMARK")
+    print("=" * 70)
+
+    rng = np.random.default_rng(args.seed)
+    doc_ids = [f"doc_{i}" for i in range(max(args.rows // 20, 1))]
+    rows = [
+        {'chunkId': f"chunk_{i}", 'documentId': doc_ids[i % len(doc_ids)],
+         'documentPath': f"{doc_ids[i % len(doc_ids)]}.pdf", 'text': ''}
+        for i in range(args.rows)
+    ]
+    start = time.perf_counter()
+    index = VectorIndex.build(rng.standard_normal((args.rows, args.dim), dtype=np.float32),
+                              rows, args.index_dir, doc_ids)
+    print(f"✅ {len(index)} lignes × {index.dim} dims en {time.perf_counter() - start:.2f} s "
+          f"→ {args.index_dir}")
+
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, args.k)
+    single_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+    start = time.perf_counter()
+    index.search_batch(queries, args.k)
+    batch_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+    document_mask = np.zeros(len(doc_ids), dtype=bool)
+    document_mask[::10] = True
+    mask = index.mask_from_documents(document_mask)
+    start = time.perf_counter()
+    index.search_batch(queries, args.k, mask)
+    masked_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+    print(f"⏱️  requête unitaire : {single_ms:.2f} ms")
+    print(f"⏱️  par lot de {args.queries} : {batch_ms:.2f} ms par requête")
+    print(f"⏱️  par lot avec pré-filtre (10% des documents) : {masked_ms:.2f} ms par requête")
+
+
+if __name__ == "__main__":
+    main()
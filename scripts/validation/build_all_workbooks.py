@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Construit les 4 fichiers Excel de validation en une seule passe.
+Charge le dataset et les métadonnées une seule fois, puis remplit tous les
+templates à partir de cet état partagé (optionnellement en parallèle).
+Les classeurs dont les entrées n'ont pas changé depuis le dernier build sont ignorés.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import generate_liste_questions_test
+import generate_suivi_tests_enrichi
+import generate_validation_dataset
+import generate_validation_metadonnees
+
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+METADATA_DIR = PROJECT_ROOT / "_metadata" / "documents"
+TEMPLATES_DIR = PROJECT_ROOT / "templates"
+OUTPUT_DIR = PROJECT_ROOT / "output"
+DATASET_ORIGINAL_PATH = PROJECT_ROOT / "tests" / "datasets" / "chatbot_test_dataset.json"
+DATASET_VALIDATED_PATH = PROJECT_ROOT / "tests" / "datasets" / "dataset_test_final_20questions.json"
+BUILD_STATE_FILE = OUTPUT_DIR / ".build_state.json"
+
+
+def resolve_phase3_dataset() -> Path:
+    """Dataset des classeurs Phase 3 : le dataset validé s'il existe, sinon l'original."""
+    if DATASET_VALIDATED_PATH.exists():
+        return DATASET_VALIDATED_PATH
+    return DATASET_ORIGINAL_PATH
+
+
+def get_workbook_specs() -> List[Dict[str, Any]]:
+    """
+    Décrit les 4 classeurs : entrées, template, sortie et module générateur.
+
+    Returns:
+        Liste de spécifications de classeurs
+    """
+    phase3_dataset = resolve_phase3_dataset()
+    return [
+        {
+            'name': 'validation_metadonnees_20docs',
+            'source': 'metadata',
+            'inputs': [METADATA_DIR],
+            'template': TEMPLATES_DIR / "validation_metadonnees_20docs_TEMPLATE.xlsx",
+            'output': OUTPUT_DIR / "validation_metadonnees_20docs.xlsx",
+            'module': generate_validation_metadonnees,
+        },
+        {
+            'name': 'validation_dataset_20questions',
+            'source': 'dataset',
+            'inputs': [DATASET_ORIGINAL_PATH],
+            'template': TEMPLATES_DIR / "validation_dataset_20questions_TEMPLATE.xlsx",
+            'output': OUTPUT_DIR / "validation_dataset_20questions.xlsx",
+            'module': generate_validation_dataset,
+        },
+        {
+            'name': 'liste_questions_a_tester',
+            'source': 'phase3',
+            'inputs': [phase3_dataset],
+            'template': TEMPLATES_DIR / "liste_questions_a_tester_TEMPLATE.xlsx",
+            'output': OUTPUT_DIR / "liste_questions_a_tester.xlsx",
+            'module': generate_liste_questions_test,
+        },
+        {
+            'name': 'suivi_tests_chatbot',
+            'source': 'phase3',
+            'inputs': [phase3_dataset],
+            'template': TEMPLATES_DIR / "suivi_tests_chatbot_TEMPLATE.xlsx",
+            'output': OUTPUT_DIR / "suivi_tests_chatbot.xlsx",
+            'module': generate_suivi_tests_enrichi,
+        },
+    ]
+
+
+def _hash_path(hasher, path: Path):
+    """Ajoute au hash le contenu d'un fichier, ou de tous les fichiers d'un dossier."""
+    if path.is_dir():
+        for child in sorted(path.glob("*.metadata.json")):
+            hasher.update(child.name.encode('utf-8'))
+            hasher.update(child.read_bytes())
+    elif path.exists():
+        hasher.update(path.read_bytes())
+    else:
+        hasher.update(b'<absent>')
+
+
+def compute_fingerprint(spec: Dict[str, Any]) -> str:
+    """
+    Empreinte des entrées d'un classeur : données, template et code du générateur.
+
+    Args:
+        spec: Spécification du classeur
+
+    Returns:
+        Hash SHA-256 hexadécimal
+    """
+    hasher = hashlib.sha256()
+    for path in spec['inputs']:
+        hasher.update(str(path.relative_to(PROJECT_ROOT)).encode('utf-8'))
+        _hash_path(hasher, path)
+    _hash_path(hasher, spec['template'])
+    _hash_path(hasher, Path(spec['module'].__file__))
+    return hasher.hexdigest()
+
+
+def load_build_state() -> Dict[str, str]:
+    """Charge les empreintes du dernier build."""
+    if not BUILD_STATE_FILE.exists():
+        return {}
+    try:
+        with open(BUILD_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_build_state(state: Dict[str, str]):
+    """Sauvegarde les empreintes du build courant."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(BUILD_STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+class SharedState:
+    """Datasets, questions et métadonnées chargés au plus une fois, à la demande."""
+
+    def __init__(self):
+        self._datasets: Dict[Path, Dict[str, Any]] = {}
+        self._questions: Dict[Path, List[Dict[str, Any]]] = {}
+        self._metadatas: Optional[List[Dict[str, Any]]] = None
+
+    def dataset(self, path: Path) -> Dict[str, Any]:
+        """Dataset Phase 2 (dictionnaire avec qa_pairs)."""
+        if path not in self._datasets:
+            self._datasets[path] = generate_validation_dataset.load_dataset(path)
+        return self._datasets[path]
+
+    def questions(self, path: Path) -> List[Dict[str, Any]]:
+        """Questions d'un dataset Phase 2 ou Phase 3 (liste simple), comme les générateurs."""
+        if path not in self._questions:
+            self._questions[path] = generate_liste_questions_test.load_questions(path)
+        return self._questions[path]
+
+    def metadatas(self) -> List[Dict[str, Any]]:
+        if self._metadatas is None:
+            self._metadatas = generate_validation_metadonnees.load_metadata_files(METADATA_DIR)
+        return self._metadatas
+
+
+def prepare_rows(spec: Dict[str, Any], state: SharedState) -> List[Dict[str, Any]]:
+    """
+    Sélectionne les lignes d'un classeur à partir de l'état partagé.
+
+    Args:
+        spec: Spécification du classeur
+        state: Données déjà chargées
+
+    Returns:
+        Lignes à écrire dans le template
+    """
+    if spec['source'] == 'metadata':
+        return generate_validation_metadonnees.select_20_documents(state.metadatas())
+    if spec['source'] == 'dataset':
+        return generate_validation_dataset.select_20_questions(state.dataset(spec['inputs'][0]))
+    return state.questions(spec['inputs'][0])[:20]
+
+
+def render_workbook(module_name: str, rows: List[Dict[str, Any]], template_path: Path, output_path: Path):
+    """Remplit un template (exécutable dans un processus séparé)."""
+    module = sys.modules[module_name]
+    module.generate_excel(rows, template_path, output_path)
+    return output_path
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Construit les 4 classeurs Excel de validation")
+    parser.add_argument('--force', action='store_true', help="Reconstruire même si les entrées n'ont pas changé")
+    parser.add_argument('--jobs', type=int, default=1, help="Nombre de classeurs générés en parallèle")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BUILD DES CLASSEURS DE VALIDATION")
+    print("=" * 70)
+    print()
+
+    specs = get_workbook_specs()
+    previous_state = load_build_state()
+    new_state = dict(previous_state)
+
+    stale = []
+    for spec in specs:
+        fingerprint = compute_fingerprint(spec)
+        up_to_date = (
+            not args.force
+            and spec['output'].exists()
+            and previous_state.get(spec['name']) == fingerprint
+        )
+        if up_to_date:
+            print(f"⏭️  {spec['output'].name} : entrées inchangées, ignoré")
+        else:
+            stale.append((spec, fingerprint))
+
+    if not stale:
+        print("\n✅ Tous les classeurs sont à jour")
+        return
+
+    for spec, _ in stale:
+        if not spec['template'].exists():
+            print(f"❌ Template non trouvé : {spec['template']}")
+            sys.exit(1)
+        if not all(path.exists() for path in spec['inputs']):
+            print(f"❌ Entrées introuvables pour {spec['name']}")
+            sys.exit(1)
+
+    # Chargement unique des données partagées
+    state = SharedState()
+    jobs = [
+        (spec, fingerprint, prepare_rows(spec, state))
+        for spec, fingerprint in stale
+    ]
+
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(jobs))) as executor:
+            futures = [
+                (spec, fingerprint, executor.submit(
+                    render_workbook, spec['module'].__name__, rows, spec['template'], spec['output']
+                ))
+                for spec, fingerprint, rows in jobs
+            ]
+            for spec, fingerprint, future in futures:
+                future.result()
+                new_state[spec['name']] = fingerprint
+    else:
+        for spec, fingerprint, rows in jobs:
+            render_workbook(spec['module'].__name__, rows, spec['template'], spec['output'])
+            new_state[spec['name']] = fingerprint
+
+    save_build_state(new_state)
+
+    print()
+    print("=" * 70)
+    print(f"✅ BUILD TERMINÉ : {len(jobs)} classeur(s) généré(s), {len(specs) - len(jobs)} à jour")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Évaluation hors-ligne de la recherche documentaire sur chatbot_test_dataset.json.
+Passe chaque question dans un retriever interchangeable et calcule recall@k,
+precision@k, MRR et nDCG@k par rapport aux documents_sources_attendus,
+ainsi que les percentiles de latence. Produit un rapport JSON.
+"""
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import math
+import re
+import sys
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Callable
+
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+METADATA_DIR = PROJECT_ROOT / "_metadata" / "documents"
+DATASET_PATH = PROJECT_ROOT / "tests" / "datasets" / "chatbot_test_dataset.json"
+REPORT_PATH = PROJECT_ROOT / "output" / "evaluation_retrieval.json"
+RAG_DIR = PROJECT_ROOT / "scripts" / "rag"
+
+DEFAULT_KS = [1, 3, 5, 10]
+
+
+class KeywordRetriever:
+    """
+    Retriever de référence : recouvrement de mots entre la question et
+    les métadonnées (titre, résumé, mots-clés). Sert de point de comparaison.
+    """
+
+    def __init__(self, metadata_dir: Path = METADATA_DIR):
+        self.documents = []
+        for filepath in sorted(metadata_dir.glob("*.metadata.json")):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            text = ' '.join([
+                metadata.get('metadata', {}).get('titre', ''),
+                metadata.get('resume', ''),
+                ' '.join(metadata.get('mots_cles', [])),
+            ])
+            self.documents.append((metadata['document_id'], set(tokenize(text))))
+
+    def search(self, query: str, k: int = 10) -> List[str]:
+        query_tokens = set(tokenize(query))
+        scored = [
+            (len(query_tokens & tokens), doc_id)
+            for doc_id, tokens in self.documents
+        ]
+        scored = [item for item in scored if item[0] > 0]
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return [doc_id for _, doc_id in scored[:k]]
+
+
+def bm25_retriever():
+    """Index BM25 des métadonnées (construit s'il n'existe pas encore)."""
+    from bm25_index import BM25_DIR, BM25Index
+    from corpus import load_documents
+    if (BM25_DIR / "documents.json").exists():
+        return BM25Index.load()
+    return BM25Index.build(load_documents())
+
+
+def bm25_synonyms_retriever():
+    """Index BM25 avec expansion de requête par le lexique notarial."""
+    from synonyms import SynonymExpander
+    index = bm25_retriever()
+    index.expander = SynonymExpander.load()
+    return index
+
+
+# Retrievers disponibles par nom (sinon "module:attribut")
+RETRIEVERS: Dict[str, Callable[[], Any]] = {
+    'keywords': KeywordRetriever,
+    'bm25': bm25_retriever,
+    'bm25_synonymes': bm25_synonyms_retriever,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Minuscules, sans accents, mots de 3 caractères ou plus."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return [t for t in re.findall(r'[a-z0-9]+', text) if len(t) >= 3]
+
+
+def load_retriever(spec: str):
+    """
+    Instancie un retriever à partir de son nom ou d'un chemin "module:attribut".
+
+    Le retriever doit exposer search(query, k), synchrone ou asynchrone, qui
+    renvoie des document_id ou des dicts contenant documentId / document_id.
+    """
+    if str(RAG_DIR) not in sys.path:
+        sys.path.insert(0, str(RAG_DIR))
+    if spec in RETRIEVERS:
+        return RETRIEVERS[spec]()
+    if ':' not in spec:
+        print(f"❌ Retriever inconnu : {spec} (disponibles : {', '.join(RETRIEVERS)})")
+        sys.exit(1)
+    module_name, attr = spec.split(':', 1)
+    factory = getattr(importlib.import_module(module_name), attr)
+    if inspect.isclass(factory) or not hasattr(factory, 'search'):
+        factory = factory()
+    return factory
+
+
+def _result_doc_ids(results: List[Any]) -> List[str]:
+    """Normalise les résultats en liste de document_id dédupliqués (ordre conservé)."""
+    doc_ids = []
+    seen = set()
+    for item in results:
+        if isinstance(item, dict):
+            doc_id = item.get('documentId') or item.get('document_id')
+        elif isinstance(item, (tuple, list)):
+            doc_id = item[0]
+        else:
+            doc_id = item
+        if doc_id and doc_id not in seen:
+            seen.add(doc_id)
+            doc_ids.append(doc_id)
+    return doc_ids
+
+
+def compute_metrics(retrieved: List[str], expected: List[str], ks: List[int]) -> Dict[str, float]:
+    """
+    Calcule recall@k, precision@k, nDCG@k et le rang réciproque d'une question.
+
+    Args:
+        retrieved: document_id renvoyés, par ordre de pertinence
+        expected: document_id attendus
+        ks: Valeurs de k
+
+    Returns:
+        Dictionnaire de métriques
+    """
+    relevant = set(expected)
+    metrics = {}
+
+    for k in ks:
+        top = retrieved[:k]
+        hits = sum(1 for doc_id in top if doc_id in relevant)
+        metrics[f'recall@{k}'] = hits / len(relevant)
+        metrics[f'precision@{k}'] = hits / k
+        dcg = sum(
+            1.0 / math.log2(rank + 2)
+            for rank, doc_id in enumerate(top) if doc_id in relevant
+        )
+        idcg = sum(1.0 / math.log2(rank + 2) for rank in range(min(len(relevant), k)))
+        metrics[f'ndcg@{k}'] = dcg / idcg if idcg else 0.0
+
+    metrics['mrr'] = 0.0
+    for rank, doc_id in enumerate(retrieved, start=1):
+        if doc_id in relevant:
+            metrics['mrr'] = 1.0 / rank
+            break
+
+    return metrics
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile par interpolation linéaire."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+async def run_question(retriever, question: Dict[str, Any], k: int, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Interroge le retriever pour une question et mesure la latence."""
+    async with semaphore:
+        start = time.perf_counter()
+        if inspect.iscoroutinefunction(retriever.search):
+            results = await retriever.search(question['question'], k)
+        else:
+            results = await asyncio.to_thread(retriever.search, question['question'], k)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'id': question.get('id'),
+        'categorie': question.get('categorie', ''),
+        'difficulte': question.get('difficulte', ''),
+        'retrieved': _result_doc_ids(results)[:k],
+        'expected': question.get('documents_sources_attendus', []),
+        'latency_ms': latency_ms,
+    }
+
+
+async def evaluate(retriever, questions: List[Dict[str, Any]], ks: List[int], concurrency: int) -> Dict[str, Any]:
+    """
+    Évalue le retriever sur toutes les questions, en parallèle.
+
+    Args:
+        retriever: Objet exposant search(query, k)
+        questions: Questions du dataset (qa_pairs)
+        ks: Valeurs de k
+        concurrency: Nombre maximal de requêtes simultanées
+
+    Returns:
+        Rapport d'évaluation
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    max_k = max(ks)
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        run_question(retriever, q, max_k, semaphore) for q in questions
+    ])
+    wall_time = time.perf_counter() - start
+
+    scored = []
+    skipped = []
+    for result in results:
+        if not result['expected']:
+            # Questions hors corpus (edge cases) : pas de vérité terrain
+            skipped.append(result['id'])
+            continue
+        result['metrics'] = compute_metrics(result['retrieved'], result['expected'], ks)
+        scored.append(result)
+
+    def average(items):
+        if not items:
+            return {}
+        keys = items[0]['metrics'].keys()
+        return {key: sum(r['metrics'][key] for r in items) / len(items) for key in keys}
+
+    by_category = {}
+    for result in scored:
+        by_category.setdefault(result['categorie'], []).append(result)
+
+    latencies = [r['latency_ms'] for r in results]
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'total_questions': len(questions),
+        'scored_questions': len(scored),
+        'skipped_without_sources': skipped,
+        'ks': ks,
+        'metrics': average(scored),
+        'metrics_by_category': {cat: average(items) for cat, items in sorted(by_category.items())},
+        'latency_ms': {
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies) if latencies else 0.0,
+        },
+        'wall_time_s': wall_time,
+        'questions': scored,
+    }
+
+
+def print_summary(report: Dict[str, Any]):
+    """Affiche les métriques principales."""
+    print(f"\n📊 {report['scored_questions']}/{report['total_questions']} questions évaluées "
+          f"({len(report['skipped_without_sources'])} sans document attendu)")
+    print("-" * 70)
+    for key, value in report['metrics'].items():
+        print(f"  {key:15s} : {value:.3f}")
+    print("-" * 70)
+    latency = report['latency_ms']
+    print(f"  Latence p50 {latency['p50']:.1f} ms | p95 {latency['p95']:.1f} ms | "
+          f"p99 {latency['p99']:.1f} ms | total {report['wall_time_s']:.2f} s")
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Évalue un retriever sur le dataset de test")
+    parser.add_argument('--retriever', default='keywords', help="Nom enregistré ou 'module:attribut'")
+    parser.add_argument('--dataset', type=Path, default=DATASET_PATH)
+    parser.add_argument('--k', type=int, nargs='+', default=DEFAULT_KS)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--output', type=Path, default=REPORT_PATH)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("ÉVALUATION HORS-LIGNE DE LA RECHERCHE")
+    print("=" * 70)
+
+    if not args.dataset.exists():
+        print(f"❌ Fichier dataset introuvable : {args.dataset}")
+        sys.exit(1)
+
+    with open(args.dataset, 'r', encoding='utf-8') as f:
+        questions = json.load(f).get('qa_pairs', [])
+
+    print(f"📂 {len(questions)} questions, retriever : {args.retriever}")
+    retriever = load_retriever(args.retriever)
+
+    report = asyncio.run(evaluate(retriever, questions, sorted(set(args.k)), args.concurrency))
+    report['retriever'] = args.retriever
+    report['dataset'] = str(args.dataset)
+
+    print_summary(report)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n✅ Rapport sauvegardé : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
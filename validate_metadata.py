@@ -9,6 +9,8 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+from instrumentation import span, instrumented_run, instrumentation_options
+
 BASE_DIR = Path(__file__).parent
 METADATA_DIR = BASE_DIR / "_metadata"
 DOCS_METADATA_DIR = METADATA_DIR / "documents"
@@ -98,7 +100,8 @@ def analyze_all_documents():
     print("=" * 60)
     print()
 
-    metadata_files = list(DOCS_METADATA_DIR.glob("*.metadata.json"))
+    with span("scan"):
+        metadata_files = list(DOCS_METADATA_DIR.glob("*.metadata.json"))
     total = len(metadata_files)
 
     print(f"Documents à valider : {total}")
@@ -114,10 +117,12 @@ def analyze_all_documents():
     type_stats = defaultdict(lambda: {'count': 0, 'issues': 0, 'warnings': 0})
 
     for meta_file in metadata_files:
-        with open(meta_file, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+        with span("scan", documents=1):
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
 
-        issues, warnings = validate_document(metadata)
+        with span("validate", documents=1):
+            issues, warnings = validate_document(metadata)
         doc_type = metadata['classification']['type_document']
 
         type_stats[doc_type]['count'] += 1
@@ -198,11 +203,13 @@ def analyze_all_documents():
         'documents_with_warnings': docs_with_warnings[:50]  # Limiter
     }
 
-    with open(METADATA_DIR / "validation_report.json", 'w', encoding='utf-8') as f:
-        json.dump(report, f, ensure_ascii=False, indent=2)
+    with span("write"):
+        with open(METADATA_DIR / "validation_report.json", 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
 
     print(f"Rapport sauvegardé dans _metadata/validation_report.json")
 
 
 if __name__ == "__main__":
-    analyze_all_documents()
+    with instrumented_run("validate_metadata", **instrumentation_options()):
+        analyze_all_documents()